@@ -0,0 +1 @@
+from app.core.config.config import Settings, settings
@@ -1,8 +1,17 @@
 from pydantic import BaseSettings, Field, validator
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic.networks import HttpUrl
 from pydantic.types import SecretStr
 
+# 以逗号分隔形式配置的列表字段：环境变量不按 JSON 解析，交给验证器拆分（仍兼容 JSON 数组写法）
+COMMA_SEPARATED_FIELDS = {
+    "CORS_ORIGINS",
+    "REPLAY_IGNORE_HEADERS",
+    "REPLAY_IGNORE_PARAMS",
+    "REPLAY_IGNORE_BODY_FIELDS",
+    "RESPONSE_COMPRESSION_ENCODINGS",
+}
+
 class Settings(BaseSettings):
     # 服务器配置
     SERVER_HOST: str = Field(
@@ -18,12 +27,37 @@ class Settings(BaseSettings):
         default=["http://localhost:8501"],
         description="允许的CORS源（逗号分隔的URL列表）"
     )
+    SERVER_MODE: str = Field(
+        default="dev",
+        description="运行模式：dev 单进程并热重载，prod 多工作进程且不监视文件",
+        regex=r"^(dev|prod)$"
+    )
+    SERVER_WORKERS: int = Field(
+        default=0,
+        description="prod 模式的工作进程数（0表示CPU核数）",
+        ge=0
+    )
+    SERVER_LIMIT_MAX_REQUESTS: int = Field(
+        default=0,
+        description="prod 模式下每个工作进程处理该数量请求后优雅退出并由主进程重新拉起（0表示不回收）",
+        ge=0
+    )
+    SERVER_GRACEFUL_TIMEOUT: int = Field(
+        default=30,
+        description="工作进程退出时等待进行中请求完成的最长时间（秒，0表示不限）",
+        ge=0
+    )
     
     # 安全配置
     API_KEY: SecretStr = Field(
         default=...,
         description="API认证密钥（建议通过环境变量设置）"
     )
+    ENCRYPTION_OFFLOAD_BYTES: int = Field(
+        default=64 * 1024,
+        ge=0,
+        description="信封加密载荷超过该字节数时在线程池中加解密"
+    )
 
     # 监控配置
     MONITORING_INTERVAL: int = Field(
@@ -61,11 +95,347 @@ class Settings(BaseSettings):
         description="发件人邮箱密码"
     )
 
+    # 上游连接池配置
+    HTTP_MAX_CONNECTIONS: int = Field(
+        default=100,
+        description="共享客户端最大连接数",
+        gt=0
+    )
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=20,
+        description="最大保持空闲的长连接数",
+        ge=0
+    )
+    HTTP_KEEPALIVE_EXPIRY: float = Field(
+        default=30.0,
+        description="空闲长连接过期时间（秒）",
+        gt=0
+    )
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = Field(
+        default=20,
+        description="单个上游主机的最大并发请求数",
+        gt=0
+    )
+    HTTP2_ENABLED: bool = Field(
+        default=False,
+        description="是否启用HTTP/2（需要安装h2）"
+    )
+    HTTP_CLIENT_PROFILES: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="上游配置档案（JSON，档案名 -> 连接池参数覆盖）"
+    )
+
+    # 重试策略配置
+    RETRY_STATUS_CODES: List[int] = Field(
+        default=[429, 502, 503, 504],
+        description="允许重试的响应状态码"
+    )
+    RETRY_JITTER: str = Field(
+        default="full",
+        description="退避抖动模式（none/full/decorrelated）",
+        regex=r"^(none|full|decorrelated)$"
+    )
+    RETRY_MAX_BACKOFF: float = Field(
+        default=10.0,
+        description="单次退避上限（秒）",
+        gt=0
+    )
+    RETRY_BUDGET_RATIO: float = Field(
+        default=0.2,
+        description="全局重试预算：每个请求可产生的重试比例",
+        ge=0
+    )
+    RETRY_BUDGET_MIN_PER_SECOND: float = Field(
+        default=10.0,
+        description="全局重试预算：每秒保底重试次数",
+        ge=0
+    )
+
+    # 批量请求配置
+    BATCH_MAX_SIZE: int = Field(
+        default=5000,
+        description="单批最大请求数",
+        gt=0
+    )
+    BATCH_DEFAULT_CONCURRENCY: int = Field(
+        default=20,
+        description="批量请求默认并发数",
+        gt=0
+    )
+    BATCH_MAX_CONCURRENCY: int = Field(
+        default=100,
+        description="批量请求并发上限",
+        gt=0
+    )
+
+    # 响应体配置
+    MAX_RESPONSE_BODY_BYTES: int = Field(
+        default=50 * 1024 * 1024,
+        description="缓冲模式下上游响应体大小上限（字节，0表示不限）",
+        ge=0
+    )
+    STREAM_CHUNK_SIZE: int = Field(
+        default=64 * 1024,
+        description="流式透传模式的分块大小（字节）",
+        gt=0
+    )
+    BODY_SPOOL_THRESHOLD_BYTES: int = Field(
+        default=1024 * 1024,
+        description="请求/响应体超过该大小（字节）时溢出到临时文件并通过 mmap 读取",
+        ge=0
+    )
+    BODY_MEMORY_LIMIT_BYTES: int = Field(
+        default=256 * 1024 * 1024,
+        description="进程内驻留内存的请求/响应体字节总量上限，超出后新的请求体直接溢出到磁盘（0表示不限）",
+        ge=0
+    )
+    BODY_SPOOL_DIR: Optional[str] = Field(
+        default=None,
+        description="溢出文件所在目录（缺省为系统临时目录）"
+    )
+
+    # 压缩配置
+    RESPONSE_COMPRESSION_ENABLED: bool = Field(
+        default=True,
+        description="按 Accept-Encoding 协商压缩响应体"
+    )
+    RESPONSE_COMPRESSION_MIN_BYTES: int = Field(
+        default=1024,
+        description="压缩响应体的最小大小（字节，流式响应总是压缩）",
+        ge=0
+    )
+    RESPONSE_COMPRESSION_ENCODINGS: List[str] = Field(
+        default=["zstd", "br", "gzip"],
+        description="服务端偏好的压缩编码顺序（逗号分隔，未安装对应库的编码自动忽略）"
+    )
+    COMPRESSION_GZIP_LEVEL: int = Field(
+        default=6,
+        description="gzip 压缩级别",
+        ge=1, le=9
+    )
+    COMPRESSION_BROTLI_QUALITY: int = Field(
+        default=4,
+        description="brotli 压缩质量",
+        ge=0, le=11
+    )
+    COMPRESSION_ZSTD_LEVEL: int = Field(
+        default=3,
+        description="zstd 压缩级别",
+        ge=1, le=22
+    )
+    REQUEST_COMPRESSION_MIN_BYTES: int = Field(
+        default=1024,
+        description="启用请求体压缩时，小于该大小（字节）的请求体不压缩",
+        ge=0
+    )
+
+    # 响应缓存配置
+    CACHE_ENABLED: bool = Field(
+        default=True,
+        description="是否启用上游响应缓存"
+    )
+    CACHE_BACKEND: str = Field(
+        default="memory",
+        description="缓存后端（memory/disk）",
+        regex=r"^(memory|disk)$"
+    )
+    CACHE_MAX_BYTES: int = Field(
+        default=64 * 1024 * 1024,
+        description="缓存总容量（字节）",
+        gt=0
+    )
+    CACHE_MAX_ENTRY_BYTES: int = Field(
+        default=8 * 1024 * 1024,
+        description="单个缓存条目容量上限（字节）",
+        gt=0
+    )
+    CACHE_DISK_PATH: str = Field(
+        default=".cache/responses",
+        description="磁盘缓存目录"
+    )
+
+    # 请求合并配置
+    SINGLE_FLIGHT_ENABLED: bool = Field(
+        default=True,
+        description="是否合并相同的并发幂等请求"
+    )
+
+    # 负载测试配置
+    LOADTEST_MAX_DURATION: float = Field(
+        default=300.0,
+        description="单次负载测试最长时长（秒）",
+        gt=0
+    )
+    LOADTEST_MAX_IN_FLIGHT: int = Field(
+        default=1000,
+        description="open 模型下最大在途请求数",
+        gt=0
+    )
+
+    # 熔断与自适应并发配置
+    BREAKER_ENABLED: bool = Field(
+        default=True,
+        description="是否启用单主机熔断器与自适应并发限制"
+    )
+    BREAKER_FAILURE_RATE: float = Field(
+        default=0.5,
+        description="触发熔断的失败率阈值",
+        gt=0, le=1
+    )
+    BREAKER_SLOW_CALL_RATE: float = Field(
+        default=0.8,
+        description="触发熔断的慢调用率阈值",
+        gt=0, le=1
+    )
+    BREAKER_SLOW_CALL_SECONDS: float = Field(
+        default=3.0,
+        description="慢调用判定阈值（秒）",
+        gt=0
+    )
+    BREAKER_WINDOW_SECONDS: float = Field(
+        default=30.0,
+        description="熔断统计滑动窗口（秒）",
+        gt=0
+    )
+    BREAKER_MIN_CALLS: int = Field(
+        default=20,
+        description="窗口内触发熔断判定的最少调用数",
+        gt=0
+    )
+    BREAKER_OPEN_SECONDS: float = Field(
+        default=15.0,
+        description="熔断打开后的冷却时间（秒）",
+        gt=0
+    )
+    BREAKER_HALF_OPEN_CALLS: int = Field(
+        default=3,
+        description="半开状态允许的探测请求数",
+        gt=0
+    )
+    LIMITER_INITIAL: int = Field(
+        default=100,
+        description="自适应并发初始上限",
+        gt=0
+    )
+    LIMITER_MIN: int = Field(
+        default=1,
+        description="自适应并发最小上限",
+        gt=0
+    )
+    LIMITER_MAX: int = Field(
+        default=200,
+        description="自适应并发最大上限",
+        gt=0
+    )
+    LIMITER_QUEUE_SIZE: int = Field(
+        default=0,
+        description="单个上游主机并发已满时允许排队的最大请求数，超出后拒绝（0 为不排队，立即拒绝）",
+        ge=0
+    )
+    LIMITER_QUEUE_TIMEOUT: float = Field(
+        default=0.0,
+        description="排队等待并发名额的最长时间（秒），超时后拒绝（0 为不排队，立即拒绝）",
+        ge=0
+    )
+    LIMITER_LATENCY_TOLERANCE: float = Field(
+        default=2.0,
+        description="延迟超过基准延迟该倍数时收缩并发上限",
+        gt=1
+    )
+    LIMITER_BACKOFF_RATIO: float = Field(
+        default=0.9,
+        description="并发上限乘性收缩系数",
+        gt=0, lt=1
+    )
+
+    # 对冲请求配置
+    HEDGE_PERCENTILE: float = Field(
+        default=95.0,
+        description="对冲延迟取主机滚动延迟的分位数",
+        gt=0, lt=100
+    )
+    HEDGE_DEFAULT_DELAY_MS: float = Field(
+        default=100.0,
+        description="延迟样本不足时的默认对冲延迟（毫秒）",
+        gt=0
+    )
+    HEDGE_WINDOW_SECONDS: float = Field(
+        default=60.0,
+        description="主机延迟统计滚动窗口（秒）",
+        gt=0
+    )
+    HEDGE_BUDGET_RATIO: float = Field(
+        default=0.05,
+        description="全局对冲预算：每个对冲请求可产生的额外请求比例",
+        ge=0
+    )
+    HEDGE_BUDGET_MIN_PER_SECOND: float = Field(
+        default=1.0,
+        description="全局对冲预算：每秒保底对冲次数",
+        ge=0
+    )
+
+    # Mock 数据存储配置
+    MOCK_DB_PATH: str = Field(
+        default="mock_data.json",
+        description="Mock 数据文件路径（.db/.sqlite 后缀使用 SQLite 后端）"
+    )
+    MOCK_HOT_CACHE_SIZE: int = Field(
+        default=1024,
+        description="Mock 数据热点缓存与预序列化响应缓存的最大条目数",
+        ge=0
+    )
+    MOCK_GZIP_MIN_BYTES: int = Field(
+        default=512,
+        description="预先生成 gzip 变体的最小响应体大小（字节）",
+        ge=0
+    )
+    MOCK_BULK_BATCH_SIZE: int = Field(
+        default=1000,
+        description="批量导入时每个写入事务的条目数",
+        ge=1
+    )
+    MOCK_BULK_MAX_LINE_BYTES: int = Field(
+        default=16 * 1024 * 1024,
+        description="批量导入时单行的最大字节数，超长的行被丢弃并记为失败",
+        ge=1
+    )
+
+    # 录制/回放配置
+    REPLAY_MODE: str = Field(
+        default="off",
+        description="录制回放模式（off/record/replay/auto，auto 为命中回放、未命中录制）",
+        regex=r"^(off|record|replay|auto)$"
+    )
+    REPLAY_CASSETTE: str = Field(
+        default="default",
+        description="录制集名称，不同录制集互相隔离"
+    )
+    REPLAY_IGNORE_HEADERS: List[str] = Field(
+        default=["user-agent", "authorization", "cookie", "date", "x-request-id"],
+        description="不参与请求匹配的请求头（逗号分隔）"
+    )
+    REPLAY_IGNORE_PARAMS: List[str] = Field(
+        default=[],
+        description="不参与请求匹配的查询参数（逗号分隔）"
+    )
+    REPLAY_IGNORE_BODY_FIELDS: List[str] = Field(
+        default=[],
+        description="不参与请求匹配的请求体字段（逗号分隔，支持 a.b 路径）"
+    )
+
     class Config:
         case_sensitive = True
         env_prefix = ""
         validate_assignment = True
 
+        @classmethod
+        def parse_env_var(cls, field_name: str, raw_val: str) -> Any:
+            """复杂类型的环境变量默认按 JSON 解析，逗号分隔的列表字段原样交给验证器"""
+            if field_name in COMMA_SEPARATED_FIELDS and not raw_val.lstrip().startswith("["):
+                return raw_val
+            return cls.json_loads(raw_val)
+
     # 验证器
     @validator("CORS_ORIGINS", pre=True)
     def parse_cors_origins(cls, v: str) -> List[str]:
@@ -74,6 +444,16 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(",") if origin.strip()]
         return v or []
     
+    @validator(
+        "REPLAY_IGNORE_HEADERS", "REPLAY_IGNORE_PARAMS", "REPLAY_IGNORE_BODY_FIELDS",
+        "RESPONSE_COMPRESSION_ENCODINGS", pre=True
+    )
+    def parse_name_lists(cls, v: str) -> List[str]:
+        """解析逗号分隔的名称列表"""
+        if isinstance(v, str):
+            return [name.strip() for name in v.split(",") if name.strip()]
+        return v or []
+
     @validator("API_KEY")
     def validate_api_key(cls, v: SecretStr) -> SecretStr:
         """验证API密钥是否设置"""
@@ -1,16 +1,18 @@
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 import logging
-from typing import Type
+from typing import Optional, Type
 
 class HTTPError(Exception):
     """自定义 HTTP 异常基类"""
     status_code: int
     detail: str
+    error_code: Optional[str]
 
-    def __init__(self, status_code: int, detail: str):
+    def __init__(self, status_code: int, detail: str, error_code: Optional[str] = None):
         self.status_code = status_code
         self.detail = detail
+        self.error_code = error_code
 
 class BadRequestError(HTTPError):
     """400 错误请求异常"""
@@ -22,6 +24,16 @@ class UnauthorizedError(HTTPError):
     def __init__(self, detail: str = "Unauthorized"):
         super().__init__(401, detail)
 
+class CircuitOpenError(HTTPError):
+    """503 上游熔断中，请求被快速拒绝"""
+    def __init__(self, detail: str = "Circuit open"):
+        super().__init__(503, detail, error_code="circuit_open")
+
+class ConcurrencyLimitError(HTTPError):
+    """503 上游并发已达自适应上限，请求被快速拒绝"""
+    def __init__(self, detail: str = "Concurrency limit reached"):
+        super().__init__(503, detail, error_code="concurrency_limited")
+
 async def http_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """统一 HTTP 异常处理器"""
     
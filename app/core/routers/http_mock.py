@@ -1,12 +1,39 @@
-from fastapi import APIRouter, Request, Depends
-from fastapi.responses import JSONResponse
-from typing import Dict, Optional
+import anyio
+from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from typing import Any, AsyncIterator, Dict, Optional
 
-from app.core.utils.request_helper import send_http_request
-from app.core.schemas.request_schema import HTTPRequestSchema
+from app.core.utils.request_helper import UpstreamStream, send_http_request, open_http_stream
+from app.core.schemas.request_schema import (
+    HTTPRequestSchema,
+    BatchRequestSchema,
+    LoadTestSchema,
+    EncryptedEnvelopeSchema,
+)
 from app.core.schemas.response_schema import HTTPResponseSchema
-from app.core.errors.http_errors import HTTPError
-from app.core.utils.crypto import encrypt_data, decrypt_data
+from app.core.errors.http_errors import HTTPError, BadRequestError
+from app.core.utils.crypto import (
+    encrypt_data,
+    decrypt_data,
+    process_encryption,
+    PER_FIELD_REQUEST_FIELDS,
+    PER_FIELD_RESPONSE_FIELDS,
+    encrypt_payload_async,
+    decrypt_payload_async,
+)
+from app.core.utils.http_client import http_client_manager
+from app.core.utils.json_codec import FastJSONResponse, dumps
+from app.core.utils.retry_policy import retry_budget
+from app.core.utils.response_cache import response_cache
+from app.core.utils.single_flight import single_flight
+from app.core.utils.circuit_breaker import upstream_guard
+from app.core.utils.batch_executor import run_batch
+from app.core.utils.body_spool import body_budget
+from app.core.utils.compression import compression_stats
+from app.core.services.load_test_service import LoadTestRunner
+from app.core.services.record_replay import record_replay
+from app.core.config import settings
+from pydantic import ValidationError
 import logging
 
 router = APIRouter(
@@ -14,20 +41,33 @@ router = APIRouter(
     tags=["HTTP Mock"]
 )
 
+class UpstreamStreamingResponse(StreamingResponse):
+    """
+    透传上游流的响应：无论响应体是否开始发送都释放上游连接与并发名额
+
+    只依赖 iter_chunks 的 finally 不够：客户端在首个块之前断开或发送响应头
+    失败时生成器从未启动，其 finally 不会执行。
+    """
+
+    def __init__(self, upstream: UpstreamStream, chunk_size: int):
+        super().__init__(
+            upstream.iter_chunks(chunk_size),
+            status_code=upstream.status_code,
+            headers=upstream.passthrough_headers()
+        )
+        self.upstream = upstream
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.upstream.aclose()
+
 def get_encryption_status(request: Request) -> bool:
     """提取加密状态的依赖函数"""
     return request.headers.get("Encryption", "False").lower() == "true"
 
-def process_encryption(data: Dict, encrypt_func: callable) -> Dict:
-    """递归处理加密/解密的通用函数"""
-    processed = {}
-    for k, v in data.items():
-        if isinstance(v, dict):
-            processed[k] = process_encryption(v, encrypt_func)
-        else:
-            processed[k] = encrypt_func(v) if v is not None else v
-    return processed
-
 @router.post("/request", response_model=HTTPResponseSchema)
 async def make_request(
     request: Request,
@@ -38,27 +78,143 @@ async def make_request(
     logging.info(f"Received {data.method} request to {data.url}")
     
     try:
+        # 流式透传模式
+        if data.stream:
+            if encryption_enabled:
+                raise BadRequestError("流式透传模式不支持加密")
+            upstream = await open_http_stream(**data.to_request_kwargs())
+            try:
+                return UpstreamStreamingResponse(upstream, settings.STREAM_CHUNK_SIZE)
+            except BaseException:
+                await upstream.aclose()
+                raise
+
         # 加密处理
         if encryption_enabled:
-            data_dict = data.model_dump(exclude_unset=True)
-            encrypted_data = process_encryption(data_dict, encrypt_data)
-            data = HTTPRequestSchema(**encrypted_data)
+            payload = data.model_dump(include=set(PER_FIELD_REQUEST_FIELDS), exclude_none=True)
+            data = data.model_copy(update=process_encryption(payload, encrypt_data))
 
         # 发送请求
-        response = await send_http_request(**data.model_dump(exclude_unset=True))
-        response_data = HTTPResponseSchema.from_attributes(response)
+        response = await send_http_request(**data.to_request_kwargs())
+
+        # 已溢出到磁盘的大响应体：流式编码，不在内存中生成完整的文本或 base64
+        if response.extensions.get("spooled") and not encryption_enabled:
+            response_data = HTTPResponseSchema.from_response(response, data.response_body, defer_body=True)
+            return StreamingResponse(response_data.iter_json(), media_type="application/json")
+
+        response_data = HTTPResponseSchema.from_response(response, data.response_body)
 
         # 解密处理
         if encryption_enabled:
-            response_dict = response_data.model_dump(exclude_unset=True)
-            decrypted_data = process_encryption(response_dict, decrypt_data)
-            response_data = HTTPResponseSchema(**decrypted_data)
+            body = response_data.model_dump(include=set(PER_FIELD_RESPONSE_FIELDS), exclude_none=True)
+            response_data = response_data.model_copy(update=process_encryption(body, decrypt_data))
 
-        return JSONResponse(response_data.model_dump(exclude_unset=True))
+        # 直接序列化为字节返回，绕过 response_model 的二次校验与 jsonable_encoder
+        return Response(content=response_data.to_json(), media_type="application/json")
 
     except HTTPError as e:
         logging.error(f"HTTP error occurred: {e.detail}")
-        raise HTTPException(status_code=e.status_code, detail=e.detail)
+        headers = {"X-Error-Code": e.error_code} if e.error_code else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
     except Exception as e:
         logging.exception("Unexpected error occurred")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/request/envelope", response_model=EncryptedEnvelopeSchema)
+async def make_envelope_request(envelope: EncryptedEnvelopeSchema):
+    """信封加密模式的请求端点：请求与响应各自整体加密为单个密文
+
+    相比逐字段模式，每个方向只做一次序列化与一次 Fernet 运算，
+    大载荷的加解密在线程池中执行。
+    """
+    try:
+        payload = await decrypt_payload_async(envelope.envelope)
+        if not isinstance(payload, dict):
+            raise BadRequestError("无效的加密信封")
+        data = HTTPRequestSchema(**payload)
+        logging.info(f"Received envelope {data.method} request to {data.url}")
+
+        response = await send_http_request(**data.to_request_kwargs())
+        response_data = HTTPResponseSchema.from_response(response, data.response_body)
+        token = await encrypt_payload_async(
+            response_data.to_dict(), size_hint=len(response.content)
+        )
+        return FastJSONResponse({"envelope": token})
+
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except HTTPError as e:
+        logging.error(f"HTTP error occurred: {e.detail}")
+        headers = {"X-Error-Code": e.error_code} if e.error_code else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+    except Exception as e:
+        logging.exception("Unexpected error occurred")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/batch")
+async def make_batch_request(batch: BatchRequestSchema) -> StreamingResponse:
+    """批量请求端点：有界并发执行，按完成顺序以NDJSON流式返回结果"""
+    concurrency = min(
+        batch.concurrency or settings.BATCH_DEFAULT_CONCURRENCY,
+        settings.BATCH_MAX_CONCURRENCY
+    )
+    logging.info(f"Received batch of {len(batch.requests)} requests (concurrency={concurrency})")
+
+    async def stream_results() -> AsyncIterator[bytes]:
+        async for item in run_batch(batch.requests, concurrency):
+            yield dumps(item) + b"\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.post("/loadtest")
+async def run_load_test(spec: LoadTestSchema) -> Dict[str, Any]:
+    """负载测试端点：运行至结束后返回吞吐、错误分布与延迟分位数"""
+    runner = LoadTestRunner(
+        spec.request,
+        duration=spec.duration,
+        mode=spec.mode,
+        rate=spec.rate,
+        concurrency=spec.concurrency,
+        max_in_flight=settings.LOADTEST_MAX_IN_FLIGHT
+    )
+    return await runner.run()
+
+@router.get("/pool/stats")
+async def get_pool_stats() -> Dict[str, Any]:
+    """共享上游连接池统计信息"""
+    return http_client_manager.get_stats()
+
+@router.get("/retry/stats")
+async def get_retry_stats() -> Dict[str, Any]:
+    """全局重试预算统计信息"""
+    return retry_budget.get_stats()
+
+@router.get("/cache/stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """响应缓存命中/未命中/重新验证统计"""
+    return response_cache.get_stats()
+
+@router.get("/coalesce/stats")
+async def get_coalesce_stats() -> Dict[str, Any]:
+    """单飞请求合并统计信息"""
+    return single_flight.get_stats()
+
+@router.get("/breakers")
+async def get_breaker_state() -> Dict[str, Any]:
+    """各上游主机的熔断器与自适应并发状态"""
+    return upstream_guard.get_state()
+
+@router.get("/replay/stats")
+async def get_replay_stats() -> Dict[str, Any]:
+    """录制回放命中/未命中/录制统计"""
+    return record_replay.get_stats()
+
+@router.get("/body/stats")
+async def get_body_stats() -> Dict[str, Any]:
+    """请求/响应体内存预算与磁盘溢出统计"""
+    return body_budget.get_stats()
+
+@router.get("/compression/stats")
+async def get_compression_stats() -> Dict[str, Any]:
+    """各编码压缩的响应数与压缩前后字节数"""
+    return compression_stats.get_stats()
@@ -0,0 +1,185 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.schemas.request_schema import MockDataSchema
+from app.core.services.mock_bulk import BulkImporter, LineSplitter, export_ndjson
+from app.core.services.mock_data_service import (
+    INTERNAL_KEY_PREFIX,
+    MockDataService,
+    get_mock_data_service,
+    is_internal_key,
+    with_fault_tag,
+)
+from app.core.services.fault_injection import FaultRegistry, get_fault_registry
+from app.core.utils.compression import coding_quality, parse_accept_encoding
+
+router = APIRouter(
+    prefix="/mock/data",
+    tags=["Mock Data"]
+)
+
+# 批量导入/导出单独挂载，避免与 /mock/data/{key:path} 冲突
+bulk_router = APIRouter(
+    prefix="/mock/bulk",
+    tags=["Mock Data"]
+)
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """If-None-Match 弱比较：任一实体标签（忽略 W/ 前缀）与给定 ETag 之一相同即命中"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+def ensure_public_key(key: str) -> None:
+    """内部状态（Mock 规则、录制、故障注入配置）的保留 key 只能通过各自的接口访问"""
+    if is_internal_key(key):
+        raise HTTPException(status_code=403, detail=f"以 '{INTERNAL_KEY_PREFIX}' 开头的 key 保留给内部状态")
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Accept-Encoding 是否接受 gzip（q=0 视为拒绝）"""
+    return coding_quality(parse_accept_encoding(accept_encoding), "gzip") > 0
+
+@router.get("")
+async def list_mock_data(
+    prefix: str = "",
+    tag: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    service: MockDataService = Depends(get_mock_data_service)
+) -> Dict[str, Any]:
+    """按 key 升序分页列出，next 为下一页游标（无更多数据时为 null）"""
+    keys = await asyncio.to_thread(
+        service.list_mock_keys, prefix=prefix, tag=tag, after=after, limit=limit, include_internal=False
+    )
+    return {"keys": keys, "next": keys[-1] if len(keys) == limit else None}
+
+@router.get("/{key:path}")
+async def get_mock_data(
+    key: str,
+    request: Request,
+    service: MockDataService = Depends(get_mock_data_service),
+    faults: FaultRegistry = Depends(get_fault_registry)
+) -> Response:
+    """返回预序列化的条目，支持 gzip 协商、If-None-Match 条件请求与故障注入"""
+    ensure_public_key(key)
+    # 内存命中直接在事件循环中返回，需要读盘（SQLite、热点缓存未命中）时在线程池中执行
+    representation = service.get_representation(key, cached_only=True)
+    if representation is None:
+        representation = await asyncio.to_thread(service.get_representation, key)
+    if representation is None:
+        raise HTTPException(status_code=404, detail=f"Key '{key}' 不存在")
+    profile = faults.get(representation.fault_profile)
+
+    body, headers = representation.body, {"ETag": representation.etag}
+    if representation.gzip_body is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip(request.headers.get("accept-encoding")):
+            body = representation.gzip_body
+            headers["ETag"] = representation.gzip_etag
+            headers["Content-Encoding"] = "gzip"
+    # 两个变体内容相同，缓存中持有任一变体的客户端都可以用 304 续期
+    if etag_matches(request.headers.get("if-none-match"), representation.etag, representation.gzip_etag):
+        headers.pop("Content-Encoding", None)
+        if profile is not None:
+            return await faults.respond(profile, b"", 304, headers)
+        return Response(status_code=304, headers=headers)
+
+    if profile is not None:
+        return await faults.respond(profile, body, 200, headers, "application/json")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.post("/{key:path}", status_code=201)
+async def create_mock_data(
+    key: str,
+    item: MockDataSchema,
+    service: MockDataService = Depends(get_mock_data_service)
+) -> Response:
+    """创建条目，key 已存在时返回 409（写入与 fsync 在线程池中执行，不阻塞事件循环）"""
+    ensure_public_key(key)
+    tags = item.tags
+    if item.fault_profile is not None:
+        tags = with_fault_tag(tags or [], item.fault_profile)
+    try:
+        await asyncio.to_thread(service.create_mock_data, key, item.data, tags)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    representation = await asyncio.to_thread(service.get_representation, key)
+    return Response(status_code=201, headers={"ETag": representation.etag})
+
+@router.put("/{key:path}")
+async def update_mock_data(
+    key: str,
+    item: MockDataSchema,
+    service: MockDataService = Depends(get_mock_data_service)
+) -> Response:
+    """更新条目，key 不存在时返回 404"""
+    ensure_public_key(key)
+    tags = item.tags
+    if item.fault_profile is not None:
+        entry = await asyncio.to_thread(service.get_mock_entry, key)
+        current = entry["tags"] if entry is not None else []
+        tags = with_fault_tag(current if tags is None else tags, item.fault_profile)
+    try:
+        await asyncio.to_thread(service.update_mock_data, key, item.data, tags)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Key '{key}' 不存在")
+    representation = await asyncio.to_thread(service.get_representation, key)
+    return Response(status_code=204, headers={"ETag": representation.etag})
+
+@router.delete("/{key:path}", status_code=204)
+async def delete_mock_data(
+    key: str,
+    service: MockDataService = Depends(get_mock_data_service)
+) -> Response:
+    """删除条目，key 不存在时返回 404"""
+    ensure_public_key(key)
+    try:
+        await asyncio.to_thread(service.delete_mock_data, key)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Key '{key}' 不存在")
+    return Response(status_code=204)
+
+@bulk_router.post("/import")
+async def import_mock_data(
+    request: Request,
+    on_conflict: str = Query(default="upsert", pattern=r"^(upsert|skip)$"),
+    batch_size: Optional[int] = Query(default=None, ge=1, le=100000),
+    service: MockDataService = Depends(get_mock_data_service)
+) -> Dict[str, Any]:
+    """
+    以 NDJSON 流式导入（每行 {"key", "data", "tags"}），返回导入报告
+
+    请求体边接收边解析，按批在线程池中写入，不阻塞事件循环。超过
+    MOCK_BULK_MAX_LINE_BYTES 的行被丢弃并计入 errors。
+    """
+    importer = BulkImporter(service, on_conflict, batch_size or settings.MOCK_BULK_BATCH_SIZE)
+    splitter = LineSplitter(settings.MOCK_BULK_MAX_LINE_BYTES)
+    async for chunk in request.stream():
+        lines = splitter.feed(chunk)
+        if lines:
+            await asyncio.to_thread(importer.feed, lines)
+    await asyncio.to_thread(importer.feed, splitter.close())
+    return await asyncio.to_thread(importer.finish)
+
+@bulk_router.get("/export")
+async def export_mock_data(
+    prefix: str = "",
+    tag: Optional[str] = None,
+    service: MockDataService = Depends(get_mock_data_service)
+) -> StreamingResponse:
+    """按 key 升序以 NDJSON 流式导出，格式可直接用于导入"""
+    return StreamingResponse(
+        export_ndjson(service, prefix=prefix, tag=tag),
+        media_type="application/x-ndjson"
+    )
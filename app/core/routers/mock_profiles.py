@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi.responses import Response
+from typing import Any, Dict
+
+from app.core.schemas.request_schema import FaultProfileSchema
+from app.core.services.fault_injection import FaultRegistry, get_fault_registry
+
+PROFILE_NAME_PATTERN = r"^[\w.-]+$"
+
+router = APIRouter(
+    prefix="/mock/profiles",
+    tags=["Fault Injection"]
+)
+
+@router.get("")
+async def list_profiles(faults: FaultRegistry = Depends(get_fault_registry)) -> Dict[str, Any]:
+    """列出故障注入配置及注入统计"""
+    return {"profiles": faults.names(), **faults.get_stats()}
+
+@router.get("/{name}")
+async def get_profile(
+    name: str = Path(..., pattern=PROFILE_NAME_PATTERN),
+    faults: FaultRegistry = Depends(get_fault_registry)
+) -> Dict[str, Any]:
+    """获取配置定义"""
+    spec = faults.get_spec(name)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"配置 '{name}' 不存在")
+    return spec
+
+@router.put("/{name}")
+async def put_profile(
+    profile: FaultProfileSchema,
+    name: str = Path(..., pattern=PROFILE_NAME_PATTERN),
+    faults: FaultRegistry = Depends(get_fault_registry)
+) -> Response:
+    """新增或替换配置；绑定该配置的 Mock 数据与规则立即生效"""
+    created = faults.put(name, profile.model_dump(exclude_none=True))
+    return Response(status_code=201 if created else 204)
+
+@router.delete("/{name}", status_code=204)
+async def delete_profile(
+    name: str = Path(..., pattern=PROFILE_NAME_PATTERN),
+    faults: FaultRegistry = Depends(get_fault_registry)
+) -> Response:
+    """删除配置（绑定关系保留，配置不存在时按无故障处理）"""
+    try:
+        faults.delete(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"配置 '{name}' 不存在")
+    return Response(status_code=204)
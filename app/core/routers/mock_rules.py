@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import Response
+from typing import Any, Dict, Optional
+
+from app.core.schemas.request_schema import MockRuleSchema
+from app.core.services.mock_rule_engine import MockRuleEngine, get_rule_engine
+from app.core.services.fault_injection import FaultRegistry, get_fault_registry
+
+RULE_ID_PATTERN = r"^[\w.-]+$"
+
+router = APIRouter(
+    prefix="/mock/rules",
+    tags=["Mock Rules"]
+)
+
+# 按规则应答任意方法与路径的请求
+stub_router = APIRouter(
+    prefix="/stub",
+    tags=["Mock Rules"]
+)
+
+@router.get("")
+async def list_rules(
+    after: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    engine: MockRuleEngine = Depends(get_rule_engine)
+) -> Dict[str, Any]:
+    """按 ID 升序分页列出规则"""
+    rule_ids = engine.list_rules(after=after, limit=limit)
+    return {
+        "rules": rule_ids,
+        "next": rule_ids[-1] if len(rule_ids) == limit else None,
+        **engine.get_stats(),
+    }
+
+@router.get("/{rule_id}")
+async def get_rule(
+    rule_id: str = Path(..., pattern=RULE_ID_PATTERN),
+    engine: MockRuleEngine = Depends(get_rule_engine)
+) -> Dict[str, Any]:
+    """获取规则定义"""
+    rule = engine.get_rule(rule_id)
+    if rule is None:
+        raise HTTPException(status_code=404, detail=f"规则 '{rule_id}' 不存在")
+    return rule
+
+@router.put("/{rule_id}")
+async def put_rule(
+    rule: MockRuleSchema,
+    rule_id: str = Path(..., pattern=RULE_ID_PATTERN),
+    engine: MockRuleEngine = Depends(get_rule_engine)
+) -> Response:
+    """新增或替换规则，立即生效"""
+    created = engine.put_rule(rule_id, rule.model_dump())
+    return Response(status_code=201 if created else 204)
+
+@router.delete("/{rule_id}", status_code=204)
+async def delete_rule(
+    rule_id: str = Path(..., pattern=RULE_ID_PATTERN),
+    engine: MockRuleEngine = Depends(get_rule_engine)
+) -> Response:
+    """删除规则"""
+    try:
+        engine.delete_rule(rule_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"规则 '{rule_id}' 不存在")
+    return Response(status_code=204)
+
+@stub_router.api_route(
+    "/{path:path}",
+    methods=["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"]
+)
+async def dispatch_rule(
+    path: str,
+    request: Request,
+    engine: MockRuleEngine = Depends(get_rule_engine),
+    faults: FaultRegistry = Depends(get_fault_registry)
+) -> Response:
+    """按方法、路径、查询参数与请求头匹配规则并返回其响应（含故障注入）"""
+    matched = engine.match(request.method, path, request.query_params, request.headers)
+    if matched is None:
+        raise HTTPException(status_code=404, detail=f"没有匹配 {request.method} /{path} 的 Mock 规则")
+    rule, params = matched
+    response = rule.payload
+    body, media_type = response.render(params)
+    return await faults.respond(
+        faults.get(response.fault_profile),
+        body,
+        response.status_code,
+        response.headers,
+        media_type
+    )
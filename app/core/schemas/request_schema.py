@@ -1,6 +1,14 @@
-from typing import Dict, Optional, Union, List
-from pydantic import BaseModel, Field, field_validator, ValidationError
-import validators
+from typing import Any, Dict, Optional, Union, List
+from pydantic import BaseModel, Field, field_validator, model_validator, ValidationError
+
+from app.core.config import settings
+from app.core.utils.compression import available_encodings
+from app.core.utils.url_helper import ParsedURL, parse_url
+
+VALID_METHODS = frozenset({
+    "GET", "POST", "PUT", "DELETE",
+    "PATCH", "HEAD", "OPTIONS", "CONNECT", "TRACE"
+})
 
 class HTTPRequestSchema(BaseModel):
     """
@@ -14,16 +22,23 @@ class HTTPRequestSchema(BaseModel):
         data: 原始请求体数据（字符串或字典）
         json_data: JSON格式的请求体数据
         encoding: 请求体编码方式
+        stream: 是否以流式透传模式返回上游响应体
+        cache_mode: 缓存模式（default/bypass/refresh）
+        hedge: 是否启用对冲请求（仅幂等方法生效）
+        hedge_delay_ms: 对冲延迟（毫秒）
+        replay_mode: 录制回放模式（off/record/replay/auto）
+        response_body: 响应体返回方式（text/base64/auto）
+        compress_body: 请求体压缩编码（gzip/br/zstd，需上游支持 Content-Encoding）
     """
     
     method: str = Field(
         ...,
         description="HTTP方法",
         example="GET",
-        regex=r"^(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS|CONNECT|TRACE)$"
+        pattern=r"^(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS|CONNECT|TRACE)$"
     )
     
-    url: AnyUrl = Field(
+    url: str = Field(
         ...,
         description="请求URL",
         example="https://example.com"
@@ -57,29 +72,305 @@ class HTTPRequestSchema(BaseModel):
         example="utf-8"
     )
 
-    @field_validator('method')
-    def validate_method(cls, value: str) -> str:
-        """验证并标准化HTTP方法"""
-        valid_methods = {
-            "GET", "POST", "PUT", "DELETE", 
-            "PATCH", "HEAD", "OPTIONS", "CONNECT", "TRACE"
-        }
+    stream: bool = Field(
+        default=False,
+        description="流式透传上游响应体（状态码与响应头作为响应元数据返回）"
+    )
+
+    cache_mode: str = Field(
+        default="default",
+        description="缓存模式：default 正常使用缓存，bypass 不读不写，refresh 跳过读取并刷新",
+        example="default",
+        pattern=r"^(default|bypass|refresh)$"
+    )
+
+    hedge: bool = Field(
+        default=False,
+        description="对冲请求：首个请求超过对冲延迟未完成时发出第二个相同请求"
+    )
+
+    hedge_delay_ms: Optional[float] = Field(
+        default=None,
+        description="对冲延迟（毫秒，缺省为该主机滚动p95延迟）",
+        example=50,
+        gt=0
+    )
+
+    replay_mode: Optional[str] = Field(
+        default=None,
+        description="录制回放模式（缺省使用全局 REPLAY_MODE）",
+        example="replay",
+        pattern=r"^(off|record|replay|auto)$"
+    )
+
+    response_body: str = Field(
+        default="text",
+        description="响应体返回方式：text 解码为文本，base64 返回原始字节（不做字符集解码），auto 按 Content-Type 选择",
+        example="base64",
+        pattern=r"^(text|base64|auto)$"
+    )
+
+    compress_body: Optional[str] = Field(
+        default=None,
+        description="按该编码压缩发往上游的请求体并设置 Content-Encoding（上游需支持解压请求体）",
+        example="gzip",
+        pattern=r"^(gzip|br|zstd)$"
+    )
+
+    @field_validator('method', mode='before')
+    def validate_method(cls, value: Any) -> Any:
+        """验证并标准化HTTP方法（在 pattern 校验前转为大写）"""
+        if not isinstance(value, str):
+            return value
         standardized = value.upper()
-        if standardized not in valid_methods:
+        if standardized not in VALID_METHODS:
             raise ValueError(f"不支持的HTTP方法: {value}")
         return standardized
 
     @field_validator('url')
     def validate_url(cls, value: str) -> str:
-        """验证URL格式有效性"""
-        if not validators.url(value):
-            raise ValueError(f"无效的URL格式: {value}")
+        """验证URL格式有效性（解析结果按URL缓存，重复目标只解析一次）"""
+        parse_url(value)
+        return value
+
+    @field_validator('compress_body')
+    def validate_compress_body(cls, value: Optional[str]) -> Optional[str]:
+        """确保所选压缩编码对应的库已安装"""
+        if value is not None and value not in available_encodings():
+            raise ValueError(f"压缩编码 {value} 不可用（未安装对应的库）")
         return value
 
-    @field_validator('data', 'json_data')
-    def check_data_conflict(cls, value, values):
+    @model_validator(mode='after')
+    def check_data_conflict(self) -> 'HTTPRequestSchema':
         """确保data和json_data不同时存在"""
-        if 'data' in values and 'json_data' in values:
-            if values['data'] is not None and values['json_data'] is not None:
-                raise ValueError("data和json_data不能同时存在")
-        return value
\ No newline at end of file
+        if self.data is not None and self.json_data is not None:
+            raise ValueError("data和json_data不能同时存在")
+        return self
+
+    @property
+    def parsed_url(self) -> ParsedURL:
+        """已校验URL的解析结果（命中缓存）"""
+        return parse_url(self.url)
+
+    def to_request_kwargs(self) -> Dict[str, Any]:
+        """转换为 send_http_request 参数"""
+        kwargs = self.model_dump(exclude_unset=True, exclude={"stream", "response_body"})
+        if "json_data" in kwargs:
+            kwargs["json"] = kwargs.pop("json_data")
+        return kwargs
+
+class BatchRequestSchema(BaseModel):
+    """
+    批量请求模式定义
+
+    Attributes:
+        requests: 待执行的请求列表
+        concurrency: 并发上限（缺省使用 BATCH_DEFAULT_CONCURRENCY）
+    """
+
+    requests: List[HTTPRequestSchema] = Field(
+        ...,
+        description="请求列表",
+        min_length=1
+    )
+
+    concurrency: Optional[int] = Field(
+        default=None,
+        description="并发上限",
+        example=20,
+        gt=0
+    )
+
+    @field_validator('requests')
+    def validate_batch_size(cls, value: List[HTTPRequestSchema]) -> List[HTTPRequestSchema]:
+        """限制单批请求数量"""
+        if len(value) > settings.BATCH_MAX_SIZE:
+            raise ValueError(f"单批请求数不能超过 {settings.BATCH_MAX_SIZE}")
+        return value
+
+
+class LoadTestSchema(BaseModel):
+    """
+    负载测试模式定义
+
+    Attributes:
+        request: 被测请求
+        mode: 负载模型（open 固定速率 / closed 固定并发）
+        duration: 持续时间（秒）
+        rate: open 模型的每秒请求数
+        concurrency: closed 模型的并发数
+    """
+
+    request: HTTPRequestSchema = Field(
+        ...,
+        description="被测请求"
+    )
+
+    mode: str = Field(
+        default="closed",
+        description="负载模型",
+        example="open",
+        pattern=r"^(open|closed)$"
+    )
+
+    duration: float = Field(
+        default=10.0,
+        description="持续时间（秒）",
+        example=30,
+        gt=0
+    )
+
+    rate: Optional[float] = Field(
+        default=None,
+        description="open 模型的每秒请求数",
+        example=200,
+        gt=0
+    )
+
+    concurrency: Optional[int] = Field(
+        default=None,
+        description="closed 模型的并发数",
+        example=20,
+        gt=0
+    )
+
+    @model_validator(mode='after')
+    def check_load_model(self) -> 'LoadTestSchema':
+        """校验负载模型参数与时长上限"""
+        if self.mode == "open" and self.rate is None:
+            raise ValueError("open 模型需要指定 rate")
+        if self.duration > settings.LOADTEST_MAX_DURATION:
+            raise ValueError(f"测试时长不能超过 {settings.LOADTEST_MAX_DURATION} 秒")
+        return self
+
+
+class EncryptedEnvelopeSchema(BaseModel):
+    """
+    信封加密模式的请求/响应体
+
+    Attributes:
+        envelope: 整体序列化后加密的 Fernet 密文
+    """
+
+    envelope: str = Field(
+        ...,
+        description="Fernet 密文（请求为 HTTPRequestSchema，响应为 HTTPResponseSchema）"
+    )
+
+
+class MockDataSchema(BaseModel):
+    """
+    Mock 数据条目的写入请求体
+
+    Attributes:
+        data: 任意 JSON 数据
+        tags: 标签列表（更新时缺省保留原标签）
+        fault_profile: 绑定的故障注入配置名称（空字符串表示解除绑定）
+    """
+
+    data: Any = Field(..., description="Mock 数据（任意 JSON）")
+    tags: Optional[List[str]] = Field(default=None, description="标签列表")
+    fault_profile: Optional[str] = Field(default=None, description="故障注入配置名称")
+
+
+class MockRuleResponseSchema(BaseModel):
+    """
+    Mock 规则的响应定义
+
+    Attributes:
+        status_code: 响应状态码
+        headers: 响应头
+        body: 响应体（JSON 或字符串），字符串中的 ``{name}`` 会替换为路径参数
+    """
+
+    status_code: int = Field(default=200, ge=100, le=599, description="响应状态码")
+    headers: Dict[str, str] = Field(default_factory=dict, description="响应头")
+    body: Any = Field(default=None, description="响应体模板")
+
+
+class MockRuleSchema(BaseModel):
+    """
+    声明式 Mock 规则
+
+    Attributes:
+        method: 请求方法，``*`` 匹配任意方法
+        path: 路径模式，支持 ``{name}`` 参数段与末尾 ``*`` 通配
+        priority: 优先级，越大越先匹配
+        query: 需完全相等的查询参数
+        headers: 需完全相等的请求头
+        response: 命中后返回的响应
+        fault_profile: 绑定的故障注入配置名称
+    """
+
+    method: str = Field(
+        default="*",
+        description="HTTP方法",
+        pattern=r"^(\*|GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS)$"
+    )
+    path: str = Field(..., description="路径模式", example="/users/{id}", pattern=r"^/")
+    priority: int = Field(default=0, description="优先级")
+    query: Dict[str, str] = Field(default_factory=dict, description="查询参数谓词")
+    headers: Dict[str, str] = Field(default_factory=dict, description="请求头谓词")
+    response: MockRuleResponseSchema = Field(default_factory=MockRuleResponseSchema, description="响应定义")
+    fault_profile: Optional[str] = Field(default=None, description="故障注入配置名称")
+
+
+class LatencySchema(BaseModel):
+    """
+    延迟分布
+
+    Attributes:
+        distribution: fixed/normal/lognormal/percentiles
+        ms: 固定延迟（毫秒）
+        mean_ms: 正态分布均值
+        stddev_ms: 正态分布标准差
+        median_ms: 对数正态分布中位数
+        sigma: 对数正态分布形状参数
+        percentiles: 分位数 -> 延迟（毫秒），如 {"50": 20, "99": 300}，按分段线性回放
+        max_ms: 延迟上限
+    """
+
+    distribution: str = Field(
+        default="fixed",
+        description="延迟分布",
+        pattern=r"^(fixed|normal|lognormal|percentiles)$"
+    )
+    ms: float = Field(default=0.0, ge=0, description="固定延迟（毫秒）")
+    mean_ms: float = Field(default=0.0, ge=0, description="正态分布均值（毫秒）")
+    stddev_ms: float = Field(default=0.0, ge=0, description="正态分布标准差（毫秒）")
+    median_ms: float = Field(default=0.0, ge=0, description="对数正态分布中位数（毫秒）")
+    sigma: float = Field(default=0.5, gt=0, description="对数正态分布形状参数")
+    percentiles: Dict[str, float] = Field(default_factory=dict, description="录制的延迟分位数（毫秒）")
+    max_ms: Optional[float] = Field(default=None, gt=0, description="延迟上限（毫秒）")
+
+    @model_validator(mode="after")
+    def check_percentiles(self) -> 'LatencySchema':
+        """校验分位数回放参数"""
+        if self.distribution == "percentiles":
+            if not self.percentiles:
+                raise ValueError("percentiles 分布需要提供分位数")
+            for key in self.percentiles:
+                if not 0 <= float(key) <= 100:
+                    raise ValueError(f"无效的分位数: {key}")
+        return self
+
+
+class FaultProfileSchema(BaseModel):
+    """
+    故障注入配置
+
+    Attributes:
+        latency: 响应前的延迟分布
+        first_byte_ms: 响应头发出后、首个响应体字节前的额外延迟
+        bandwidth_bytes_per_sec: 响应体限速（字节/秒）
+        error_rate: 返回错误状态码的概率
+        error_statuses: 随机选用的错误状态码
+        reset_rate: 发送部分响应体后中断连接的概率
+    """
+
+    latency: Optional[LatencySchema] = Field(default=None, description="延迟分布")
+    first_byte_ms: float = Field(default=0.0, ge=0, description="首字节延迟（毫秒）")
+    bandwidth_bytes_per_sec: Optional[int] = Field(default=None, gt=0, description="响应体限速（字节/秒）")
+    error_rate: float = Field(default=0.0, ge=0, le=1, description="错误率")
+    error_statuses: List[int] = Field(default=[500, 502, 503], min_length=1, description="错误状态码")
+    reset_rate: float = Field(default=0.0, ge=0, le=1, description="连接中断率")
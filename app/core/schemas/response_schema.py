@@ -1,20 +1,44 @@
-from typing import Dict, Optional, Union, List
+from typing import Dict, Iterator, Optional, Union, List
 from datetime import datetime
+import base64
+import codecs
+import json
 import httpx
-from pydantic import BaseModel, Field, validator, HttpUrl, root_validator
+from pydantic import BaseModel, Field, PrivateAttr, validator, HttpUrl, root_validator
 from pydantic import model_validator  # Pydantic V2 导入
 
+from app.core.utils.encoding_helper import decode_content, resolve_response_encoding, response_text
+
+# 响应体返回方式：text 解码为文本，base64 返回原始字节，auto 按 Content-Type 选择
+BODY_MODES = ("text", "base64", "auto")
+_TEXTUAL_MEDIA_TYPES = ("application/json", "application/xml", "application/javascript",
+                        "application/x-www-form-urlencoded")
+
+def is_textual(content_type: Optional[str]) -> bool:
+    """Content-Type 是否为文本类型（text/*、JSON、XML、JS 及 +json/+xml）"""
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in _TEXTUAL_MEDIA_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
 class HTTPResponseSchema(BaseModel):
     """
     HTTP 响应模式定义
 
     Attributes:
         status_code: 响应状态码 (100-599)
-        text: 响应正文内容
+        text: 响应正文内容（text 模式）
+        body_base64: base64 编码的原始响应体（base64 模式）
         headers: 响应头信息（支持多值头）
         elapsed: 响应时间（秒）
         encoding: 响应编码格式
         content_type: 响应内容类型
+        hedged: 是否发出了对冲请求
+        hedge_won: 对冲请求是否先于首个请求完成
     """
     
     status_code: int = Field(
@@ -24,11 +48,15 @@ class HTTPResponseSchema(BaseModel):
         ge=100,
         le=599
     )
-    text: str = Field(
-        ...,
+    text: Optional[str] = Field(
+        default=None,
         description="响应体文本内容",
         example="{'key': 'value'}"
     )
+    body_base64: Optional[str] = Field(
+        default=None,
+        description="base64 编码的原始响应体（不做字符集解码）"
+    )
     headers: Dict[str, Union[str, List[str]]] = Field(
         ...,
         description="响应头信息（支持多值头）"
@@ -49,6 +77,19 @@ class HTTPResponseSchema(BaseModel):
         description="MIME类型",
         example="application/json"
     )
+    hedged: Optional[bool] = Field(
+        default=None,
+        description="是否发出了对冲请求"
+    )
+    hedge_won: Optional[bool] = Field(
+        default=None,
+        description="对冲请求是否胜出"
+    )
+
+    # 原始响应体与按需解码的文本视图，不参与序列化
+    _content: Optional[bytes] = PrivateAttr(default=None)
+    _decoded_text: Optional[str] = PrivateAttr(default=None)
+    _deferred_mode: Optional[str] = PrivateAttr(default=None)
 
     @model_validator(mode='after')
     def validate_headers(self) -> 'HTTPResponseSchema':
@@ -63,8 +104,21 @@ class HTTPResponseSchema(BaseModel):
         return self
 
     @classmethod
-    def from_response(cls, response: httpx.Response) -> 'HTTPResponseSchema':
-        """从httpx响应对象创建模式实例"""
+    def from_response(
+        cls,
+        response: httpx.Response,
+        body_mode: str = "text",
+        defer_body: bool = False
+    ) -> 'HTTPResponseSchema':
+        """
+        从httpx响应对象创建模式实例
+
+        Args:
+            response: 已读取响应体的 httpx 响应
+            body_mode: text 解码为文本；base64 直接编码原始字节，不做字符集检测与
+                解码；auto 对文本类型使用 text，其余使用 base64
+            defer_body: 不生成 text/body_base64 字段，由 iter_json 流式编码响应体
+        """
         # 处理多值响应头
         headers = {}
         for key, value in response.headers.multi_items():
@@ -76,22 +130,98 @@ class HTTPResponseSchema(BaseModel):
             else:
                 headers[key] = value
 
-        return cls(
+        # 对冲结果仅在启用对冲时写入，默认响应保持原有字段
+        hedge_info = response.extensions.get("hedge", {})
+
+        content_type = response.headers.get('content-type')
+        if body_mode == "auto":
+            body_mode = "text" if is_textual(content_type) else "base64"
+        if body_mode == "base64":
+            # 只报告响应头声明的字符集，避免对整个响应体做字符集检测
+            body = {"encoding": response.charset_encoding}
+            if not defer_body:
+                body["body_base64"] = base64.b64encode(response.content).decode("ascii")
+        elif defer_body:
+            body = {"encoding": resolve_response_encoding(response)}
+        else:
+            body = {"text": response_text(response), "encoding": response.encoding}
+
+        # 字段均来自 httpx 的已解析响应（响应头已是 str），跳过校验器直接构建
+        instance = cls.model_construct(
             status_code=response.status_code,
-            text=response.text,
             headers=headers,
             elapsed=response.elapsed.total_seconds(),
-            encoding=response.encoding,
-            content_type=response.headers.get('content-type')
+            content_type=content_type,
+            **body,
+            **hedge_info
         )
+        instance._content = response.content
+        if defer_body:
+            instance._deferred_mode = body_mode
+        return instance
+
+    def iter_json(self, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        """
+        流式序列化为 JSON：先输出其余字段，再按块编码响应体
+
+        用于 ``defer_body=True`` 构建的实例（响应体已溢出到磁盘时），任何时刻
+        只有一个块的文本或 base64 在内存中。
+        """
+        head = self.to_json()
+        if self._deferred_mode is None:
+            yield head
+            return
+        content = self._content
+        if self._deferred_mode == "base64":
+            yield head[:-1] + b',"body_base64":"'
+            step = chunk_size - chunk_size % 3  # 3 字节对齐，分块编码结果可直接拼接
+            for offset in range(0, len(content), step):
+                yield base64.b64encode(content[offset:offset + step])
+        else:
+            yield head[:-1] + b',"text":"'
+            decoder = codecs.getincrementaldecoder(self.encoding or "utf-8")(errors="replace")
+            for offset in range(0, len(content) + 1, chunk_size):
+                piece = decoder.decode(content[offset:offset + chunk_size], final=offset + chunk_size > len(content))
+                if piece:
+                    yield json.dumps(piece, ensure_ascii=False)[1:-1].encode("utf-8")
+        yield b'"}'
+
+    @property
+    def content(self) -> bytes:
+        """原始响应体字节"""
+        if self._content is None:
+            if self.body_base64 is not None:
+                self._content = base64.b64decode(self.body_base64)
+            else:
+                self._content = (self.text or "").encode(self.encoding or "utf-8", errors="replace")
+        return self._content
+
+    def get_text(self) -> str:
+        """
+        响应体文本视图：text 模式直接返回，base64 模式在首次调用时才解码并缓存
+
+        优先使用声明的字符集，否则由 decode_content 在有界样本上检测编码。
+        """
+        if self.text is not None:
+            return self.text
+        if self._decoded_text is None:
+            self._decoded_text = decode_content(self.content, self.encoding, self.content_type)
+        return self._decoded_text
+
+    def to_json(self) -> bytes:
+        """直接由 pydantic-core 序列化为 JSON 字节（仅包含显式设置的字段）"""
+        return self.__pydantic_serializer__.to_json(self, exclude_unset=True)
 
     def to_dict(self) -> Dict:
         """转换为标准字典格式"""
         return {
             "status_code": self.status_code,
             "text": self.text,
+            "body_base64": self.body_base64,
             "headers": self.headers,
             "elapsed": self.elapsed,
             "encoding": self.encoding,
             "content_type": self.content_type,
+            "hedged": self.hedged,
+            "hedge_won": self.hedge_won,
         }
\ No newline at end of file
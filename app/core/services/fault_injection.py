@@ -0,0 +1,248 @@
+import asyncio
+import bisect
+import json
+import logging
+import math
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Set
+
+from fastapi.responses import Response, StreamingResponse
+
+from app.core.services.mock_data_service import MockDataService, get_mock_data_service
+
+# 故障注入配置作为普通条目存放在 MockDataService 中
+PROFILE_KEY_PREFIX = "__profiles__/"
+PROFILE_TAG = "fault_profile"
+
+# 限速发送时每个时间片的长度（秒）
+_THROTTLE_TICK = 0.05
+
+
+class LatencyDistribution:
+    """可采样的延迟分布（单位：秒）"""
+
+    def __init__(self, spec: Mapping[str, Any]):
+        self.kind = spec.get("distribution", "fixed")
+        self.spec = spec
+        self.max_seconds = spec["max_ms"] / 1000 if spec.get("max_ms") else math.inf
+        if self.kind == "percentiles":
+            points = sorted((float(p) / 100, ms / 1000) for p, ms in spec["percentiles"].items())
+            if points[0][0] > 0:
+                points.insert(0, (0.0, points[0][1]))
+            if points[-1][0] < 1:
+                points.append((1.0, points[-1][1]))
+            self._quantiles = [q for q, _ in points]
+            self._values = [v for _, v in points]
+
+    def sample(self) -> float:
+        spec = self.spec
+        if self.kind == "normal":
+            value = random.gauss(spec.get("mean_ms", 0.0), spec.get("stddev_ms", 0.0)) / 1000
+        elif self.kind == "lognormal":
+            median = max(spec.get("median_ms", 0.0), 1e-3)
+            value = random.lognormvariate(math.log(median), spec.get("sigma", 0.5)) / 1000
+        elif self.kind == "percentiles":
+            value = self._inverse_cdf(random.random())
+        else:
+            value = spec.get("ms", 0.0) / 1000
+        return min(max(value, 0.0), self.max_seconds)
+
+    def _inverse_cdf(self, u: float) -> float:
+        """在录制的分位点之间线性插值"""
+        index = bisect.bisect_right(self._quantiles, u)
+        if index >= len(self._quantiles):
+            return self._values[-1]
+        q0, q1 = self._quantiles[index - 1], self._quantiles[index]
+        v0, v1 = self._values[index - 1], self._values[index]
+        return v0 + (v1 - v0) * (u - q0) / (q1 - q0) if q1 > q0 else v1
+
+
+class FaultPlan:
+    """单个响应的故障抽样结果"""
+
+    __slots__ = ("delay", "first_byte", "bandwidth", "error_status", "reset")
+
+    def __init__(self, delay: float, first_byte: float, bandwidth: Optional[int],
+                 error_status: Optional[int], reset: bool):
+        self.delay = delay
+        self.first_byte = first_byte
+        self.bandwidth = bandwidth
+        self.error_status = error_status
+        self.reset = reset
+
+    @property
+    def streams(self) -> bool:
+        """响应体是否需要以流式分段发送"""
+        return bool(self.first_byte or self.bandwidth or self.reset)
+
+
+class FaultProfile:
+    """编译后的故障注入配置"""
+
+    def __init__(self, name: str, spec: Mapping[str, Any]):
+        self.name = name
+        self.latency = LatencyDistribution(spec["latency"]) if spec.get("latency") else None
+        self.first_byte = spec.get("first_byte_ms", 0.0) / 1000
+        self.bandwidth = spec.get("bandwidth_bytes_per_sec")
+        self.error_rate = spec.get("error_rate", 0.0)
+        self.error_statuses = list(spec.get("error_statuses") or [500, 502, 503])
+        self.reset_rate = spec.get("reset_rate", 0.0)
+
+    def plan(self) -> FaultPlan:
+        """为一次响应抽样延迟与故障"""
+        error_status = None
+        if self.error_rate and random.random() < self.error_rate:
+            error_status = random.choice(self.error_statuses)
+        return FaultPlan(
+            delay=self.latency.sample() if self.latency else 0.0,
+            first_byte=self.first_byte,
+            bandwidth=self.bandwidth,
+            error_status=error_status,
+            reset=bool(self.reset_rate) and error_status is None and random.random() < self.reset_rate,
+        )
+
+
+class FaultRegistry:
+    """按名称缓存编译后的配置，配置变更（含其他进程）时失效"""
+
+    def __init__(self, service: MockDataService):
+        self.service = service
+        self._profiles: Dict[str, Optional[FaultProfile]] = {}
+        self.stats = {"delayed": 0, "errors": 0, "resets": 0}
+        service.add_change_listener(self._on_external_change)
+
+    def _on_external_change(self, keys: Optional[Set[str]]) -> None:
+        if keys is None:
+            self._profiles = {}
+        else:
+            for key in keys:
+                if key.startswith(PROFILE_KEY_PREFIX):
+                    self._profiles.pop(key[len(PROFILE_KEY_PREFIX):], None)
+
+    def get(self, name: Optional[str]) -> Optional[FaultProfile]:
+        """取编译后的配置；未定义时返回None"""
+        if not name:
+            return None
+        try:
+            return self._profiles[name]
+        except KeyError:
+            pass
+        spec = self.service.get_mock_data(PROFILE_KEY_PREFIX + name)
+        profile = FaultProfile(name, spec) if spec is not None else None
+        self._profiles[name] = profile
+        return profile
+
+    def get_spec(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.service.get_mock_data(PROFILE_KEY_PREFIX + name)
+
+    def put(self, name: str, spec: Dict[str, Any]) -> bool:
+        """新增或替换配置，返回是否为新建"""
+        FaultProfile(name, spec)
+        key = PROFILE_KEY_PREFIX + name
+        created = self.service.get_mock_entry(key) is None
+        if created:
+            self.service.create_mock_data(key, spec, tags=[PROFILE_TAG])
+        else:
+            self.service.update_mock_data(key, spec)
+        self._profiles.pop(name, None)
+        return created
+
+    def delete(self, name: str) -> None:
+        """删除配置，不存在时抛出 KeyError"""
+        self.service.delete_mock_data(PROFILE_KEY_PREFIX + name)
+        self._profiles.pop(name, None)
+
+    def names(self) -> List[str]:
+        keys = self.service.list_mock_keys(prefix=PROFILE_KEY_PREFIX, limit=10000)
+        return [key[len(PROFILE_KEY_PREFIX):] for key in keys]
+
+    async def respond(
+        self,
+        profile: Optional[FaultProfile],
+        body: bytes,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None
+    ) -> Response:
+        """
+        按配置延迟、注入错误或限速发送响应
+
+        所有等待均为 asyncio 定时器，大量并发的延迟响应不占用线程。
+
+        Args:
+            profile: 故障注入配置，None 时直接返回
+            body: 响应体字节
+            status_code: 正常响应的状态码
+            headers: 响应头
+            media_type: Content-Type
+        """
+        headers = dict(headers or {})
+        if profile is None:
+            return Response(content=body, status_code=status_code, headers=headers, media_type=media_type)
+
+        plan = profile.plan()
+        if plan.delay:
+            self.stats["delayed"] += 1
+            await asyncio.sleep(plan.delay)
+        if plan.error_status is not None:
+            self.stats["errors"] += 1
+            return Response(
+                content=json.dumps({"detail": f"故障注入: {profile.name}"}, ensure_ascii=False),
+                status_code=plan.error_status,
+                headers={"X-Fault-Injected": "error"},
+                media_type="application/json"
+            )
+        if not plan.streams or status_code == 304:
+            return Response(content=body, status_code=status_code, headers=headers, media_type=media_type)
+
+        if plan.reset:
+            self.stats["resets"] += 1
+        headers["Content-Length"] = str(len(body))
+        return StreamingResponse(
+            shaped_body(body, plan, profile.name),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"profiles_cached": len(self._profiles), **self.stats}
+
+
+async def shaped_body(body: bytes, plan: FaultPlan, name: str = "") -> AsyncIterator[bytes]:
+    """
+    按计划分段产出响应体：首字节延迟、按时间片限速，必要时在中途中断
+
+    限速以单调时钟为基准计算每段的发送时刻，避免 sleep 误差累积。
+    """
+    if plan.first_byte:
+        await asyncio.sleep(plan.first_byte)
+    limit = len(body) // 2 if plan.reset else len(body)
+    if plan.bandwidth:
+        chunk_size = max(1, int(plan.bandwidth * _THROTTLE_TICK))
+    else:
+        chunk_size = max(1, limit)
+    started = time.monotonic()
+    sent = 0
+    while sent < limit:
+        chunk = body[sent:min(sent + chunk_size, limit)]
+        yield chunk
+        sent += len(chunk)
+        if plan.bandwidth:
+            delay = started + sent / plan.bandwidth - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+    if plan.reset:
+        logging.info(f"故障注入: {name} 在发送 {sent}/{len(body)} 字节后中断连接")
+        raise ConnectionResetError("故障注入: 连接中断")
+
+
+_registry: Optional[FaultRegistry] = None
+
+def get_fault_registry() -> FaultRegistry:
+    """API 进程共享的故障注入配置注册表"""
+    global _registry
+    if _registry is None:
+        _registry = FaultRegistry(get_mock_data_service())
+    return _registry
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+from app.core.errors.http_errors import HTTPError
+from app.core.schemas.request_schema import HTTPRequestSchema
+from app.core.utils.latency_histogram import LatencyHistogram
+from app.core.utils.request_helper import send_http_request
+
+class LoadTestRunner:
+    """
+    负载测试执行器
+
+    - open 模型：按固定速率发起请求，与响应快慢无关。延迟从计划发送时刻起算，
+      发送调度落后时等待时间计入延迟，以校正协调遗漏（coordinated omission）。
+    - closed 模型：固定数量的并发工作协程，每个收到响应后立即发起下一个请求。
+
+    测试期间禁用缓存、请求合并与重试，每次调用都真实到达上游。
+    """
+
+    def __init__(
+        self,
+        request: HTTPRequestSchema,
+        duration: float,
+        mode: str = "closed",
+        rate: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        max_in_flight: int = 1000,
+        timeout: float = 5.0
+    ):
+        if mode == "open" and not rate:
+            raise ValueError("open 模型需要指定 rate")
+        self.mode = mode
+        self.duration = duration
+        self.rate = rate
+        self.concurrency = concurrency or 1
+        self.max_in_flight = max_in_flight
+        self._request_kwargs = {
+            **request.to_request_kwargs(),
+            "timeout": timeout,
+            "retries": 0,
+            "cache_mode": "bypass",
+            "coalesce": False,
+        }
+        self._histogram = LatencyHistogram()
+        self._timeline: Dict[int, Dict[str, Any]] = {}
+        self._errors: Dict[str, int] = {}
+        self._successes = 0
+        self._started = 0.0
+
+    async def run(self) -> Dict[str, Any]:
+        """执行负载测试并返回报告"""
+        logging.info(
+            f"负载测试开始: {self.mode} 模型, 时长 {self.duration}s, "
+            f"速率 {self.rate}, 并发 {self.concurrency}"
+        )
+        self._started = time.perf_counter()
+        if self.mode == "open":
+            await self._run_open()
+        else:
+            await self._run_closed()
+        report = self.report(time.perf_counter() - self._started)
+        logging.info(f"负载测试完成: {report['requests']} 请求, {report['rps']} RPS")
+        return report
+
+    async def _run_open(self) -> None:
+        interval = 1 / self.rate
+        in_flight: Set[asyncio.Task] = set()
+        sent = 0
+        while True:
+            intended = self._started + sent * interval
+            if intended - self._started >= self.duration:
+                break
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if len(in_flight) >= self.max_in_flight:
+                # 客户端自身饱和：记为错误而不是无限堆积任务
+                self._record(intended, None, "client_saturated")
+            else:
+                task = asyncio.create_task(self._issue(intended))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            sent += 1
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def _run_closed(self) -> None:
+        deadline = self._started + self.duration
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                await self._issue(time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def _issue(self, intended_start: float) -> None:
+        """发送一次请求并记录从计划时刻起算的延迟"""
+        error = None
+        try:
+            await send_http_request(**self._request_kwargs)
+        except HTTPError as e:
+            error = e.error_code or f"http_{e.status_code}"
+        except Exception as e:
+            error = type(e).__name__
+        self._record(intended_start, time.perf_counter() - intended_start, error)
+
+    def _record(self, intended_start: float, latency: Optional[float], error: Optional[str]) -> None:
+        second = int(intended_start - self._started)
+        bucket = self._timeline.get(second)
+        if bucket is None:
+            bucket = self._timeline[second] = {
+                "requests": 0, "errors": 0, "histogram": LatencyHistogram()
+            }
+        bucket["requests"] += 1
+        if error:
+            bucket["errors"] += 1
+            self._errors[error] = self._errors.get(error, 0) + 1
+        else:
+            self._successes += 1
+        if latency is not None:
+            self._histogram.record(latency)
+            bucket["histogram"].record(latency)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """生成测试报告"""
+        requests = self._successes + sum(self._errors.values())
+        timeline = []
+        for second in sorted(self._timeline):
+            bucket = self._timeline[second]
+            summary = bucket["histogram"].summary((50, 99))
+            timeline.append({
+                "second": second,
+                "requests": bucket["requests"],
+                "errors": bucket["errors"],
+                "p50_ms": summary["p50_ms"],
+                "p99_ms": summary["p99_ms"],
+            })
+        return {
+            "mode": self.mode,
+            "duration_s": round(elapsed, 3),
+            "requests": requests,
+            "successes": self._successes,
+            "errors": dict(self._errors),
+            "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+            "latency": self._histogram.summary(),
+            "timeline": timeline,
+        }
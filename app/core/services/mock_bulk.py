@@ -0,0 +1,210 @@
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.services.mock_data_service import INTERNAL_KEY_PREFIX, MockDataService, is_internal_key
+from app.core.services.mock_journal import make_entry
+
+CONFLICT_MODES = ("upsert", "skip")
+
+# 导入报告中最多保留的错误明细条数
+_MAX_REPORTED_ERRORS = 100
+
+
+class LineSplitter:
+    """
+    把任意切分的字节块还原为完整的行，只缓存最后一个未完成的行
+
+    超过 max_line_bytes 的行不再缓存：已缓存的部分立即丢弃，其余字节跳过到
+    下一个换行符，该行以 None 返回（由导入器记为失败），内存占用因此有上界。
+    """
+
+    def __init__(self, max_line_bytes: Optional[int] = None):
+        self.max_line_bytes = max_line_bytes
+        self._tail = b""
+        self._discarding = False
+
+    def feed(self, chunk: bytes) -> List[Optional[bytes]]:
+        lines: List[Optional[bytes]] = []
+        if self._discarding:
+            end = chunk.find(b"\n")
+            if end < 0:
+                return lines
+            lines.append(None)
+            self._discarding = False
+            chunk = chunk[end + 1:]
+        parts = (self._tail + chunk).split(b"\n")
+        self._tail = parts.pop()
+        limit = self.max_line_bytes
+        lines.extend(None if limit is not None and len(line) > limit else line for line in parts)
+        if limit is not None and len(self._tail) > limit:
+            self._tail = b""
+            self._discarding = True
+        return lines
+
+    def close(self) -> List[Optional[bytes]]:
+        if self._discarding:
+            self._discarding = False
+            return [None]
+        tail, self._tail = self._tail, b""
+        return [tail] if tail.strip() else []
+
+
+class BulkImporter:
+    """
+    NDJSON 批量导入
+
+    每行一个对象 ``{"key": ..., "data": ..., "tags": [...]}``，逐行解析后按
+    ``batch_size`` 攒批，每批通过 ``MockDataService.put_entries`` 在一个事务中
+    写入；全部完成后只压缩（持久化快照）一次。内存占用只与批大小有关，与
+    导入总量无关。
+
+    on_conflict 为 upsert 时覆盖已有 key；为 skip 时保留已有条目。同一批中
+    重复的 key 按相同语义处理（upsert 取最后一行，skip 取第一行）。无效的行
+    （包括内部状态的保留 key）计入 errors 并继续导入。
+    """
+
+    def __init__(
+        self,
+        service: MockDataService,
+        on_conflict: str = "upsert",
+        batch_size: int = 1000,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        if on_conflict not in CONFLICT_MODES:
+            raise ValueError(f"无效的冲突处理方式: {on_conflict}")
+        self.service = service
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size
+        self.progress = progress
+        self._batch: Dict[str, Dict[str, Any]] = {}
+        self._line_no = 0
+        self._started = time.perf_counter()
+        self.stats: Dict[str, Any] = {"lines": 0, "written": 0, "skipped": 0, "failed": 0, "errors": []}
+
+    def _error(self, message: str) -> None:
+        self.stats["failed"] += 1
+        if len(self.stats["errors"]) < _MAX_REPORTED_ERRORS:
+            self.stats["errors"].append({"line": self._line_no, "error": message})
+
+    def feed_line(self, line: Optional[bytes]) -> None:
+        """解析一行并加入当前批次，批次满时写入；None 表示被 LineSplitter 丢弃的超长行"""
+        self._line_no += 1
+        if line is None:
+            self.stats["lines"] += 1
+            self._error("行超过最大长度，已丢弃")
+            return
+        if not line.strip():
+            return
+        self.stats["lines"] += 1
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self._error(f"无效的 JSON: {e}")
+            return
+        if not isinstance(record, dict) or not isinstance(record.get("key"), str) or not record["key"]:
+            self._error("缺少字符串类型的 key")
+            return
+        if is_internal_key(record["key"]):
+            self._error(f"以 '{INTERNAL_KEY_PREFIX}' 开头的 key 保留给内部状态")
+            return
+        if "data" not in record:
+            self._error("缺少 data")
+            return
+        tags = record.get("tags") or []
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            self._error("tags 必须为字符串列表")
+            return
+
+        key = record["key"]
+        if key in self._batch:
+            if self.on_conflict == "skip":
+                self.stats["skipped"] += 1
+                return
+            del self._batch[key]
+        self._batch[key] = make_entry(record["data"], tags)
+        if len(self._batch) >= self.batch_size:
+            self._flush_batch()
+
+    def feed(self, lines: Iterable[Optional[bytes]]) -> None:
+        for line in lines:
+            self.feed_line(line)
+
+    def _flush_batch(self) -> None:
+        items: List[Tuple[str, Dict[str, Any]]] = list(self._batch.items())
+        self._batch = {}
+        if self.on_conflict == "skip":
+            fresh = [(key, entry) for key, entry in items if not self.service.contains(key)]
+            self.stats["skipped"] += len(items) - len(fresh)
+            items = fresh
+        self.stats["written"] += self.service.put_entries(items)
+        if self.progress is not None:
+            self.progress(self.snapshot())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前进度（不含错误明细）"""
+        elapsed = time.perf_counter() - self._started
+        return {
+            "lines": self.stats["lines"],
+            "written": self.stats["written"],
+            "skipped": self.stats["skipped"],
+            "failed": self.stats["failed"],
+            "elapsed": round(elapsed, 3),
+            "rate": round(self.stats["written"] / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """写入剩余批次并持久化一次，返回导入报告"""
+        if self._batch:
+            self._flush_batch()
+        if self.stats["written"]:
+            self.service.save_data()
+        report = {**self.snapshot(), "errors": self.stats["errors"]}
+        logging.info(
+            f"批量导入完成: 写入 {report['written']}，跳过 {report['skipped']}，"
+            f"失败 {report['failed']}，耗时 {report['elapsed']}s"
+        )
+        return report
+
+
+def import_ndjson(
+    service: MockDataService,
+    chunks: Iterable[bytes],
+    on_conflict: str = "upsert",
+    batch_size: int = 1000,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    max_line_bytes: Optional[int] = None
+) -> Dict[str, Any]:
+    """从字节块流（如文件）导入 NDJSON，返回导入报告"""
+    importer = BulkImporter(service, on_conflict, batch_size, progress)
+    splitter = LineSplitter(max_line_bytes)
+    for chunk in chunks:
+        importer.feed(splitter.feed(chunk))
+    importer.feed(splitter.close())
+    return importer.finish()
+
+
+def export_ndjson(
+    service: MockDataService,
+    prefix: str = "",
+    tag: Optional[str] = None,
+    page_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    按 key 升序逐行导出为 NDJSON（格式与导入一致，另含 updated_at）
+
+    通过游标分页读取，任意时刻只持有一页 key。内部状态的保留 key 不导出。
+    """
+    after = None
+    while True:
+        keys = service.list_mock_keys(prefix=prefix, tag=tag, after=after, limit=page_size, include_internal=False)
+        for key in keys:
+            entry = service.get_mock_entry(key)
+            if entry is None:  # 分页期间被删除
+                continue
+            record = {"key": key, "data": entry["data"], "tags": entry["tags"], "updated_at": entry["updated_at"]}
+            yield json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        if len(keys) < page_size:
+            return
+        after = keys[-1]
@@ -1,58 +1,299 @@
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+import gzip
+import hashlib
 import json
-import os
+import sqlite3
+
+from app.core.config import settings
+from app.core.services.mock_journal import make_entry
+from app.core.services.mock_storage import (
+    HotEntryCache,
+    JournalBackend,
+    MockStorageBackend,
+    create_storage_backend,
+)
+
+# Mock 数据通过该前缀的标签绑定故障注入配置，如 "fault:slow-upstream"
+FAULT_TAG_PREFIX = "fault:"
+# 以该前缀开头的 key 保留给内部状态（__rules__/、__recordings__/、__profiles__/），
+# 只能通过各自的接口读写，/mock/data 与批量导入导出不可见也不可写
+INTERNAL_KEY_PREFIX = "__"
+# 内部 key 在排序中连续，分页遇到时直接跳到该段之后
+_INTERNAL_KEY_END = INTERNAL_KEY_PREFIX + "\U0010ffff"
+
+def is_internal_key(key: str) -> bool:
+    """key 是否属于内部状态的保留命名空间"""
+    return key.startswith(INTERNAL_KEY_PREFIX)
+
+def fault_profile_from_tags(tags: List[str]) -> Optional[str]:
+    """从条目标签中取出绑定的故障注入配置名称"""
+    for tag in tags:
+        if tag.startswith(FAULT_TAG_PREFIX):
+            return tag[len(FAULT_TAG_PREFIX):]
+    return None
+
+def with_fault_tag(tags: List[str], profile: Optional[str]) -> List[str]:
+    """替换标签中的故障注入配置绑定；profile 为空时解除绑定"""
+    tags = [tag for tag in tags if not tag.startswith(FAULT_TAG_PREFIX)]
+    if profile:
+        tags.append(FAULT_TAG_PREFIX + profile)
+    return tags
+
+class MockRepresentation:
+    """
+    条目的预序列化响应：JSON 字节、可选的 gzip 变体与强 ETag
+
+    强 ETag 须对每个表示唯一，gzip 变体使用带 ``-gzip`` 后缀的 ``gzip_etag``。
+    写入时生成一次，读取时直接发送，无需重复序列化或压缩。``updated_at``
+    用于校验其是否仍对应当前条目，``fault_profile`` 为绑定的故障注入配置。
+    """
+
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag", "updated_at", "fault_profile")
+
+    def __init__(self, entry: Dict[str, Any], gzip_min_bytes: int = 512):
+        data = entry["data"]
+        self.updated_at = entry["updated_at"]
+        self.fault_profile = fault_profile_from_tags(entry["tags"])
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+        self.gzip_body: Optional[bytes] = None
+        if len(self.body) >= gzip_min_bytes:
+            packed = gzip.compress(self.body, compresslevel=6, mtime=0)
+            if len(packed) < len(self.body):
+                self.gzip_body = packed
 
 class MockDataService:
-    def __init__(self, db_path: str = "mock_data.json"):
+    def __init__(
+        self,
+        db_path: str = "mock_data.json",
+        fsync_batch: int = 64,
+        backend: Optional[str] = None,
+        hot_cache_size: int = 1024,
+        gzip_min_bytes: int = 512,
+        watch: bool = True
+    ):
+        """
+        Args:
+            db_path: 数据文件路径；.db/.sqlite 后缀默认使用 SQLite 后端
+            fsync_batch: 日志后端每批 fsync 的记录数
+            backend: 显式指定后端（"journal" 或 "sqlite"）
+            hot_cache_size: 非内存后端前置热点缓存与预序列化响应缓存的最大条目数
+            gzip_min_bytes: 预先生成 gzip 变体的最小响应体大小
+            watch: 是否监视数据文件，在后台载入其他进程的写入
+        """
         self.db_path = db_path
-        self._mock_data = {}
+        self._backend_name = backend
+        self._fsync_batch = fsync_batch
+        self._backend: Optional[MockStorageBackend] = None
+        self._hot_cache = HotEntryCache(hot_cache_size)
+        self._representations = HotEntryCache(hot_cache_size)
+        self.gzip_min_bytes = gzip_min_bytes
+        self.watch = watch
+        self._listeners: List[Callable[[Optional[Set[str]]], None]] = []
         self.load_data()
 
     def load_data(self) -> None:
-        """从JSON文件加载数据，处理多种异常情况"""
+        """打开存储后端，处理多种异常情况"""
         try:
-            with open(self.db_path, 'r') as f:
-                self._mock_data = json.load(f)
-        except FileNotFoundError:
-            self._mock_data = {}
-        except (json.JSONDecodeError, IOError) as e:
-            # 处理文件损坏或不可读的情况
-            self._mock_data = {}
+            self._backend = create_storage_backend(
+                self.db_path, self._backend_name, fsync_batch=self._fsync_batch, watch=self.watch
+            )
+        except (json.JSONDecodeError, IOError, sqlite3.DatabaseError) as e:
+            # 处理文件损坏或不可读的情况：改用新文件，避免覆盖损坏的原文件
             self._log_error(f"数据加载失败: {str(e)}")
+            self._backend = JournalBackend(self.db_path + ".recovered", fsync_batch=self._fsync_batch)
+        self._backend.add_listener(self._on_external_change)
+        self._hot_cache.clear()
+        self._representations.clear()
+
+    def _on_external_change(self, keys: Optional[Set[str]]) -> None:
+        """其他进程写入或批量导入了数据：失效本地缓存并转发给监听者"""
+        if keys is None:
+            self._hot_cache.clear()
+            self._representations.clear()
+        else:
+            for key in keys:
+                self._hot_cache.invalidate(key)
+                self._representations.invalidate(key)
+        for callback in self._listeners:
+            callback(keys)
+
+    def add_change_listener(self, callback: Callable[[Optional[Set[str]]], None]) -> None:
+        """注册其他进程写入后的回调；参数为变更的 key 集合，None 表示可能全部变更"""
+        self._listeners.append(callback)
 
     def save_data(self) -> None:
-        """将数据保存到JSON文件，添加错误处理"""
+        """立即压缩存储（日志后端写新快照，SQLite 执行 WAL 检查点）"""
         try:
-            with open(self.db_path, 'w') as f:
-                json.dump(self._mock_data, f, indent=4)
-        except IOError as e:
+            self._backend.compact()
+        except (IOError, sqlite3.Error) as e:
             self._log_error(f"数据保存失败: {str(e)}")
 
+    def _get_entry(self, key: str, cached_only: bool = False) -> Optional[Dict[str, Any]]:
+        if self._backend.in_memory:
+            return self._backend.get(key)
+        entry = self._hot_cache.get(key)
+        if entry is None and not cached_only:
+            entry = self._backend.get(key)
+            if entry is not None:
+                self._hot_cache.put(key, entry)
+        return entry
+
+    def _put_entry(self, key: str, entry: Dict[str, Any]) -> None:
+        try:
+            self._backend.put(key, entry)
+        except (IOError, sqlite3.Error) as e:
+            self._log_error(f"数据保存失败: {str(e)}")
+        self._hot_cache.invalidate(key)
+        self._representations.put(key, MockRepresentation(entry, self.gzip_min_bytes))
+
     def get_mock_data(self, key: str) -> Dict[str, Any]:
         """获取指定key的mock数据"""
-        return self._mock_data.get(key)
+        entry = self._get_entry(key)
+        return entry["data"] if entry is not None else None
+
+    def get_mock_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取包含标签与更新时间的完整条目"""
+        return self._get_entry(key)
+
+    def get_representation(self, key: str, cached_only: bool = False) -> Optional[MockRepresentation]:
+        """
+        获取条目的预序列化响应；启动后首次读取或被其他进程更新的条目在此时生成一次
+
+        cached_only 为 True 时不访问磁盘（只读内存后端或热点缓存），未命中返回None，
+        供事件循环中的快速路径使用。
+        """
+        entry = self._get_entry(key, cached_only)
+        if entry is None:
+            return None
+        representation = self._representations.get(key)
+        if representation is None or representation.updated_at != entry["updated_at"]:
+            representation = MockRepresentation(entry, self.gzip_min_bytes)
+            self._representations.put(key, representation)
+        return representation
 
-    def create_mock_data(self, key: str, data: Dict) -> None:
+    def create_mock_data(self, key: str, data: Dict, tags: Optional[List[str]] = None) -> None:
         """创建新的mock数据，确保key唯一"""
-        if key in self._mock_data:
+        if self._backend.contains(key):
             raise ValueError(f"Key '{key}' 已存在")
-        self._mock_data[key] = data
-        self.save_data()
+        self._put_entry(key, make_entry(data, tags))
 
-    def update_mock_data(self, key: str, data: Dict) -> None:
-        """更新现有mock数据"""
-        if key not in self._mock_data:
+    def update_mock_data(self, key: str, data: Dict, tags: Optional[List[str]] = None) -> None:
+        """更新现有mock数据；tags 为 None 时保留原标签"""
+        entry = self._get_entry(key)
+        if entry is None:
             raise KeyError(f"Key '{key}' 不存在")
-        self._mock_data[key] = data
-        self.save_data()
+        self._put_entry(key, make_entry(data, entry["tags"] if tags is None else tags))
+
+    def contains(self, key: str) -> bool:
+        """key 是否存在（不读取数据）"""
+        return self._backend.contains(key)
+
+    def put_entries(self, items: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        在一个事务中批量写入条目（已存在则覆盖），返回写入条数
+
+        日志后端整批只追加一次日志并发布一个新版本，SQLite 后端整批在一个事务内提交。
+        写入后按 key 失效本地缓存，并通知监听者（规则、故障注入配置等随之刷新）。
+        """
+        if not items:
+            return 0
+        try:
+            count = self._backend.put_many(items)
+        except (IOError, sqlite3.Error) as e:
+            self._log_error(f"数据保存失败: {str(e)}")
+            raise
+        self._on_external_change({key for key, _ in items})
+        return count
 
     def delete_mock_data(self, key: str) -> None:
         """删除指定mock数据"""
-        if key not in self._mock_data:
+        try:
+            deleted = self._backend.delete(key)
+        except (IOError, sqlite3.Error) as e:
+            self._log_error(f"数据保存失败: {str(e)}")
+            deleted = True
+        self._hot_cache.invalidate(key)
+        self._representations.invalidate(key)
+        if not deleted:
             raise KeyError(f"Key '{key}' 不存在")
-        del self._mock_data[key]
-        self.save_data()
+
+    def list_mock_keys(
+        self,
+        prefix: str = "",
+        tag: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+        include_internal: bool = True
+    ) -> List[str]:
+        """
+        按 key 升序分页列出
+
+        Args:
+            prefix: key 前缀
+            tag: 仅列出带该标签的条目
+            after: 上一页最后一个 key（游标）
+            limit: 每页条数
+            include_internal: 是否包含内部状态的保留 key
+        """
+        if include_internal:
+            return self._backend.list_keys(prefix=prefix, tag=tag, after=after, limit=limit)
+        keys: List[str] = []
+        while len(keys) < limit:
+            wanted = limit - len(keys)
+            page = self._backend.list_keys(prefix=prefix, tag=tag, after=after, limit=wanted)
+            keys.extend(key for key in page if not is_internal_key(key))
+            if len(page) < wanted:
+                break
+            after = page[-1]
+            if is_internal_key(after):
+                after = max(after, _INTERNAL_KEY_END)
+        return keys
+
+    def list_recent(self, since: Optional[float] = None, limit: int = 100) -> List[Tuple[str, float]]:
+        """按更新时间倒序列出 (key, updated_at)"""
+        return self._backend.list_recent(since=since, limit=limit)
+
+    def count(self) -> int:
+        """条目总数"""
+        return self._backend.count()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """存储后端与热点缓存统计"""
+        return {
+            "backend": type(self._backend).__name__,
+            "entries": self._backend.count(),
+            "hot_cache_hits": self._hot_cache.hits,
+            "hot_cache_misses": self._hot_cache.misses,
+        }
+
+    def close(self) -> None:
+        """落盘待写数据并关闭后端"""
+        self._backend.close()
 
     def _log_error(self, message: str) -> None:
         """统一错误日志记录"""
-        print(f"ERROR: {message}")  # 可替换为实际日志系统
\ No newline at end of file
+        print(f"ERROR: {message}")  # 可替换为实际日志系统
+
+
+_service: Optional[MockDataService] = None
+
+def get_mock_data_service() -> MockDataService:
+    """API 进程共享的 MockDataService（首次使用时按配置创建）"""
+    global _service
+    if _service is None:
+        _service = MockDataService(
+            settings.MOCK_DB_PATH,
+            hot_cache_size=settings.MOCK_HOT_CACHE_SIZE,
+            gzip_min_bytes=settings.MOCK_GZIP_MIN_BYTES
+        )
+    return _service
+
+def close_mock_data_service() -> None:
+    """关闭共享的 MockDataService（如已创建）"""
+    global _service
+    if _service is not None:
+        _service.close()
+        _service = None
@@ -0,0 +1,330 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, IO, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows：退化为单进程语义
+    fcntl = None
+
+SNAPSHOT_FORMAT = 2
+
+def make_entry(data: Any, tags: Optional[List[str]] = None, updated_at: Optional[float] = None) -> Dict[str, Any]:
+    """构建存储条目：数据、标签与更新时间"""
+    return {
+        "data": data,
+        "tags": sorted(set(tags or [])),
+        "updated_at": time.time() if updated_at is None else updated_at,
+    }
+
+class JournalStore:
+    """
+    快照 + 追加日志（write-ahead journal）持久化
+
+    - 每次变更向 ``<快照>.journal`` 追加一行 JSON 记录并立即写入内核缓冲，
+      按条数或时间批量 fsync；
+    - 多进程共享同一组文件：写入与轮转在 ``<快照>.lock`` 文件锁内进行，
+      每个进程记录已应用到的日志字节偏移，通过 ``read_new`` 增量读取其他
+      进程追加的记录；日志被其他进程轮转（inode 变化）时需要整体重新加载；
+    - 日志超过阈值时压缩：先轮转日志为 ``.journal.old``，后台线程把数据
+      写入临时文件并原子替换快照，成功后删除旧日志。同一时刻只有一个进程
+      能持有 ``<快照>.compact.lock`` 进行压缩；
+    - 加载时依次回放 快照 → ``.journal.old`` → ``.journal``，记录均为幂等的
+      put/delete，压缩中途崩溃也能恢复；日志中被截断的半行会被忽略。
+    """
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        fsync_batch: int = 64,
+        fsync_interval: float = 0.05,
+        compact_min_bytes: int = 4 * 1024 * 1024
+    ):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + ".journal"
+        self.rotated_path = snapshot_path + ".journal.old"
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_min_bytes = compact_min_bytes
+
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file = open(snapshot_path + ".lock", "ab")
+        self._compact_lock_file = open(snapshot_path + ".compact.lock", "ab")
+        self._journal: Optional[IO[bytes]] = None
+        self._journal_ino: Optional[int] = None
+        self._offset = 0
+        self._snapshot_bytes = 0
+        self._pending = 0
+        self._compacting: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="journal-fsync", daemon=True)
+        self._flusher.start()
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """进程内可重入、跨进程互斥的存储锁"""
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    # ---------- 加载 ----------
+    def load(self) -> Dict[str, Any]:
+        """回放快照与日志，返回 key -> 条目 的完整字典"""
+        with self.lock():
+            data = self._read_snapshot()
+            self._replay(self.rotated_path, data)
+            self._open_journal()
+            self._offset = 0
+            for record in self._read_records():
+                self.apply(data, record)
+            return data
+
+    def _read_snapshot(self) -> Dict[str, Any]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._snapshot_bytes = os.path.getsize(self.snapshot_path)
+        except FileNotFoundError:
+            return {}
+        if snapshot.get("__format__") == SNAPSHOT_FORMAT:
+            return snapshot["entries"]
+        # 旧版快照为 key -> data 的平铺字典
+        return {key: make_entry(data) for key, data in snapshot.items()}
+
+    def _replay(self, path: str, data: Dict[str, Any]) -> None:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            for record in self._parse_lines(path, f.read()):
+                self.apply(data, record)
+
+    @staticmethod
+    def _parse_lines(path: str, chunk: bytes) -> List[Dict[str, Any]]:
+        records = []
+        for line in chunk.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logging.warning(f"日志 {path} 中有不完整的记录，已忽略")
+        return records
+
+    @staticmethod
+    def apply(entries: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """把一条日志记录应用到条目字典上"""
+        change = JournalStore.record_change(record)
+        if change is None:
+            return
+        key, entry = change
+        if entry is not None:
+            entries[key] = entry
+        else:
+            entries.pop(key, None)
+
+    @staticmethod
+    def record_change(record: Dict[str, Any]) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+        """日志记录对应的变更 (key, 条目)，条目为None表示删除；未知记录返回None"""
+        if record.get("op") == "put":
+            entry = record.get("entry")
+            return record["key"], entry if entry is not None else make_entry(record.get("data"))
+        if record.get("op") == "delete":
+            return record["key"], None
+        return None
+
+    def _open_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, "ab")
+        self._journal_ino = os.fstat(self._journal.fileno()).st_ino
+        if self._journal.tell() and not self._ends_with_newline():
+            # 崩溃留下的半行：补换行，避免后续记录与其拼接
+            self._journal.write(b"\n")
+            self._journal.flush()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.journal_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    # ---------- 增量同步 ----------
+    def _read_records(self) -> List[Dict[str, Any]]:
+        """从已应用偏移处读取完整的新记录并推进偏移"""
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        self._offset += end
+        return self._parse_lines(self.journal_path, chunk[:end])
+
+    def read_new(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取其他进程追加的新记录（需持有 ``lock``）
+
+        Returns:
+            新记录列表；日志已被其他进程轮转时返回None，调用方应重新 ``load``
+        """
+        with self.lock():
+            try:
+                if os.stat(self.journal_path).st_ino != self._journal_ino:
+                    return None
+            except FileNotFoundError:
+                return None
+            if os.path.getsize(self.journal_path) <= self._offset:
+                return []
+            return self._read_records()
+
+    # ---------- 写入 ----------
+    def append(self, op: str, key: str, entry: Optional[Dict[str, Any]] = None) -> None:
+        """追加一条变更记录"""
+        record = {"op": op, "key": key}
+        if op == "put":
+            record["entry"] = entry
+        self.append_lines([json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"])
+
+    def append_lines(self, lines: List[str]) -> None:
+        """追加已序列化的记录行（调用方需先在同一锁内通过 ``read_new`` 追平）"""
+        with self.lock():
+            payload = "".join(lines).encode("utf-8")
+            if os.fstat(self._journal.fileno()).st_size > self._offset:
+                # 末尾有其他进程崩溃留下的半行：先补换行再写
+                payload = b"\n" + payload
+            self._journal.write(payload)
+            self._journal.flush()
+            self._offset = self._journal.tell()
+            self._pending += len(lines)
+            if self._pending >= self.fsync_batch:
+                self._sync()
+
+    def _sync(self) -> None:
+        if self._journal is None or not self._pending:
+            return
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending = 0
+
+    def _flush_loop(self) -> None:
+        """后台定时 fsync，保证批量未满时数据也能及时落盘"""
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                try:
+                    self._sync()
+                except (OSError, ValueError) as e:
+                    logging.error(f"日志 fsync 失败: {e}")
+
+    def flush(self) -> None:
+        """立即把待写记录落盘"""
+        with self._lock:
+            self._sync()
+
+    # ---------- 压缩 ----------
+    def needs_compaction(self) -> bool:
+        """日志大小超过阈值（且不小于快照大小）时需要压缩"""
+        return (
+            self._compacting is None
+            and self._offset > max(self.compact_min_bytes, self._snapshot_bytes)
+        )
+
+    def _try_compact_lock(self) -> bool:
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self._compact_lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _release_compact_lock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._compact_lock_file.fileno(), fcntl.LOCK_UN)
+
+    def compact(self, data: Mapping[str, Any], background: bool = True) -> None:
+        """
+        轮转日志并把数据写成新快照（调用方需在同一锁内追平后传入数据）
+
+        Args:
+            data: 当前全部条目（调用方保证之后不再修改）
+            background: 是否在后台线程中写快照
+        """
+        with self.lock():
+            if self._compacting is not None or not self._try_compact_lock():
+                return
+            self._sync()
+            self._journal.close()
+            self._journal = None
+            if os.path.exists(self.rotated_path):
+                # 上一次压缩崩溃遗留：把当前日志并入旧日志一起压缩
+                with open(self.rotated_path, "ab") as old, open(self.journal_path, "rb") as current:
+                    old.write(current.read())
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, self.rotated_path)
+            self._open_journal()
+            self._offset = 0
+            self._compacting = threading.Thread(
+                target=self._write_snapshot, args=(data,), name="journal-compact", daemon=True
+            )
+
+        if background:
+            self._compacting.start()
+        else:
+            self._compacting.run()
+
+    def _write_snapshot(self, data: Mapping[str, Any]) -> None:
+        started = time.perf_counter()
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            # 传入的可能是持久化映射：在后台线程中物化为字典再序列化
+            entries = data if isinstance(data, dict) else dict(data.items())
+            # json.dump 写文件时走纯 Python 编码器，先用 C 编码器整体序列化快得多
+            payload = json.dumps(
+                {"__format__": SNAPSHOT_FORMAT, "entries": entries},
+                ensure_ascii=False, separators=(",", ":")
+            )
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+                del payload
+                f.flush()
+                os.fsync(f.fileno())
+            with self.lock():
+                os.replace(tmp_path, self.snapshot_path)
+                os.remove(self.rotated_path)
+            self._snapshot_bytes = os.path.getsize(self.snapshot_path)
+            logging.info(
+                f"快照压缩完成: {len(data)} 条, {self._snapshot_bytes} 字节, "
+                f"耗时 {time.perf_counter() - started:.2f}s"
+            )
+        except OSError as e:
+            logging.error(f"快照压缩失败，保留旧日志: {e}")
+        finally:
+            self._release_compact_lock()
+            with self._lock:
+                self._compacting = None
+
+    def close(self) -> None:
+        """落盘并关闭日志"""
+        self._closed.set()
+        compacting = self._compacting
+        if compacting is not None and compacting.is_alive():
+            compacting.join()
+        with self._lock:
+            if self._journal is not None:
+                self._sync()
+                self._journal.close()
+                self._journal = None
+            self._lock_file.close()
+            self._compact_lock_file.close()
@@ -0,0 +1,191 @@
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from app.core.services.mock_data_service import MockDataService, get_mock_data_service
+from app.core.utils.route_matcher import CompiledRule, RouteTrie
+
+# 规则作为普通条目存放在 MockDataService 中
+RULE_KEY_PREFIX = "__rules__/"
+RULE_TAG = "mock_rule"
+
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*|\*)\}")
+
+def has_placeholders(value: Any) -> bool:
+    """模板中是否含有 ``{name}`` 占位符"""
+    if isinstance(value, str):
+        return _PLACEHOLDER.search(value) is not None
+    if isinstance(value, dict):
+        return any(has_placeholders(item) for item in value.values())
+    if isinstance(value, list):
+        return any(has_placeholders(item) for item in value)
+    return False
+
+def render_template(value: Any, params: Mapping[str, str]) -> Any:
+    """把字符串中的 ``{name}`` 替换为路径参数，未知参数保持原样"""
+    if isinstance(value, str):
+        return _PLACEHOLDER.sub(lambda m: params.get(m.group(1), m.group(0)), value)
+    if isinstance(value, dict):
+        return {key: render_template(item, params) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render_template(item, params) for item in value]
+    return value
+
+def encode_body(body: Any) -> Tuple[bytes, str]:
+    """序列化响应体：字符串按原文发送，其余按 JSON"""
+    if isinstance(body, str):
+        return body.encode("utf-8"), "text/plain; charset=utf-8"
+    return (
+        json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        "application/json"
+    )
+
+
+class RuleResponse:
+    """编译后的规则响应；不含占位符的响应体在编译时预先序列化"""
+
+    __slots__ = ("status_code", "headers", "content_type", "body", "static", "fault_profile")
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Dict[str, str],
+        body: Any,
+        fault_profile: Optional[str] = None
+    ):
+        self.status_code = status_code
+        self.fault_profile = fault_profile
+        self.headers = {name: value for name, value in headers.items() if name.lower() != "content-type"}
+        self.content_type = next(
+            (value for name, value in headers.items() if name.lower() == "content-type"), None
+        )
+        self.body = body
+        self.static = None if has_placeholders(body) else encode_body(body)
+
+    def render(self, params: Mapping[str, str]) -> Tuple[bytes, str]:
+        """返回 (响应体字节, Content-Type)"""
+        body, content_type = self.static or encode_body(render_template(self.body, params))
+        return body, self.content_type or content_type
+
+
+class MockRuleEngine:
+    """
+    声明式 Mock 规则引擎
+
+    规则持久化在 MockDataService 中（key 前缀 ``__rules__/``），启动时编译进
+    RouteTrie；之后的增删改只增量更新受影响的树节点。其他进程修改规则时
+    在后台重新编译并原子替换整棵树。
+    """
+
+    def __init__(self, service: MockDataService):
+        self.service = service
+        self._trie = RouteTrie()
+        self._lock = threading.RLock()
+        self.load()
+        service.add_change_listener(self._on_external_change)
+
+    def _on_external_change(self, keys: Optional[Set[str]]) -> None:
+        if keys is None or any(key.startswith(RULE_KEY_PREFIX) for key in keys):
+            self.load()
+
+    def load(self) -> None:
+        """从存储中加载并编译全部规则"""
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        trie = RouteTrie()
+        after = None
+        while True:
+            keys = self.service.list_mock_keys(prefix=RULE_KEY_PREFIX, after=after, limit=500)
+            for key in keys:
+                rule = self.service.get_mock_data(key)
+                try:
+                    trie.add(self.compile(key[len(RULE_KEY_PREFIX):], rule))
+                except (KeyError, TypeError, ValueError) as e:
+                    logging.error(f"规则 {key} 编译失败，已跳过: {e}")
+            if len(keys) < 500:
+                break
+            after = keys[-1]
+        self._trie = trie
+        logging.info(f"已编译 {len(trie)} 条 Mock 规则")
+
+    @staticmethod
+    def compile(rule_id: str, rule: Dict[str, Any]) -> CompiledRule:
+        """把规则字典编译为 CompiledRule"""
+        response = rule.get("response") or {}
+        return CompiledRule(
+            rule_id,
+            rule.get("method", "*"),
+            rule["path"],
+            priority=rule.get("priority", 0),
+            query=rule.get("query"),
+            headers=rule.get("headers"),
+            payload=RuleResponse(
+                response.get("status_code", 200),
+                response.get("headers") or {},
+                response.get("body"),
+                rule.get("fault_profile")
+            )
+        )
+
+    def get_rule(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        return self.service.get_mock_data(RULE_KEY_PREFIX + rule_id)
+
+    def list_rules(self, after: Optional[str] = None, limit: int = 100) -> List[str]:
+        """按 ID 升序分页列出规则"""
+        keys = self.service.list_mock_keys(
+            prefix=RULE_KEY_PREFIX,
+            after=RULE_KEY_PREFIX + after if after is not None else None,
+            limit=limit
+        )
+        return [key[len(RULE_KEY_PREFIX):] for key in keys]
+
+    def put_rule(self, rule_id: str, rule: Dict[str, Any]) -> bool:
+        """
+        新增或替换规则
+
+        Returns:
+            是否为新建
+        """
+        compiled = self.compile(rule_id, rule)
+        key = RULE_KEY_PREFIX + rule_id
+        with self._lock:
+            created = self.service.get_mock_entry(key) is None
+            if created:
+                self.service.create_mock_data(key, rule, tags=[RULE_TAG])
+            else:
+                self.service.update_mock_data(key, rule)
+            self._trie.add(compiled)
+        return created
+
+    def delete_rule(self, rule_id: str) -> None:
+        """删除规则，不存在时抛出 KeyError"""
+        with self._lock:
+            self.service.delete_mock_data(RULE_KEY_PREFIX + rule_id)
+            self._trie.remove(rule_id)
+
+    def match(
+        self,
+        method: str,
+        path: str,
+        query: Mapping[str, str],
+        headers: Mapping[str, str]
+    ) -> Optional[Tuple[CompiledRule, Dict[str, str]]]:
+        """查找匹配规则，返回 (规则, 路径参数)"""
+        return self._trie.match(method, path, query, headers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"rules": len(self._trie)}
+
+
+_engine: Optional[MockRuleEngine] = None
+
+def get_rule_engine() -> MockRuleEngine:
+    """API 进程共享的规则引擎（首次使用时加载规则）"""
+    global _engine
+    if _engine is None:
+        _engine = MockRuleEngine(get_mock_data_service())
+    return _engine
@@ -0,0 +1,623 @@
+import bisect
+import json
+import logging
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.services.mock_journal import JournalStore
+from app.core.utils.file_watcher import FileWatcher
+
+# 载荷 blob 前缀：j = 紧凑 JSON，z = zlib 压缩后的紧凑 JSON
+_RAW_PREFIX = b"j"
+_ZLIB_PREFIX = b"z"
+
+def encode_blob(data: Any, compress_min_bytes: int = 1024) -> bytes:
+    """把数据序列化为紧凑 blob，较大的载荷使用 zlib 压缩"""
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(raw) >= compress_min_bytes:
+        packed = zlib.compress(raw, 1)
+        if len(packed) < len(raw):
+            return _ZLIB_PREFIX + packed
+    return _RAW_PREFIX + raw
+
+def decode_blob(blob: bytes) -> Any:
+    """还原 encode_blob 生成的数据"""
+    prefix, body = blob[:1], blob[1:]
+    if prefix == _ZLIB_PREFIX:
+        body = zlib.decompress(body)
+    return json.loads(body)
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """前缀扫描的开区间上界（最后一个字符加一）；空前缀时返回None"""
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class MockStorageBackend:
+    """
+    Mock 数据存储后端接口
+
+    条目为 ``{"data": ..., "tags": [...], "updated_at": 时间戳}``。
+    ``in_memory`` 为 True 的后端自身常驻内存，服务层不再额外缓存。
+    其他进程修改了底层文件时，后端通过 ``add_listener`` 注册的回调通知。
+    """
+
+    in_memory = False
+
+    def __init__(self):
+        self._listeners: List[Callable[[Optional[Set[str]]], None]] = []
+
+    def add_listener(self, callback: Callable[[Optional[Set[str]]], None]) -> None:
+        """注册外部变更回调；参数为变更的 key 集合，None 表示可能全部变更"""
+        self._listeners.append(callback)
+
+    def _notify(self, keys: Optional[Set[str]]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(keys)
+            except Exception:
+                logging.exception("存储变更回调执行失败")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def contains(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """批量写入，返回写入条数"""
+        count = 0
+        for key, entry in items:
+            self.put(key, entry)
+            count += 1
+        return count
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def list_keys(
+        self,
+        prefix: str = "",
+        tag: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100
+    ) -> List[str]:
+        """按 key 升序列出，支持前缀、标签过滤与基于 after 的游标分页"""
+        raise NotImplementedError
+
+    def list_recent(self, since: Optional[float] = None, limit: int = 100) -> List[Tuple[str, float]]:
+        """按更新时间倒序列出 (key, updated_at)"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def compact(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SortedEntryMap(Mapping):
+    """
+    按 key 排序的持久化映射
+
+    key 与条目按顺序分块存储（每块约 CHUNK_SIZE 个）。``apply`` 返回新版本：
+    只复制块索引与受影响的块，其余块在新旧版本间共享，单次写入的代价约为
+    O(N / CHUNK_SIZE + CHUNK_SIZE) 次指针复制；查找与有序遍历为 O(log N)。
+    已发布的版本不再修改，可无锁并发读取。
+    """
+
+    CHUNK_SIZE = 512
+
+    __slots__ = ("_maxes", "_keys", "_values", "_length")
+
+    def __init__(
+        self,
+        maxes: Optional[List[str]] = None,
+        keys: Optional[List[List[str]]] = None,
+        values: Optional[List[List[Any]]] = None,
+        length: int = 0
+    ):
+        self._maxes = maxes or []  # 每块最大的 key，用于二分定位块
+        self._keys = keys or []
+        self._values = values or []
+        self._length = length
+
+    @classmethod
+    def from_dict(cls, entries: Dict[str, Any]) -> "SortedEntryMap":
+        keys = sorted(entries)
+        size = cls.CHUNK_SIZE
+        key_chunks = [keys[i:i + size] for i in range(0, len(keys), size)]
+        value_chunks = [[entries[key] for key in chunk] for chunk in key_chunks]
+        return cls([chunk[-1] for chunk in key_chunks], key_chunks, value_chunks, len(keys))
+
+    def _find(self, key: str) -> Tuple[int, int]:
+        """key 所在的 (块下标, 块内下标)；不存在时块下标为 -1"""
+        i = bisect.bisect_left(self._maxes, key)
+        if i < len(self._maxes):
+            chunk = self._keys[i]
+            j = bisect.bisect_left(chunk, key)
+            if chunk[j] == key:
+                return i, j
+        return -1, 0
+
+    def __getitem__(self, key: str) -> Any:
+        i, j = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._values[i][j]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i, j = self._find(key)
+        return self._values[i][j] if i >= 0 else default
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key)[0] >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._keys:
+            yield from chunk
+
+    def __len__(self) -> int:
+        return self._length
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for keys, values in zip(self._keys, self._values):
+            yield from zip(keys, values)
+
+    def iter_from(self, key: str, inclusive: bool = True) -> Iterator[Tuple[str, Any]]:
+        """从 key 起（inclusive 为 False 时不含 key 本身）按升序产出 (key, 条目)"""
+        locate = bisect.bisect_left if inclusive else bisect.bisect_right
+        i = locate(self._maxes, key)
+        if i >= len(self._maxes):
+            return
+        j = locate(self._keys[i], key)
+        for index in range(i, len(self._keys)):
+            keys, values = self._keys[index], self._values[index]
+            for offset in range(j if index == i else 0, len(keys)):
+                yield keys[offset], values[offset]
+
+    def apply(
+        self,
+        changes: Iterable[Tuple[str, Optional[Dict[str, Any]]]]
+    ) -> Tuple["SortedEntryMap", List[bool]]:
+        """
+        应用一批变更（条目为 None 表示删除），不修改当前版本
+
+        Returns:
+            (新版本, 每项是否改变了已有状态)
+        """
+        maxes, keys, values = list(self._maxes), list(self._keys), list(self._values)
+        length = self._length
+        owned: Dict[int, List[str]] = {}  # 本批已复制、可原地修改的块
+        results = []
+
+        def own(index: int) -> Tuple[List[str], List[Any]]:
+            if id(keys[index]) not in owned:
+                keys[index], values[index] = list(keys[index]), list(values[index])
+                owned[id(keys[index])] = keys[index]
+            return keys[index], values[index]
+
+        for key, entry in changes:
+            i = bisect.bisect_left(maxes, key)
+            if entry is None:
+                found = i < len(maxes) and keys[i][bisect.bisect_left(keys[i], key)] == key
+                results.append(found)
+                if not found:
+                    continue
+                chunk_keys, chunk_values = own(i)
+                j = bisect.bisect_left(chunk_keys, key)
+                del chunk_keys[j], chunk_values[j]
+                length -= 1
+                if chunk_keys:
+                    maxes[i] = chunk_keys[-1]
+                else:
+                    del maxes[i], keys[i], values[i]
+                continue
+
+            results.append(True)
+            if not maxes:
+                maxes.append(key)
+                keys.append([key])
+                values.append([entry])
+                owned[id(keys[0])] = keys[0]
+                length += 1
+                continue
+            i = min(i, len(maxes) - 1)  # 大于所有 key 时追加到最后一块
+            chunk_keys, chunk_values = own(i)
+            j = bisect.bisect_left(chunk_keys, key)
+            if j < len(chunk_keys) and chunk_keys[j] == key:
+                chunk_values[j] = entry
+                continue
+            chunk_keys.insert(j, key)
+            chunk_values.insert(j, entry)
+            length += 1
+            maxes[i] = chunk_keys[-1]
+            if len(chunk_keys) > 2 * self.CHUNK_SIZE:
+                half = len(chunk_keys) // 2
+                left_keys, right_keys = chunk_keys[:half], chunk_keys[half:]
+                keys[i:i + 1] = [left_keys, right_keys]
+                values[i:i + 1] = [chunk_values[:half], chunk_values[half:]]
+                maxes[i:i + 1] = [left_keys[-1], right_keys[-1]]
+                owned[id(left_keys)] = left_keys
+                owned[id(right_keys)] = right_keys
+        return SortedEntryMap(maxes, keys, values, length), results
+
+
+class StoreSnapshot:
+    """某一版本的全部条目；发布后不再修改，读取无需加锁"""
+
+    __slots__ = ("entries", "version")
+
+    def __init__(self, entries: SortedEntryMap, version: int):
+        self.entries = entries
+        self.version = version
+
+
+class JournalBackend(MockStorageBackend):
+    """
+    JSON 快照 + 追加日志后端：数据全部常驻内存
+
+    读取只取当前 StoreSnapshot 的引用，不加锁；写入在存储锁内先追平其他
+    进程的日志记录、再应用本次变更，最后原子地发布新版本。条目保存在
+    SortedEntryMap 中，新旧版本共享未修改的块，key 的有序索引随之增量维护。
+    文件监视器发现其他进程追加或轮转日志时在后台增量刷新。
+    """
+
+    in_memory = True
+
+    def __init__(
+        self,
+        path: str,
+        fsync_batch: int = 64,
+        watch: bool = True,
+        compact_min_bytes: int = 4 * 1024 * 1024
+    ):
+        super().__init__()
+        self._store = JournalStore(path, fsync_batch=fsync_batch, compact_min_bytes=compact_min_bytes)
+        self._snapshot = StoreSnapshot(SortedEntryMap.from_dict(self._store.load()), 0)
+        self._watcher: Optional[FileWatcher] = None
+        if watch:
+            self._watcher = FileWatcher([path, self._store.journal_path], self.refresh)
+            self._watcher.start()
+
+    @property
+    def snapshot(self) -> StoreSnapshot:
+        """当前版本的只读视图"""
+        return self._snapshot
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._snapshot.entries.get(key)
+
+    def contains(self, key: str) -> bool:
+        return key in self._snapshot.entries
+
+    def _catch_up(self) -> Tuple[Optional[SortedEntryMap], Optional[Set[str]]]:
+        """
+        在存储锁内追平其他进程的变更
+
+        Returns:
+            (新版本条目，无变更时为None；变更的 key 集合，整体重新加载时为None)
+        """
+        records = self._store.read_new()
+        if records is None:
+            return SortedEntryMap.from_dict(self._store.load()), None
+        changes = [change for change in map(JournalStore.record_change, records) if change is not None]
+        if not changes:
+            return None, set()
+        entries, _ = self._snapshot.entries.apply(changes)
+        return entries, {key for key, _ in changes}
+
+    def _publish(self, entries: SortedEntryMap) -> None:
+        self._snapshot = StoreSnapshot(entries, self._snapshot.version + 1)
+
+    def refresh(self) -> None:
+        """载入其他进程的变更并通知监听者"""
+        with self._store.lock():
+            entries, changed = self._catch_up()
+            if entries is not None:
+                self._publish(entries)
+        if changed is None or changed:
+            self._notify(changed)
+
+    def _commit(self, changes: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[bool]:
+        """应用一批变更（entry 为 None 表示删除），返回每项是否改变了已有状态"""
+        with self._store.lock():
+            entries, changed = self._catch_up()
+            if entries is None:
+                entries = self._snapshot.entries
+            entries, results = entries.apply(changes)
+            lines = []
+            for key, entry in changes:
+                if entry is None:
+                    record = {"op": "delete", "key": key}
+                else:
+                    record = {"op": "put", "key": key, "entry": entry}
+                lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._store.append_lines(lines)
+            self._publish(entries)
+            if self._store.needs_compaction():
+                self._store.compact(entries)
+        if changed is None or changed:
+            self._notify(changed)
+        return results
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self._commit([(key, entry)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        return len(self._commit(list(items)))
+
+    def delete(self, key: str) -> bool:
+        if key not in self._snapshot.entries:
+            return False
+        return self._commit([(key, None)])[0]
+
+    def list_keys(self, prefix="", tag=None, after=None, limit=100) -> List[str]:
+        entries = self._snapshot.entries
+        if after is not None and after >= prefix:
+            items = entries.iter_from(after, inclusive=False)
+        else:
+            items = entries.iter_from(prefix)
+        result = []
+        for key, entry in items:
+            if not key.startswith(prefix):
+                break
+            if tag is not None and tag not in entry["tags"]:
+                continue
+            result.append(key)
+            if len(result) >= limit:
+                break
+        return result
+
+    def list_recent(self, since=None, limit=100) -> List[Tuple[str, float]]:
+        items = (
+            (key, entry["updated_at"]) for key, entry in self._snapshot.entries.items()
+            if since is None or entry["updated_at"] >= since
+        )
+        return sorted(items, key=lambda item: item[1], reverse=True)[:limit]
+
+    def count(self) -> int:
+        return len(self._snapshot.entries)
+
+    def flush(self) -> None:
+        self._store.flush()
+
+    def compact(self) -> None:
+        with self._store.lock():
+            entries, changed = self._catch_up()
+            if entries is not None:
+                self._publish(entries)
+            self._store.compact(self._snapshot.entries, background=False)
+        if changed is None or changed:
+            self._notify(changed)
+
+    def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+        self._store.close()
+
+
+class SQLiteBackend(MockStorageBackend):
+    """
+    SQLite（WAL 模式）后端
+
+    载荷以紧凑 blob 存储，主键 B 树支持前缀范围扫描，另有标签表与更新时间
+    索引。打开数据库不读取任何条目，启动耗时与数据量无关。
+    """
+
+    def __init__(self, path: str, compress_min_bytes: int = 1024, watch: bool = True):
+        super().__init__()
+        self.path = path
+        self.compress_min_bytes = compress_min_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS mock_entries (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                tags TEXT NOT NULL DEFAULT '[]',
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_mock_entries_updated ON mock_entries(updated_at);
+            CREATE TABLE IF NOT EXISTS mock_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_mock_tags_key ON mock_tags(key);
+            """
+        )
+        self._data_version = self._read_data_version()
+        self._watcher: Optional[FileWatcher] = None
+        if watch:
+            self._watcher = FileWatcher([path, path + "-wal"], self.refresh)
+            self._watcher.start()
+
+    def _read_data_version(self) -> int:
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self) -> None:
+        """其他连接提交过事务时（data_version 变化）通知监听者"""
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._notify(None)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, tags, updated_at FROM mock_entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"data": decode_blob(row[0]), "tags": json.loads(row[1]), "updated_at": row[2]}
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM mock_entries WHERE key = ?", (key,)
+            ).fetchone() is not None
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO mock_entries (key, payload, tags, updated_at) VALUES (?, ?, ?, ?)",
+            (key, encode_blob(entry["data"], self.compress_min_bytes),
+             json.dumps(entry["tags"], ensure_ascii=False), entry["updated_at"])
+        )
+        self._conn.execute("DELETE FROM mock_tags WHERE key = ?", (key,))
+        self._conn.executemany(
+            "INSERT INTO mock_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in entry["tags"]]
+        )
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self.put_many([(key, entry)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        count = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, entry in items:
+                    self._write(key, entry)
+                    count += 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self._conn.execute(
+                    "DELETE FROM mock_entries WHERE key = ?", (key,)
+                ).rowcount
+                self._conn.execute("DELETE FROM mock_tags WHERE key = ?", (key,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return deleted > 0
+
+    def list_keys(self, prefix="", tag=None, after=None, limit=100) -> List[str]:
+        if tag is not None:
+            sql, args = "SELECT key FROM mock_tags WHERE tag = ?", [tag]
+        else:
+            sql, args = "SELECT key FROM mock_entries WHERE 1 = 1", []
+        if prefix:
+            sql += " AND key >= ? AND key < ?"
+            args += [prefix, prefix_upper_bound(prefix)]
+        if after is not None:
+            sql += " AND key > ?"
+            args.append(after)
+        sql += " ORDER BY key LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, args)]
+
+    def list_recent(self, since=None, limit=100) -> List[Tuple[str, float]]:
+        sql, args = "SELECT key, updated_at FROM mock_entries", []
+        if since is not None:
+            sql += " WHERE updated_at >= ?"
+            args.append(since)
+        sql += " ORDER BY updated_at DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            return [(row[0], row[1]) for row in self._conn.execute(sql, args)]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM mock_entries").fetchone()[0]
+
+    def compact(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+        with self._lock:
+            self._conn.close()
+
+
+class HotEntryCache:
+    """有界 LRU 缓存，用于非内存后端前置的热点条目等"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+def create_storage_backend(
+    path: str,
+    backend: Optional[str] = None,
+    fsync_batch: int = 64,
+    watch: bool = True
+) -> MockStorageBackend:
+    """
+    按名称或文件扩展名创建存储后端
+
+    Args:
+        path: 数据文件路径
+        backend: "journal" 或 "sqlite"；缺省时 .db/.sqlite 文件使用 SQLite
+        fsync_batch: 日志后端每批 fsync 的记录数
+        watch: 是否监视文件以感知其他进程的写入
+    """
+    if backend is None:
+        backend = "sqlite" if path.endswith(SQLITE_SUFFIXES) else "journal"
+    if backend == "sqlite":
+        return SQLiteBackend(path, watch=watch)
+    if backend == "journal":
+        return JournalBackend(path, fsync_batch=fsync_batch, watch=watch)
+    raise ValueError(f"未知的存储后端: {backend}")
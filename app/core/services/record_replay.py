@@ -0,0 +1,195 @@
+import base64
+import copy
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from app.core.config import settings
+from app.core.errors.http_errors import HTTPError
+from app.core.services.mock_data_service import get_mock_data_service
+from app.core.utils.fingerprint import request_fingerprint
+
+# 录制的响应作为普通条目存放在 MockDataService 中
+RECORDING_KEY_PREFIX = "__recordings__/"
+RECORDING_TAG = "recording"
+REPLAY_MODES = ("off", "record", "replay", "auto")
+
+_STRIPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+def strip_fields(body: Any, fields: Iterable[str]) -> Any:
+    """返回去掉指定字段（支持 a.b 路径）后的请求体副本；非字典请求体原样返回"""
+    fields = list(fields)
+    if not fields or not isinstance(body, dict):
+        return body
+    body = copy.deepcopy(body)
+    for path in fields:
+        *parents, name = path.split(".")
+        target = body
+        for part in parents:
+            target = target.get(part) if isinstance(target, dict) else None
+        if isinstance(target, dict):
+            target.pop(name, None)
+    return body
+
+def strip_query(url: str, names: Iterable[str]) -> str:
+    """去掉URL查询串中的指定参数"""
+    names = set(names)
+    parts = urlsplit(str(url))
+    if not names or not parts.query:
+        return str(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in names]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class RecordReplay:
+    """
+    录制/回放
+
+    record 模式把成功的上游响应按标准化请求指纹写入 MockDataService；
+    replay 模式只从录制中应答，未命中返回 404（error_code=replay_miss）；
+    auto 模式命中即回放、未命中则请求上游并录制。
+
+    匹配时忽略配置中的请求头、查询参数与请求体字段；查询参数与请求头的
+    顺序本就不影响指纹。
+    """
+
+    def __init__(
+        self,
+        cassette: str = "default",
+        ignore_headers: Iterable[str] = (),
+        ignore_params: Iterable[str] = (),
+        ignore_body_fields: Iterable[str] = ()
+    ):
+        self.cassette = cassette
+        self.ignore_headers = tuple(ignore_headers)
+        self.ignore_params = frozenset(ignore_params)
+        self.ignore_body_fields = tuple(ignore_body_fields)
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    @staticmethod
+    def resolve_mode(mode: Optional[str]) -> str:
+        """请求级模式优先，缺省使用全局配置"""
+        return mode or settings.REPLAY_MODE
+
+    def make_key(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        headers: Optional[Mapping[str, Any]],
+        data: Any,
+        json: Any
+    ) -> str:
+        """按匹配配置计算录制条目的 key"""
+        params = {k: v for k, v in (params or {}).items() if k not in self.ignore_params}
+        body = strip_fields(json if json is not None else data, self.ignore_body_fields)
+        fingerprint = request_fingerprint(
+            method,
+            strip_query(url, self.ignore_params),
+            params,
+            headers,
+            body,
+            ignore_headers=self.ignore_headers,
+            extra="json" if json is not None else None
+        )
+        return f"{RECORDING_KEY_PREFIX}{self.cassette}/{fingerprint}"
+
+    def load(self, key: str, request: httpx.Request) -> Optional[httpx.Response]:
+        """读取录制并重建响应"""
+        started = time.perf_counter()
+        recording = get_mock_data_service().get_mock_data(key)
+        if recording is None:
+            return None
+        body = recording["body"]
+        content = base64.b64decode(body) if recording["body_encoding"] == "base64" else body.encode("utf-8")
+        response = httpx.Response(
+            recording["status_code"],
+            headers=[tuple(item) for item in recording["headers"]] + [("X-Replay", "HIT")],
+            content=content,
+            request=request,
+        )
+        response.elapsed = timedelta(seconds=max(time.perf_counter() - started, 1e-6))
+        return response
+
+    def save(self, key: str, response: httpx.Response) -> None:
+        """把响应写入录制（同 key 覆盖）"""
+        content = response.content
+        try:
+            body, body_encoding = str(content, "utf-8"), "utf-8"  # 溢出到磁盘的响应体为 mmap
+        except UnicodeDecodeError:
+            body, body_encoding = base64.b64encode(content).decode("ascii"), "base64"
+        recording = {
+            "request": {"method": response.request.method, "url": str(response.request.url)},
+            "status_code": response.status_code,
+            "headers": [
+                [k, v] for k, v in response.headers.multi_items()
+                if k.lower() not in _STRIPPED_HEADERS
+            ],
+            "body": body,
+            "body_encoding": body_encoding,
+            "recorded_at": time.time(),
+        }
+        service = get_mock_data_service()
+        if service.get_mock_entry(key) is None:
+            service.create_mock_data(key, recording, tags=[RECORDING_TAG, f"cassette:{self.cassette}"])
+        else:
+            service.update_mock_data(key, recording)
+        self.recorded += 1
+
+    async def run(
+        self,
+        mode: str,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        headers: Optional[Mapping[str, Any]],
+        data: Any,
+        json: Any,
+        send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """
+        按模式回放或录制一次请求
+
+        Args:
+            mode: record/replay/auto
+            send: 实际发送请求的协程工厂
+        """
+        key = self.make_key(method, url, params, headers, data, json)
+        if mode in ("replay", "auto"):
+            response = self.load(key, httpx.Request(method, url, params=params, headers=headers))
+            if response is not None:
+                self.hits += 1
+                return response
+            self.misses += 1
+            if mode == "replay":
+                raise HTTPError(404, f"未找到录制的响应: {method} {url}", error_code="replay_miss")
+
+        response = await send()
+        try:
+            self.save(key, response)
+        except Exception as e:
+            logging.error(f"录制响应失败: {e}")
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": settings.REPLAY_MODE,
+            "cassette": self.cassette,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+
+record_replay = RecordReplay(
+    cassette=settings.REPLAY_CASSETTE,
+    ignore_headers=settings.REPLAY_IGNORE_HEADERS,
+    ignore_params=settings.REPLAY_IGNORE_PARAMS,
+    ignore_body_fields=settings.REPLAY_IGNORE_BODY_FIELDS,
+)
@@ -1,9 +1,11 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor, ProcessPoolExecutor
-from typing import Optional
+from typing import Any, Dict, Optional
 import logging
 
+from app.core.utils.request_helper import send_http_request
+
 # 单例模式存储调度器实例
 _scheduler: Optional[AsyncIOScheduler] = None
 
@@ -53,4 +55,32 @@ def shutdown_scheduler() -> None:
         except Exception as e:
             logging.error(f"调度器关闭失败: {e}")
         finally:
-            _scheduler = None
\ No newline at end of file
+            _scheduler = None
+
+async def _run_http_request_job(request_kwargs: Dict[str, Any]) -> None:
+    """定时请求作业：通过共享连接池发送请求"""
+    try:
+        response = await send_http_request(**request_kwargs)
+        logging.info(f"定时请求完成: {request_kwargs.get('url')} -> {response.status_code}")
+    except Exception as e:
+        logging.error(f"定时请求失败: {request_kwargs.get('url')} - {e}")
+
+def add_http_request_job(
+    request_kwargs: Dict[str, Any],
+    seconds: int,
+    job_id: Optional[str] = None
+) -> str:
+    """添加周期性HTTP请求作业，返回作业ID
+
+    协程作业运行在调度器所在的事件循环上，与 /mock/request 复用同一连接池。
+    """
+    job = get_scheduler().add_job(
+        _run_http_request_job,
+        "interval",
+        seconds=seconds,
+        args=[request_kwargs],
+        id=job_id,
+        replace_existing=job_id is not None
+    )
+    logging.info(f"已添加定时请求作业: {job.id} ({seconds}秒)")
+    return job.id
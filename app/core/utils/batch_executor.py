@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Sequence
+
+from app.core.errors.http_errors import HTTPError
+from app.core.schemas.request_schema import HTTPRequestSchema
+from app.core.schemas.response_schema import HTTPResponseSchema
+from app.core.utils.request_helper import send_http_request
+
+async def execute_request(index: int, request: HTTPRequestSchema) -> Dict[str, Any]:
+    """执行批量中的单个请求，失败时返回错误条目而非抛出"""
+    try:
+        response = await send_http_request(**request.to_request_kwargs())
+        return {
+            "index": index,
+            "response": HTTPResponseSchema.from_response(response, request.response_body).to_dict(),
+        }
+    except HTTPError as e:
+        error = {"code": e.status_code, "message": e.detail}
+        if e.error_code:
+            error["error_code"] = e.error_code
+        return {"index": index, "error": error}
+    except Exception:
+        logging.exception(f"批量请求第 {index} 项执行异常")
+        return {"index": index, "error": {"code": 500, "message": "Internal server error"}}
+
+async def run_batch(
+    requests: Sequence[HTTPRequestSchema],
+    concurrency: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    以有界并发执行批量请求，按完成顺序逐条产出结果
+
+    固定数量的工作协程从共享索引迭代器中领取任务，结果经容量为并发数的队列
+    交给消费者，因此在途任务与待发送结果都不随批量大小增长。消费方提前退出
+    （如客户端断开）时取消全部工作协程。
+
+    Args:
+        requests: 请求列表
+        concurrency: 最大并发数
+
+    Yields:
+        包含 index 以及 response 或 error 的结果字典
+    """
+    total = len(requests)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    pending = iter(range(total))
+
+    async def worker() -> None:
+        for index in pending:
+            await results.put(await execute_request(index, requests[index]))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, total))]
+    try:
+        for _ in range(total):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
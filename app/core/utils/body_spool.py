@@ -0,0 +1,168 @@
+import json
+import logging
+import mmap
+import tempfile
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from app.core.config import settings
+
+BodyView = Union[bytes, mmap.mmap]
+
+
+class BodyMemoryBudget:
+    """
+    进程内驻留内存的请求/响应体字节总量上限
+
+    预留失败并不报错：调用方改为把该请求体溢出到磁盘，因此并发的大传输
+    只会变慢，不会耗尽工作进程内存。
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._used = 0
+        self._peak = 0
+        self._spilled = 0
+        self._lock = threading.Lock()
+
+    def try_reserve(self, size: int) -> bool:
+        with self._lock:
+            if self.max_bytes and self._used + size > self.max_bytes:
+                return False
+            self._used += size
+            self._peak = max(self._peak, self._used)
+            return True
+
+    def release(self, size: int) -> None:
+        with self._lock:
+            self._used -= size
+
+    def record_spill(self) -> None:
+        with self._lock:
+            self._spilled += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_memory_bytes": self._used,
+                "peak_bytes": self._peak,
+                "limit_bytes": self.max_bytes,
+                "spilled_bodies": self._spilled,
+            }
+
+
+class SpooledBody:
+    """
+    分块写入的请求/响应体：阈值以下留在内存，超过阈值或内存预算不足时
+    溢出到（已删除的）临时文件，写完后通过只读 mmap 访问
+
+    ``view`` 为 bytes 或 mmap，二者都支持切片、len 与缓冲区协议；读取使用
+    切片而非文件偏移，并发的多个读取方（如对冲请求）互不干扰。
+    """
+
+    def __init__(self, threshold: Optional[int] = None, budget: Optional[BodyMemoryBudget] = None):
+        self.threshold = settings.BODY_SPOOL_THRESHOLD_BYTES if threshold is None else threshold
+        self.budget = body_budget if budget is None else budget
+        self.size = 0
+        self.reserved = 0
+        self._chunks: List[bytes] = []
+        self._file = None
+        self.view: Optional[BodyView] = None
+
+    @property
+    def spooled(self) -> bool:
+        """是否已溢出到磁盘"""
+        return self._file is not None or isinstance(self.view, mmap.mmap)
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self._file is None:
+            if self.size <= self.threshold and self.budget.try_reserve(len(chunk)):
+                self.reserved += len(chunk)
+                self._chunks.append(chunk)
+                return
+            self._spill()
+        self._file.write(chunk)
+
+    def _spill(self) -> None:
+        """把已缓冲的块写入临时文件并归还内存预算"""
+        self._file = tempfile.TemporaryFile(dir=settings.BODY_SPOOL_DIR or None)
+        for buffered in self._chunks:
+            self._file.write(buffered)
+        self._chunks = []
+        self.budget.release(self.reserved)
+        self.reserved = 0
+        self.budget.record_spill()
+
+    def finish(self) -> BodyView:
+        """结束写入并返回只读视图"""
+        if self._file is None:
+            self.view = b"".join(self._chunks)
+            self._chunks = []
+            return self.view
+        self._file.flush()
+        # mmap 持有自己的文件描述符，关闭文件后仍然有效；文件已删除，映射释放后空间即回收
+        self.view = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._file.close()
+        self._file = None
+        return self.view
+
+    async def aiter_chunks(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        """按块产出内容（每次调用都从头开始，可用于重试）"""
+        chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+        view = self.view
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+
+    def close(self) -> None:
+        """归还内存预算并释放磁盘空间"""
+        if self.reserved:
+            self.budget.release(self.reserved)
+            self.reserved = 0
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if isinstance(self.view, mmap.mmap):
+            try:
+                self.view.close()
+            except BufferError:
+                # 仍有导出的缓冲区（如未释放的 memoryview）：交给垃圾回收
+                logging.debug("请求体映射仍被引用，延迟释放")
+        self.view = None
+
+
+def encode_request_body(data: Any, json_data: Any) -> Optional[bytes]:
+    """
+    把 JSON 或 str/bytes 类型的请求体编码为字节
+
+    表单字典交由 httpx 编码，返回None。
+    """
+    if json_data is not None:
+        return json.dumps(json_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    if isinstance(data, bytes):
+        return data
+    return None
+
+
+def spool_request_body(data: Any, json_data: Any) -> Optional[SpooledBody]:
+    """
+    把 JSON、字符串或字节请求体编码一次写入 SpooledBody
+
+    阈值以下且内存预算充足的请求体留在内存并计入预算，其余溢出到磁盘；
+    编码后的字节在写入后立即释放，不会在整个请求期间与副本并存。
+    表单字典返回None，照常交给 httpx。
+    """
+    payload = encode_request_body(data, json_data)
+    if payload is None:
+        return None
+    body = SpooledBody()
+    body.write(payload)
+    del payload
+    body.finish()
+    return body
+
+body_budget = BodyMemoryBudget(settings.BODY_MEMORY_LIMIT_BYTES)
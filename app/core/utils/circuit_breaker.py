@@ -0,0 +1,328 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.errors.http_errors import CircuitOpenError, ConcurrencyLimitError
+from app.core.utils.url_helper import url_netloc
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    单主机熔断器
+
+    在滑动时间窗口内统计失败率与慢调用率，任一超过阈值即进入 open 状态并快速
+    拒绝请求；冷却期结束后进入 half_open，放行有限的探测请求，全部成功则恢复
+    closed，任一失败则重新 open。
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        slow_call_rate: float,
+        slow_call_seconds: float,
+        window_seconds: float,
+        min_calls: int,
+        open_seconds: float,
+        half_open_calls: int
+    ):
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        # (时间戳, 是否失败, 是否慢调用)
+        self._window: Deque[Tuple[float, bool, bool]] = deque()
+
+    def allow(self) -> bool:
+        """是否允许发起请求"""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                return False
+            self._probes += 1
+        return True
+
+    def record(self, failed: bool, latency: float) -> None:
+        """记录调用结果"""
+        if self.state == HALF_OPEN:
+            if failed:
+                self._transition(OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_calls:
+                    self._transition(CLOSED)
+            return
+
+        now = time.monotonic()
+        self._window.append((now, failed, latency >= self.slow_call_seconds))
+        self._trim(now)
+        if self.state == CLOSED and len(self._window) >= self.min_calls:
+            failures, slow = self._rates()
+            if failures >= self.failure_rate or slow >= self.slow_call_rate:
+                self._transition(OPEN)
+
+    def release_probe(self) -> None:
+        """探测请求未产生结果（如被取消）时归还名额"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _trim(self, now: float) -> None:
+        while self._window and now - self._window[0][0] > self.window_seconds:
+            self._window.popleft()
+
+    def _rates(self) -> Tuple[float, float]:
+        total = len(self._window)
+        if not total:
+            return 0.0, 0.0
+        failures = sum(1 for _, failed, _ in self._window if failed)
+        slow = sum(1 for _, _, is_slow in self._window if is_slow)
+        return failures / total, slow / total
+
+    def _transition(self, state: str) -> None:
+        logging.warning(f"熔断器状态变更: {self.state} -> {state}")
+        self.state = state
+        self._probes = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state == CLOSED:
+            self._window.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._trim(time.monotonic())
+        failures, slow = self._rates()
+        return {
+            "state": self.state,
+            "calls_in_window": len(self._window),
+            "failure_rate": round(failures, 3),
+            "slow_call_rate": round(slow, 3),
+        }
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 自适应并发限制器
+
+    以窗口内的最小延迟为基准：样本延迟不超过 基准 × tolerance 时加性增大上限
+    （每个往返约 +1），超过或调用失败时乘性减小上限（每个平滑延迟周期至多一次）。
+    在途请求达到上限时默认立即拒绝；启用排队时按先到先得等待，名额释放或
+    上限增大时依次放行。
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        tolerance: float,
+        backoff_ratio: float,
+        baseline_window: float = 30.0
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.backoff_ratio = backoff_ratio
+        self.baseline_window = baseline_window
+        self.in_flight = 0
+        self._min_latency: Optional[float] = None
+        self._min_latency_at = 0.0
+        self._smoothed: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    async def acquire(self, timeout: Optional[float], max_waiters: int) -> bool:
+        """
+        获取名额，已满时排队等待（max_waiters 或 timeout 为 0 时不排队）
+
+        Returns:
+            是否获得名额；排队人数已达 max_waiters 或等待超时返回 False
+        """
+        if not self._waiters and self.try_acquire():
+            return True
+        if len(self._waiters) >= max_waiters or (timeout is not None and timeout <= 0):
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # 名额已移交但调用方放弃等待：归还给下一个等待者
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                return False
+            raise
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        """按排队顺序把空闲名额移交给等待者"""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done() or waiter.get_loop().is_closed():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def record(self, failed: bool, latency: float) -> None:
+        now = time.monotonic()
+        if self._min_latency is None or latency < self._min_latency or (
+            now - self._min_latency_at > self.baseline_window
+        ):
+            self._min_latency = latency
+            self._min_latency_at = now
+        self._smoothed = latency if self._smoothed is None else 0.9 * self._smoothed + 0.1 * latency
+
+        if failed or latency > self._min_latency * self.tolerance:
+            if now - self._last_decrease >= self._smoothed:
+                self.limit = max(self.minimum, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "min_latency_ms": round(self._min_latency * 1000, 3) if self._min_latency else None,
+            "smoothed_latency_ms": round(self._smoothed * 1000, 3) if self._smoothed else None,
+        }
+
+
+class GuardTicket:
+    """单次请求的准入凭证，负责记录结果并归还名额"""
+
+    def __init__(self, breaker: CircuitBreaker, limiter: AdaptiveLimiter):
+        self._breaker = breaker
+        self._limiter = limiter
+        self._started = time.monotonic()
+        self.recorded = False
+
+    def record(self, status_code: Optional[int] = None, failed: Optional[bool] = None) -> None:
+        """按状态码（5xx 视为失败）或显式标记记录结果，仅首次生效"""
+        if self.recorded:
+            return
+        if failed is None:
+            failed = status_code is not None and status_code >= 500
+        latency = time.monotonic() - self._started
+        self._breaker.record(failed, latency)
+        self._limiter.record(failed, latency)
+        self.recorded = True
+
+    def release(self) -> None:
+        if not self.recorded:
+            self._breaker.release_probe()
+        self._limiter.release()
+
+
+class UpstreamGuard:
+    """按上游主机维护熔断器与自适应并发限制器"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    def _components(self, host: str) -> Tuple[CircuitBreaker, AdaptiveLimiter]:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                failure_rate=settings.BREAKER_FAILURE_RATE,
+                slow_call_rate=settings.BREAKER_SLOW_CALL_RATE,
+                slow_call_seconds=settings.BREAKER_SLOW_CALL_SECONDS,
+                window_seconds=settings.BREAKER_WINDOW_SECONDS,
+                min_calls=settings.BREAKER_MIN_CALLS,
+                open_seconds=settings.BREAKER_OPEN_SECONDS,
+                half_open_calls=settings.BREAKER_HALF_OPEN_CALLS,
+            )
+            self._limiters[host] = AdaptiveLimiter(
+                initial=settings.LIMITER_INITIAL,
+                minimum=settings.LIMITER_MIN,
+                maximum=settings.LIMITER_MAX,
+                tolerance=settings.LIMITER_LATENCY_TOLERANCE,
+                backoff_ratio=settings.LIMITER_BACKOFF_RATIO,
+            )
+        return breaker, self._limiters[host]
+
+    @asynccontextmanager
+    async def guard(self, url: str, timeout: Optional[float] = None) -> AsyncIterator[Optional[GuardTicket]]:
+        """
+        请求准入控制
+
+        熔断器打开时立即抛出 CircuitOpenError；并发已满时默认立即抛出
+        ConcurrencyLimitError。配置 LIMITER_QUEUE_SIZE 与 LIMITER_QUEUE_TIMEOUT
+        后改为排队等待名额，排队已满或等待超时（不超过调用方剩余的 timeout）
+        时才拒绝。
+        退出时若调用方未记录结果：正常退出按成功记录，异常退出按失败记录，
+        取消不记录结果。
+        """
+        if not settings.BREAKER_ENABLED:
+            yield None
+            return
+
+        host = url_netloc(url)
+        breaker, limiter = self._components(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"上游 {host} 熔断中，请求被拒绝")
+        wait = settings.LIMITER_QUEUE_TIMEOUT if timeout is None else min(timeout, settings.LIMITER_QUEUE_TIMEOUT)
+        try:
+            acquired = await limiter.acquire(wait, settings.LIMITER_QUEUE_SIZE)
+        except BaseException:
+            breaker.release_probe()
+            raise
+        if not acquired:
+            breaker.release_probe()
+            raise ConcurrencyLimitError(
+                f"上游 {host} 并发已达自适应上限 {int(limiter.limit)} 且排队已满或超时，请求被拒绝"
+            )
+
+        ticket = GuardTicket(breaker, limiter)
+        try:
+            yield ticket
+            ticket.record(failed=False)
+        except Exception:
+            # CancelledError 不是 Exception 子类，取消不计入统计
+            ticket.record(failed=True)
+            raise
+        finally:
+            ticket.release()
+
+    def get_state(self) -> Dict[str, Dict[str, Any]]:
+        """各主机熔断器与并发限制器状态"""
+        return {
+            host: {**breaker.snapshot(), "limiter": self._limiters[host].snapshot()}
+            for host, breaker in self._breakers.items()
+        }
+
+
+upstream_guard = UpstreamGuard()
@@ -0,0 +1,313 @@
+import asyncio
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.core.utils.body_spool import encode_request_body
+
+try:
+    import brotli  # 可选依赖：Content-Encoding: br
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # 可选依赖：Content-Encoding: zstd
+except ImportError:
+    zstandard = None
+
+ENCODINGS = ("zstd", "br", "gzip")
+# 超过该大小的压缩放到线程中执行，避免阻塞事件循环
+OFFLOAD_BYTES = 256 * 1024
+# 值得压缩的响应类型（前缀匹配）与结构化后缀
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson",
+    "application/javascript", "application/xml",
+)
+COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+# 无响应体或按字节区间返回的状态码不压缩
+_UNCOMPRESSED_STATUSES = frozenset({204, 206, 304})
+
+
+def available_encodings() -> List[str]:
+    """已安装对应压缩库的编码（gzip 总是可用）"""
+    return [
+        encoding for encoding in ENCODINGS
+        if encoding == "gzip"
+        or (encoding == "br" and brotli is not None)
+        or (encoding == "zstd" and zstandard is not None)
+    ]
+
+def compression_level(encoding: str) -> int:
+    """编码对应的配置压缩级别"""
+    if encoding == "br":
+        return settings.COMPRESSION_BROTLI_QUALITY
+    if encoding == "zstd":
+        return settings.COMPRESSION_ZSTD_LEVEL
+    return settings.COMPRESSION_GZIP_LEVEL
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    一次性压缩完整数据
+
+    Raises:
+        ValueError: 编码未知或对应的库未安装时
+    """
+    if encoding not in available_encodings():
+        raise ValueError(f"不支持的压缩编码: {encoding}")
+    level = compression_level(encoding) if level is None else level
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31：gzip 封装
+    return compressor.compress(data) + compressor.flush()
+
+async def _maybe_offload(func: Callable[[bytes], bytes], data: bytes) -> bytes:
+    """大块数据在线程中压缩，小块直接在事件循环中执行（线程切换开销更高）"""
+    if len(data) >= OFFLOAD_BYTES:
+        return await asyncio.to_thread(func, data)
+    return func(data)
+
+async def compress_async(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """compress 的异步版本"""
+    return await _maybe_offload(lambda payload: compress(payload, encoding, level), data)
+
+
+class StreamCompressor:
+    """
+    流式压缩器：每个输入块压缩后立即刷出，接收方可以边收边解压
+
+    逐块刷出会略微降低压缩率，但流式响应（如批量请求的 NDJSON 结果）
+    不会因为压缩而被延迟到缓冲区填满。
+    """
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        if encoding not in available_encodings():
+            raise ValueError(f"不支持的压缩编码: {encoding}")
+        level = compression_level(encoding) if level is None else level
+        self.encoding = encoding
+        self.bytes_in = 0
+        self.bytes_out = 0
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        """压缩一块数据并刷出到字节边界"""
+        if self.encoding == "br":
+            output = self._compressor.process(chunk) + self._compressor.flush()
+        elif self.encoding == "zstd":
+            output = self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        else:
+            output = self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.bytes_in += len(chunk)
+        self.bytes_out += len(output)
+        return output
+
+    def finish(self) -> bytes:
+        """结束压缩流（写入结尾标记与校验和）"""
+        if self.encoding == "br":
+            output = self._compressor.finish()
+        else:
+            output = self._compressor.flush()
+        self.bytes_out += len(output)
+        return output
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """解析 Accept-Encoding 为 编码→q值 字典（q值无效时视为0）"""
+    qualities: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, *params = [token.strip() for token in part.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities
+
+def coding_quality(qualities: Dict[str, float], coding: str) -> float:
+    """某编码的q值：显式列出的优先，其次为通配符 *"""
+    return qualities.get(coding, qualities.get("*", 0.0))
+
+def negotiate_encoding(accept_encoding: Optional[str], preferred: List[str]) -> Optional[str]:
+    """
+    选择响应的压缩编码：q值最高者胜出，q值相同时按服务端偏好顺序
+
+    Returns:
+        编码名称；客户端不接受任何候选编码时返回None（不压缩）
+    """
+    if not accept_encoding:
+        return None
+    qualities = parse_accept_encoding(accept_encoding)
+    chosen, best = None, 0.0
+    for encoding in preferred:
+        quality = coding_quality(qualities, encoding)
+        if quality > best:
+            chosen, best = encoding, quality
+    return chosen
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """响应类型是否值得压缩（已压缩的图片、归档等不再压缩）"""
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES) or media_type.endswith(COMPRESSIBLE_SUFFIXES)
+
+async def compress_request_body(
+    data: Any,
+    json_data: Any,
+    encoding: str
+) -> Optional[Tuple[bytes, Dict[str, str]]]:
+    """
+    按 Content-Encoding 压缩 JSON 或字符串请求体（上游需支持解压请求体）
+
+    Returns:
+        (压缩后的请求体, 需附加的请求头)；表单字典或小于
+        REQUEST_COMPRESSION_MIN_BYTES 的请求体返回None，照常发送
+    """
+    payload = encode_request_body(data, json_data)
+    if payload is None or len(payload) < settings.REQUEST_COMPRESSION_MIN_BYTES:
+        return None
+    headers = {"Content-Encoding": encoding}
+    if json_data is not None:
+        headers["Content-Type"] = "application/json"
+    return await compress_async(payload, encoding), headers
+
+
+class CompressionStats:
+    """按编码统计压缩的响应数与压缩前后字节数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0})
+            stats["responses"] += 1
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                encoding: {
+                    **stats,
+                    "ratio": round(stats["bytes_out"] / stats["bytes_in"], 4) if stats["bytes_in"] else None,
+                }
+                for encoding, stats in self._stats.items()
+            }
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """
+    按 Accept-Encoding 协商的响应压缩中间件（zstd/br/gzip）
+
+    纯 ASGI 实现，不缓冲流式响应：首个响应体消息即为完整响应体时一次性
+    压缩并改写 Content-Length（小于 minimum_size 的不压缩）；流式响应逐块
+    压缩刷出。压缩后的响应上的强 ETag 改为弱 ETag。已带 Content-Encoding
+    的响应（如预压缩的 Mock 条目、透传的上游响应体）原样发送。
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None, encodings: Optional[List[str]] = None):
+        self.app = app
+        self.minimum_size = settings.RESPONSE_COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+        configured = settings.RESPONSE_COMPRESSION_ENCODINGS if encodings is None else encodings
+        supported = available_encodings()
+        self.encodings = [encoding for encoding in configured if encoding in supported]
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        responder = _CompressingSender(
+            send, negotiate_encoding(accept_encoding, self.encodings), self.minimum_size
+        )
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSender:
+    """单个响应的压缩状态：暂存响应头，根据首个响应体消息决定是否压缩"""
+
+    def __init__(self, send, encoding: Optional[str], minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Dict[str, Any]] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is not None:
+            await self._send_chunk(body, more_body)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        eligible = (
+            self.start_message["status"] not in _UNCOMPRESSED_STATUSES
+            and "content-encoding" not in headers
+            and is_compressible(headers.get("content-type"))
+            and (more_body or len(body) >= self.minimum_size)
+        )
+        if eligible:
+            headers.add_vary_header("Accept-Encoding")
+        if not eligible or self.encoding is None:
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # 强 ETag 须对每个表示唯一，压缩后的表示只能以弱校验器标识
+            headers["ETag"] = "W/" + etag
+        if not more_body:
+            compressed = await compress_async(body, self.encoding)
+            headers["Content-Length"] = str(len(compressed))
+            compression_stats.record(self.encoding, len(body), len(compressed))
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        if "content-length" in headers:
+            del headers["content-length"]
+        self.compressor = StreamCompressor(self.encoding)
+        await self.send(self.start_message)
+        await self._send_chunk(body, more_body)
+
+    async def _send_chunk(self, body: bytes, more_body: bool) -> None:
+        chunk = await _maybe_offload(self.compressor.compress, body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+            compression_stats.record(self.encoding, self.compressor.bytes_in, self.compressor.bytes_out)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
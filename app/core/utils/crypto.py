@@ -1,9 +1,18 @@
 from cryptography.fernet import Fernet, InvalidToken
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import json
 import os
 import logging
 import secrets
 
+from app.core.config import settings
+
+try:
+    import orjson  # 可选依赖：信封模式的快速序列化
+except ImportError:
+    orjson = None
+
 # 初始化日志记录器
 logger = logging.getLogger(__name__)
 
@@ -70,4 +79,62 @@ def decrypt_data(encrypted_data: str) -> Optional[str]:
         return None
     except Exception as e:
         logger.error(f"解密失败: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
+
+# 逐字段模式只加密请求载荷与响应体；方法、URL、请求头等路由字段和控制选项保持明文，
+# 否则服务端既无法校验也无法路由请求
+PER_FIELD_REQUEST_FIELDS = ("params", "data", "json_data")
+PER_FIELD_RESPONSE_FIELDS = ("text",)
+
+def process_encryption(data: Dict, encrypt_func: Callable) -> Dict:
+    """逐字段模式：递归处理加密/解密的通用函数，仅处理字符串值"""
+    processed = {}
+    for k, v in data.items():
+        if isinstance(v, dict):
+            processed[k] = process_encryption(v, encrypt_func)
+        else:
+            processed[k] = encrypt_func(v) if isinstance(v, str) else v
+    return processed
+
+def encrypt_payload(payload: Any) -> str:
+    """信封模式加密：整体序列化一次后加密为单个密文
+    
+    Args:
+        payload: 可JSON序列化的载荷
+    
+    Returns:
+        加密后的字符串
+    """
+    if orjson is not None:
+        serialized = orjson.dumps(payload)
+    else:
+        serialized = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+    return _fernet.encrypt(serialized).decode()
+
+def decrypt_payload(token: str) -> Optional[Any]:
+    """信封模式解密
+    
+    Args:
+        token: 信封密文
+    
+    Returns:
+        解密并反序列化后的载荷，密文无效时返回None
+    """
+    try:
+        plaintext = _fernet.decrypt(token.encode())
+        return orjson.loads(plaintext) if orjson is not None else json.loads(plaintext)
+    except InvalidToken:
+        logger.warning("解密失败：无效的加密信封")
+        return None
+
+async def encrypt_payload_async(payload: Any, size_hint: int = 0) -> str:
+    """异步信封加密，大载荷在线程池中执行"""
+    if size_hint > settings.ENCRYPTION_OFFLOAD_BYTES:
+        return await asyncio.to_thread(encrypt_payload, payload)
+    return encrypt_payload(payload)
+
+async def decrypt_payload_async(token: str) -> Optional[Any]:
+    """异步信封解密，大密文在线程池中执行"""
+    if len(token) > settings.ENCRYPTION_OFFLOAD_BYTES:
+        return await asyncio.to_thread(decrypt_payload, token)
+    return decrypt_payload(token)
@@ -1,6 +1,14 @@
+import codecs
 import logging
-import chardet
-from typing import Set
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Optional, Set, Tuple
+
+try:
+    import chardet  # 统计检测，仅作为最后手段
+except ImportError:
+    chardet = None
 
 # 保留原有变量
 DEFAULT_ENCODING = "utf-8"
@@ -9,77 +17,259 @@ COMMON_ENCODINGS = [
     "gbk", "gb18030", "big5", "shift-jis", "euc-jp", "euc-kr"
 ]
 
+# 检测只读取有界样本：meta 声明在文档头部，UTF-8 校验与统计检测取前若干字节
+META_SCAN_BYTES = 4096
+SAMPLE_BYTES = 64 * 1024
+DETECT_CHUNK_BYTES = 8 * 1024
+DETECT_MAX_BYTES = 256 * 1024
+
+# 未安装 chardet 时尝试的多字节编码，得分相同时靠前者优先（latin-1 总能成功，放在最后）。
+# 韩文的常用区间完全落在 gb18030/euc-jp 的一级汉字区内，故 euc-kr 在前；
+# big5 文本按 gb18030 解码得分很低，反之则不然，故 gb18030 在 big5 之前
+FALLBACK_ENCODINGS = ["shift_jis", "euc-kr", "gb18030", "euc-jp", "big5"]
+# 各编码中常用字符所在的首字节区间与最小次字节：标点、假名、一级汉字、韩文音节等。
+# gb18030 几乎能解码任何字节序列，误判出的多是扩展区生僻字或假名行，得分很低
+_FREQUENT_RANGES = {
+    "shift_jis": (((0x81, 0x83), (0x88, 0x98)), 0x40),
+    "euc-jp": (((0xA1, 0xA1), (0xA4, 0xA5), (0xB0, 0xCF)), 0xA1),
+    "euc-kr": (((0xA1, 0xA1), (0xB0, 0xC8)), 0xA1),
+    "big5": (((0xA1, 0xC6),), 0x40),
+    "gb18030": (((0xA1, 0xA3), (0xB0, 0xD7)), 0xA1),
+}
+# 常用字符占比低于该值时不采用任何候选，回退为 latin-1（如 cp1252 西文文本）
+MIN_FALLBACK_SCORE = 0.5
+
+# BOM 按长度从长到短匹配（UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头）
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_CHARSET_PARAM = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+_META_PATTERNS = (
+    re.compile(rb"""<\?xml[^>]*?encoding\s*=\s*["']([\w.:-]+)["']""", re.IGNORECASE),
+    re.compile(rb"""<meta[^>]*?charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE),
+)
+
 class DecodingError(Exception):
     """自定义解码错误"""
     def __init__(self, message: str, tried_encodings: Set[str]):
         super().__init__(message)
         self.tried_encodings = tried_encodings
 
-def decode_content(content: bytes, encoding: str = None) -> str:
+
+class CharsetCache:
+    """按主机缓存统计检测的结果，同一上游的后续响应可免去检测"""
+
+    def __init__(self, max_hosts: int = 1024):
+        self.max_hosts = max_hosts
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, host: Optional[str]) -> Optional[str]:
+        if not host:
+            return None
+        with self._lock:
+            encoding = self._entries.get(host)
+            if encoding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(host)
+            self.hits += 1
+            return encoding
+
+    def put(self, host: Optional[str], encoding: str) -> None:
+        if not host:
+            return
+        with self._lock:
+            self._entries[host] = encoding
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.max_hosts:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, host: str) -> None:
+        with self._lock:
+            self._entries.pop(host, None)
+
+
+charset_cache = CharsetCache()
+
+def normalize_encoding(name: Optional[str]) -> Optional[str]:
+    """规范化编码名称；未知编码返回None"""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+
+def _decode_sample(content: bytes, encoding: str, limit: int = SAMPLE_BYTES) -> Optional[str]:
+    """严格解码前 limit 字节（允许样本末尾截断的多字节字符），失败返回None"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+    try:
+        return decoder.decode(content[:limit], final=len(content) <= limit)
+    except UnicodeDecodeError:
+        return None
+
+def _sample_decodes(content: bytes, encoding: str, limit: int = SAMPLE_BYTES) -> bool:
+    """前 limit 字节能否按该编码严格解码"""
+    return _decode_sample(content, encoding, limit) is not None
+
+def _frequent_share(text: str, encoding: str) -> float:
+    """解码结果中非 ASCII 字符落在该编码常用区间内的比例"""
+    lead_ranges, min_trail = _FREQUENT_RANGES[encoding]
+    frequent = total = 0
+    for char, count in Counter(text).items():
+        if char < "\x80":
+            continue
+        total += count
+        encoded = char.encode(encoding)
+        if len(encoded) == 2 and encoded[1] >= min_trail and any(
+            low <= encoded[0] <= high for low, high in lead_ranges
+        ):
+            frequent += count
+    return frequent / total if total else 0.0
+
+def _sniff_bom(content: bytes) -> Optional[str]:
+    head = content[:4]  # 兼容 mmap 等只支持切片的缓冲区
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+def _sniff_meta(content: bytes) -> Optional[str]:
+    head = content[:META_SCAN_BYTES]
+    for pattern in _META_PATTERNS:
+        found = pattern.search(head)
+        if found:
+            encoding = normalize_encoding(found.group(1).decode("ascii", errors="ignore"))
+            if encoding is not None:
+                return encoding
+    return None
+
+def _detect_statistically(content: bytes) -> Optional[str]:
+    """在有界样本上增量检测：检测器有把握后立即停止"""
+    if chardet is not None:
+        detector = chardet.UniversalDetector()
+        limit = min(len(content), DETECT_MAX_BYTES)
+        for offset in range(0, limit, DETECT_CHUNK_BYTES):
+            detector.feed(content[offset:min(offset + DETECT_CHUNK_BYTES, limit)])
+            if detector.done:
+                break
+        result = detector.close()
+        logging.debug(f"检测到编码: {result['encoding']} (置信度: {result['confidence']:.2f})")
+        return normalize_encoding(result["encoding"])
+    # 多个编码都能严格解码时，取常用字符占比最高者，而不是第一个成功的
+    best, best_score = None, MIN_FALLBACK_SCORE
+    for encoding in FALLBACK_ENCODINGS:
+        text = _decode_sample(content, encoding)
+        if text is None:
+            continue
+        score = _frequent_share(text, encoding)
+        if score > best_score:
+            best, best_score = encoding, score
+    return best
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """从 Content-Type 中取出并规范化 charset 参数"""
+    if not content_type:
+        return None
+    found = _CHARSET_PARAM.search(content_type)
+    return normalize_encoding(found.group(1)) if found else None
+
+def detect_encoding(
+    content: bytes,
+    content_type: Optional[str] = None,
+    host: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    按开销从低到高确定响应体编码，只读取有界样本
+
+    BOM → Content-Type charset → HTML/XML meta 声明 → UTF-8 有效性 →
+    按主机缓存的检测结果 → 统计检测（增量、有界样本）→ latin-1。
+
+    Returns:
+        (编码名称, 来源)，来源为 bom/header/meta/utf-8/cache/detected/fallback
+    """
+    encoding = _sniff_bom(content)
+    if encoding is not None:
+        return encoding, "bom"
+    encoding = charset_from_content_type(content_type)
+    if encoding is not None:
+        return encoding, "header"
+    encoding = _sniff_meta(content)
+    if encoding is not None:
+        return encoding, "meta"
+    if _sample_decodes(content, "utf-8"):
+        return "utf-8", "utf-8"
+
+    encoding = charset_cache.get(host)
+    if encoding is not None and _sample_decodes(content, encoding):
+        return encoding, "cache"
+    encoding = _detect_statistically(content)
+    if encoding is not None:
+        charset_cache.put(host, encoding)
+        return encoding, "detected"
+    return "latin-1", "fallback"
+
+def decode_content(
+    content: bytes,
+    encoding: str = None,
+    content_type: Optional[str] = None,
+    host: Optional[str] = None
+) -> str:
     """
     智能解码字节内容，支持多编码策略
-    
+
+    优先严格尝试指定编码；失败或未指定时由 detect_encoding 在样本上确定
+    编码，再对全文解码一次（样本之后的非法字节以替换字符表示）。
+
     Args:
         content: 待解码的字节内容
         encoding: 优先尝试的编码（可选）
-        
+        content_type: 响应的 Content-Type（可选，用于读取 charset）
+        host: 上游主机（可选，用于缓存检测结果）
+
     Returns:
         解码后的字符串
-        
+
     Raises:
-        DecodingError: 当所有解码尝试失败时抛出
+        DecodingError: 检测出的编码无法使用时抛出
     """
     tried_encodings = set()
-    detected_encoding = None
-    
-    # 优先尝试用户指定编码或默认编码
-    explicit_encodings = []
     if encoding:
-        explicit_encodings.append(encoding)
-    else:
-        explicit_encodings.append(DEFAULT_ENCODING)
-    
-    # 创建编码尝试顺序：用户指定 -> 常用编码 -> 自动检测
-    encodings_to_try = []
-    for enc in explicit_encodings:
-        if enc not in encodings_to_try:
-            encodings_to_try.append(enc)
-    
-    for enc in COMMON_ENCODINGS:
-        if enc not in encodings_to_try:
-            encodings_to_try.append(enc)
-    
-    # 主解码流程
+        try:
+            return str(content, encoding)
+        except (UnicodeDecodeError, LookupError):
+            tried_encodings.add(encoding)
+
+    detected, source = detect_encoding(content, content_type, host)
+    logging.debug(f"使用编码 {detected} 解码（来源: {source}）")
     try:
-        # 第一阶段：显式指定的编码和常用编码
-        for enc in encodings_to_try:
-            if enc in tried_encodings:
-                continue
-            try:
-                logging.debug(f"尝试解码使用编码: {enc}")
-                return content.decode(enc)
-            except UnicodeDecodeError:
-                tried_encodings.add(enc)
-        
-        # 第二阶段：自动检测编码
-        if not detected_encoding:
-            detection = chardet.detect(content)
-            detected_encoding = detection['encoding']
-            confidence = detection['confidence']
-            logging.debug(f"检测到编码: {detected_encoding} (置信度: {confidence:.2f})")
-        
-        if detected_encoding and detected_encoding not in tried_encodings:
-            try:
-                return content.decode(detected_encoding)
-            except UnicodeDecodeError:
-                tried_encodings.add(detected_encoding)
-                
-    except Exception as e:
-        logging.error(f"解码过程中发生异常: {str(e)}")
-        raise DecodingError(f"解码异常: {str(e)}", tried_encodings)
-    
-    # 所有尝试失败
-    raise DecodingError(
-        f"无法解码内容，已尝试编码: {sorted(tried_encodings)}", 
-        tried_encodings
-    )
\ No newline at end of file
+        return str(content, detected, "replace")
+    except LookupError as e:
+        tried_encodings.add(detected)
+        raise DecodingError(f"无法解码内容，已尝试编码: {sorted(tried_encodings)}", tried_encodings) from e
+
+def resolve_response_encoding(response) -> str:
+    """
+    确定 httpx 响应的编码并设置到响应上（不解码响应体）
+
+    显式设置的编码（如请求参数 encoding）优先；否则按 detect_encoding 确定。
+    """
+    if getattr(response, "_encoding", None) is None and not hasattr(response, "_text"):
+        try:
+            host = response.url.host
+        except RuntimeError:  # 未关联请求的响应
+            host = None
+        response.encoding, _ = detect_encoding(response.content, response.headers.get("content-type"), host)
+    return response.encoding
+
+def response_text(response) -> str:
+    """httpx 响应的文本（编码由 resolve_response_encoding 确定）"""
+    resolve_response_encoding(response)
+    return response.text
@@ -0,0 +1,130 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+def _load_inotify() -> Optional[ctypes.CDLL]:
+    """加载 libc 的 inotify 接口；非 Linux 或不可用时返回None"""
+    if not hasattr(os, "O_NONBLOCK"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """
+    监视一组文件的变更并回调
+
+    Linux 上通过 inotify 监听文件所在目录（可感知原子替换与轮转），其他平台
+    或 inotify 不可用时退化为按 (mtime, size, inode) 轮询。回调在后台线程中
+    执行，同一批事件只触发一次。
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        callback: Callable[[], None],
+        poll_interval: float = 0.5,
+        use_inotify: bool = True
+    ):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fd: Optional[int] = None
+        if use_inotify:
+            self._fd = self._init_inotify()
+        self.mode = "inotify" if self._fd is not None else "poll"
+
+    def _init_inotify(self) -> Optional[int]:
+        libc = _load_inotify()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        for directory in {os.path.dirname(path) for path in self.paths}:
+            if libc.inotify_add_watch(fd, directory.encode(), _WATCH_MASK) < 0:
+                logging.warning(f"inotify 监视 {directory} 失败，改为轮询")
+                os.close(fd)
+                return None
+        return fd
+
+    def start(self) -> None:
+        if self._thread is None:
+            target = self._inotify_loop if self._fd is not None else self._poll_loop
+            self._thread = threading.Thread(target=target, name="file-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.poll_interval * 4)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _notify(self) -> None:
+        try:
+            self.callback()
+        except Exception:
+            logging.exception("文件变更回调执行失败")
+
+    def _inotify_loop(self) -> None:
+        names = {os.path.basename(path) for path in self.paths}
+        while not self._stopped.is_set():
+            readable, _, _ = select.select([self._fd], [], [], self.poll_interval)
+            if not readable or self._stopped.is_set():
+                continue
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+            changed, offset = False, 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                _, _, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+                changed = changed or name in names
+            if changed:
+                self._notify()
+
+    def _stat_all(self) -> Dict[str, Optional[Tuple[int, int, int]]]:
+        stats = {}
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                stats[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except FileNotFoundError:
+                stats[path] = None
+        return stats
+
+    def _poll_loop(self) -> None:
+        previous = self._stat_all()
+        while not self._stopped.wait(self.poll_interval):
+            current = self._stat_all()
+            if current != previous:
+                previous = current
+                self._notify()
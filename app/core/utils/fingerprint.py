@@ -0,0 +1,57 @@
+import hashlib
+import json
+from typing import Any, Iterable, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+def normalize_url(url: str) -> str:
+    """标准化URL：小写scheme/host，去除默认端口与片段，查询参数排序"""
+    parts = urlsplit(str(url))
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(":", 1)[-1]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    # 解码后排序再重新编码：值中编码的 &、= 不会与参数分隔符混淆
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)), doseq=True)
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+def request_fingerprint(
+    method: str,
+    url: str,
+    params: Optional[Mapping[str, Any]] = None,
+    headers: Optional[Mapping[str, Any]] = None,
+    body: Any = None,
+    ignore_headers: Iterable[str] = (),
+    extra: Any = None
+) -> str:
+    """
+    计算请求的标准化指纹
+
+    查询参数与请求头按名称排序（请求头名称不区分大小写），因此顺序不同的
+    等价请求得到相同指纹。
+
+    Args:
+        method: HTTP方法
+        url: 请求URL
+        params: 查询参数
+        headers: 请求头
+        body: 请求体（字符串、字节或可JSON序列化对象）
+        ignore_headers: 不参与指纹计算的请求头名称
+        extra: 其他需要区分的附加值（如配置档案）
+
+    Returns:
+        十六进制SHA-256指纹
+    """
+    ignored = {name.lower() for name in ignore_headers}
+    normalized = {
+        "method": method.upper(),
+        "url": normalize_url(url),
+        "params": sorted((str(k), str(v)) for k, v in (params or {}).items()),
+        "headers": sorted(
+            (str(k).lower(), str(v)) for k, v in (headers or {}).items()
+            if str(k).lower() not in ignored
+        ),
+        "body": body.decode("latin-1") if isinstance(body, bytes) else body,
+        "extra": extra,
+    }
+    encoded = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
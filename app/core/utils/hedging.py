@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.utils.latency_histogram import LatencyHistogram
+from app.core.utils.retry_policy import RetryBudget
+from app.core.utils.url_helper import url_netloc
+
+
+class HostLatencyTracker:
+    """按主机维护滚动延迟直方图（当前窗口 + 上一窗口）"""
+
+    def __init__(self, window_seconds: float, min_samples: int = 20):
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        # 主机 -> (窗口起始时间, 当前窗口, 上一窗口)
+        self._hosts: Dict[str, Tuple[float, LatencyHistogram, LatencyHistogram]] = {}
+
+    def _rotate(self, host: str) -> Tuple[float, LatencyHistogram, LatencyHistogram]:
+        now = time.monotonic()
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = (now, LatencyHistogram(), LatencyHistogram())
+        elif now - entry[0] >= self.window_seconds:
+            entry = (now, LatencyHistogram(), entry[1])
+        self._hosts[host] = entry
+        return entry
+
+    def record(self, url: str, seconds: float) -> None:
+        """记录一次成功请求的延迟"""
+        self._rotate(url_netloc(url))[1].record(seconds)
+
+    def percentile(self, url: str, percent: float) -> Optional[float]:
+        """主机最近两个窗口的延迟分位数；样本不足时返回None"""
+        _, current, previous = self._rotate(url_netloc(url))
+        combined = LatencyHistogram()
+        combined.merge(current)
+        combined.merge(previous)
+        if combined.count < self.min_samples:
+            return None
+        return combined.percentile(percent)
+
+
+def annotate_hedge(response: httpx.Response, hedged: bool, hedge_won: bool) -> httpx.Response:
+    """在响应扩展信息中记录对冲结果"""
+    response.extensions["hedge"] = {"hedged": hedged, "hedge_won": hedge_won}
+    return response
+
+
+async def hedged_call(
+    attempt: Callable[[], Awaitable[httpx.Response]],
+    url: str,
+    delay: Optional[float] = None
+) -> httpx.Response:
+    """
+    对冲请求
+
+    首个请求在延迟（缺省为该主机滚动 p95）内未完成时，若全局对冲预算允许，
+    则发出第二个相同请求，取先成功者并取消另一个，返回前等待被取消者退出。
+    两者均失败时抛出后失败者的异常。
+
+    Args:
+        attempt: 单次请求尝试的协程工厂
+        url: 请求URL（用于按主机查询延迟分位数）
+        delay: 对冲延迟（秒），缺省按滚动分位数计算
+    """
+    hedge_budget.deposit()
+    if delay is None:
+        delay = latency_tracker.percentile(url, settings.HEDGE_PERCENTILE)
+        if delay is None:
+            delay = settings.HEDGE_DEFAULT_DELAY_MS / 1000
+
+    primary = asyncio.ensure_future(attempt())
+    tasks = {primary}
+    winner: Optional[asyncio.Future] = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not hedge_budget.try_withdraw():
+            response = await primary
+            winner = primary
+            return annotate_hedge(response, hedged=False, hedge_won=False)
+
+        logging.info(f"请求 {delay * 1000:.0f}ms 内未完成，发出对冲请求: {url}")
+        hedge = asyncio.ensure_future(attempt())
+        tasks.add(hedge)
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    return annotate_hedge(task.result(), hedged=True, hedge_won=task is hedge)
+                last_error = task.exception()
+        raise last_error
+    finally:
+        losers = [task for task in tasks if task is not winner]
+        for task in losers:
+            task.cancel()
+        # 等待败者真正退出：调用方随后会关闭请求体（可能是 mmap），败者不能仍在发送
+        for result in await asyncio.gather(*losers, return_exceptions=True):
+            if isinstance(result, httpx.Response):
+                await result.aclose()
+
+latency_tracker = HostLatencyTracker(settings.HEDGE_WINDOW_SECONDS)
+hedge_budget = RetryBudget(
+    ratio=settings.HEDGE_BUDGET_RATIO,
+    min_per_second=settings.HEDGE_BUDGET_MIN_PER_SECOND,
+)
@@ -0,0 +1,186 @@
+import asyncio
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.utils.url_helper import url_netloc
+
+DEFAULT_PROFILE = "default"
+
+
+class HTTPClientManager:
+    """共享上游HTTP客户端管理器
+
+    每个配置档案维护一个长连接 ``httpx.AsyncClient``，由 FastAPI 生命周期
+    创建和关闭；在生命周期之外（如 Streamlit UI）首次使用时按事件循环惰性创建。
+    连接、单主机信号量与在途计数都绑定事件循环：循环变化时关闭旧客户端并
+    重建这些状态。
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._client_loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._host_semaphores: Dict[str, Dict[str, asyncio.Semaphore]] = {}
+        self._host_in_flight: Dict[str, Dict[str, int]] = {}
+        self._slot_loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._request_counts: Dict[str, int] = {}
+
+    def _profile_options(self, profile: str) -> Dict[str, Any]:
+        """合并全局连接池配置与档案覆盖项"""
+        options = {
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY,
+            "max_connections_per_host": settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            "http2": settings.HTTP2_ENABLED,
+        }
+        if profile != DEFAULT_PROFILE and profile not in settings.HTTP_CLIENT_PROFILES:
+            raise KeyError(f"未知的上游配置档案: {profile}")
+        options.update(settings.HTTP_CLIENT_PROFILES.get(profile, {}))
+        return options
+
+    def _create_client(self, profile: str) -> httpx.AsyncClient:
+        """按档案配置创建客户端"""
+        options = self._profile_options(profile)
+        http2 = bool(options["http2"])
+        if http2 and importlib.util.find_spec("h2") is None:
+            logging.warning(f"未安装h2，档案 {profile} 回退为HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=options["max_connections"],
+            max_keepalive_connections=options["max_keepalive_connections"],
+            keepalive_expiry=options["keepalive_expiry"],
+        )
+        client = httpx.AsyncClient(limits=limits, http2=http2)
+
+        self._request_counts.setdefault(profile, 0)
+        logging.info(
+            f"上游客户端已创建: 档案={profile}, 最大连接={options['max_connections']}, "
+            f"长连接={options['max_keepalive_connections']}, HTTP/2={http2}"
+        )
+        return client
+
+    async def startup(self) -> None:
+        """创建默认档案及所有已配置档案的客户端"""
+        for profile in [DEFAULT_PROFILE, *settings.HTTP_CLIENT_PROFILES]:
+            self.get_client(profile)
+
+    async def shutdown(self) -> None:
+        """关闭所有客户端并释放连接"""
+        for profile, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+                logging.info(f"上游客户端已关闭: 档案={profile}")
+            except Exception as e:
+                logging.error(f"关闭上游客户端失败: {e}")
+        self._clients.clear()
+        self._client_loops.clear()
+        self._host_semaphores.clear()
+        self._host_in_flight.clear()
+        self._slot_loops.clear()
+
+    def get_client(self, profile: str = DEFAULT_PROFILE) -> httpx.AsyncClient:
+        """获取档案对应的共享客户端（连接绑定事件循环，循环变化时重建）"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        client = self._clients.get(profile)
+        if client is None or client.is_closed or (
+            loop is not None and self._client_loops.get(profile) not in (None, loop)
+        ):
+            if client is not None and not client.is_closed:
+                self._discard_client(profile, client, self._client_loops.get(profile))
+            client = self._create_client(profile)
+            self._clients[profile] = client
+            self._client_loops[profile] = loop
+        elif self._client_loops.get(profile) is None:
+            self._client_loops[profile] = loop
+        return client
+
+    def _discard_client(
+        self,
+        profile: str,
+        client: httpx.AsyncClient,
+        loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
+        """
+        尽力关闭绑定到旧事件循环的客户端
+
+        旧循环仍在其他线程运行时，在该循环中调度 aclose；已结束（如每次
+        asyncio.run）时无法再执行异步关闭，只丢弃引用，连接随旧循环的传输
+        一起由垃圾回收释放。
+        """
+        try:
+            if loop is not None and loop.is_running() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                logging.info(f"事件循环已变化，旧上游客户端已交由原循环关闭: 档案={profile}")
+            else:
+                logging.info(f"事件循环已变化，丢弃旧上游客户端: 档案={profile}")
+        except Exception as e:
+            logging.warning(f"关闭旧事件循环的上游客户端失败: 档案={profile}, {e}")
+
+    def _loop_state(self, profile: str) -> Tuple[Dict[str, asyncio.Semaphore], Dict[str, int]]:
+        """当前事件循环的单主机信号量与在途计数（循环变化时重置）"""
+        loop = asyncio.get_running_loop()
+        if self._slot_loops.get(profile) is not loop:
+            self._slot_loops[profile] = loop
+            self._host_semaphores[profile] = {}
+            self._host_in_flight[profile] = {}
+        return self._host_semaphores[profile], self._host_in_flight[profile]
+
+    @asynccontextmanager
+    async def host_slot(self, url: str, profile: str = DEFAULT_PROFILE) -> AsyncIterator[None]:
+        """占用单主机并发名额，限制对同一上游的并发请求数"""
+        host = url_netloc(url)
+        semaphores, in_flight = self._loop_state(profile)
+        semaphore = semaphores.get(host)
+        if semaphore is None:
+            limit = self._profile_options(profile)["max_connections_per_host"]
+            semaphore = semaphores[host] = asyncio.Semaphore(limit)
+
+        async with semaphore:
+            in_flight[host] = in_flight.get(host, 0) + 1
+            self._request_counts[profile] = self._request_counts.get(profile, 0) + 1
+            try:
+                yield
+            finally:
+                in_flight[host] -= 1
+                if not in_flight[host]:
+                    del in_flight[host]
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """汇总各档案连接池统计信息"""
+        stats = {}
+        for profile, client in self._clients.items():
+            connections = self._pool_connections(client)
+            idle = sum(1 for conn in connections if conn.is_idle())
+            stats[profile] = {
+                "closed": client.is_closed,
+                "connections": len(connections),
+                "idle_connections": idle,
+                "active_connections": len(connections) - idle,
+                "requests_total": self._request_counts.get(profile, 0),
+                "in_flight_by_host": dict(self._host_in_flight.get(profile, {})),
+            }
+        return stats
+
+    @staticmethod
+    def _pool_connections(client: httpx.AsyncClient) -> list:
+        """读取httpcore连接池中的连接列表（内部结构不可用时返回空）"""
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        return list(getattr(pool, "connections", []) or [])
+
+
+http_client_manager = HTTPClientManager()
+
+
+def get_http_client(profile: str = DEFAULT_PROFILE) -> httpx.AsyncClient:
+    """获取共享上游客户端"""
+    return http_client_manager.get_client(profile)
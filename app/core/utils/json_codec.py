@@ -0,0 +1,34 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # 可选依赖：更快的 JSON 序列化
+except ImportError:
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+def dumps(content: Any) -> bytes:
+    """
+    序列化为紧凑的 UTF-8 JSON 字节
+
+    优先使用 orjson；未安装或遇到其不支持的值（如超出 64 位的整数）时
+    退回标准库的 C 编码器，输出格式与 JSONResponse 一致。
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """默认响应类：用 dumps 代替 JSONResponse 的标准库序列化"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
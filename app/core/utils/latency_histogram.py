@@ -0,0 +1,72 @@
+import math
+from typing import Dict, Iterable, Optional
+
+class LatencyHistogram:
+    """
+    对数分桶延迟直方图（HDR 风格）
+
+    以微秒记录数值，桶宽按 ``1 + precision`` 的几何级数增长，任意分位数的
+    相对误差不超过 precision，内存占用只与数值范围的对数相关。
+    """
+
+    def __init__(self, precision: float = 0.01):
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        """记录一个延迟值（秒）"""
+        micros = max(seconds * 1_000_000, 1.0)
+        index = int(math.log(micros) / self._log_base)
+        self._counts[index] = self._counts.get(index, 0) + count
+        self.count += count
+        self.total += seconds * count
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """合并另一个相同精度的直方图"""
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """返回分位数（秒），无数据时返回None"""
+        if not self.count:
+            return None
+        threshold = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= threshold:
+                upper = math.exp((index + 1) * self._log_base) / 1_000_000
+                return min(upper, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def summary(self, percentiles: Iterable[float] = (50, 90, 99, 99.9)) -> Dict[str, Optional[float]]:
+        """汇总统计（毫秒）"""
+        def to_ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 3) if value is not None else None
+
+        result = {
+            "count": self.count,
+            "min_ms": to_ms(self.min),
+            "mean_ms": to_ms(self.mean),
+            "max_ms": to_ms(self.max),
+        }
+        for percent in percentiles:
+            result[f"p{percent:g}_ms"] = to_ms(self.percentile(percent))
+        return result
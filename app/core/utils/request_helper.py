@@ -1,9 +1,36 @@
 import httpx
-import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+import weakref
+from contextlib import AsyncExitStack
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from app.core.config import settings
 
 from app.core.errors.http_errors import HTTPError
+from app.core.utils.body_spool import SpooledBody, spool_request_body
+from app.core.utils.compression import compress_request_body
+from app.core.utils.encoding_helper import resolve_response_encoding
+from app.core.utils.http_client import DEFAULT_PROFILE, http_client_manager
+from app.core.utils.response_cache import CacheLookup, response_cache
+from app.core.utils.fingerprint import request_fingerprint
+from app.core.utils.single_flight import single_flight
+from app.core.utils.circuit_breaker import upstream_guard
+from app.core.utils.hedging import hedged_call, latency_tracker
+from app.core.services.record_replay import record_replay
+from app.core.utils.retry_policy import (
+    RetryPolicy,
+    RetryState,
+    default_retry_policy,
+    parse_retry_after,
+    retry_budget,
+)
+
+T = TypeVar("T")
+
+COALESCIBLE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# 仅缓冲模式支持的选项，流式模式下忽略
+BUFFERED_ONLY_OPTIONS = ("cache_mode", "coalesce", "hedge", "hedge_delay_ms", "max_body_bytes", "replay_mode")
 
 async def send_http_request(
     method: str,
@@ -16,6 +43,15 @@ async def send_http_request(
     retries: int = 3,
     backoff_factor: float = 0.3,
     encoding: Optional[str] = None,
+    profile: str = DEFAULT_PROFILE,
+    retry_policy: Optional[RetryPolicy] = None,
+    max_body_bytes: Optional[int] = None,
+    cache_mode: str = "default",
+    coalesce: bool = True,
+    hedge: bool = False,
+    hedge_delay_ms: Optional[float] = None,
+    replay_mode: Optional[str] = None,
+    compress_body: Optional[str] = None,
     **kwargs: Dict[str, Any]
 ) -> httpx.Response:
     """
@@ -28,10 +64,19 @@ async def send_http_request(
         params: URL查询参数
         data: 表单数据
         json: JSON请求体数据
-        timeout: 超时时间（秒）
+        timeout: 总截止时间（秒），覆盖所有尝试与退避等待
         retries: 最大重试次数
         backoff_factor: 重试间隔因子
         encoding: 响应编码
+        profile: 上游配置档案（决定使用的共享连接池）
+        retry_policy: 重试策略（缺省时由 retries/backoff_factor 与全局配置构建）
+        max_body_bytes: 响应体大小上限（缺省使用 MAX_RESPONSE_BODY_BYTES，0 表示不限）
+        cache_mode: 缓存模式（default/bypass/refresh）
+        coalesce: 是否与相同的并发无请求体幂等请求合并为一次上游调用
+        hedge: 是否对幂等请求启用对冲（慢请求时发出第二个相同请求）
+        hedge_delay_ms: 对冲延迟（毫秒，缺省为该主机滚动分位数延迟）
+        replay_mode: 录制回放模式（off/record/replay/auto，缺省使用 REPLAY_MODE）
+        compress_body: 请求体压缩编码（gzip/br/zstd，需上游支持 Content-Encoding）
         **kwargs: 其他httpx参数
         
     Returns:
@@ -41,37 +86,312 @@ async def send_http_request(
         HTTPError: 请求失败时抛出
     """
     validate_request_body(data, json)
-    
+
+    # 录制/回放：回放命中时不访问网络
+    mode = record_replay.resolve_mode(replay_mode)
+    if mode != "off":
+        return await record_replay.run(
+            mode, method, url, params, headers, data, json,
+            lambda: send_http_request(
+                method, url,
+                headers=headers, params=params, data=data, json=json, timeout=timeout,
+                retries=retries, backoff_factor=backoff_factor, encoding=encoding,
+                profile=profile, retry_policy=retry_policy, max_body_bytes=max_body_bytes,
+                cache_mode=cache_mode, coalesce=coalesce, hedge=hedge,
+                hedge_delay_ms=hedge_delay_ms, replay_mode="off",
+                compress_body=compress_body, **kwargs
+            )
+        )
+
+    # 单飞合并：相同的并发请求共享一次上游调用
+    if coalesce and settings.SINGLE_FLIGHT_ENABLED and is_coalescible(method, data, json, kwargs):
+        key = request_fingerprint(
+            method, url, params, headers,
+            extra=[profile, encoding, cache_mode, max_body_bytes, hedge, hedge_delay_ms]
+        )
+        return await single_flight.do(
+            key,
+            lambda: send_http_request(
+                method, url,
+                headers=headers, params=params, timeout=timeout, retries=retries,
+                backoff_factor=backoff_factor, encoding=encoding, profile=profile,
+                retry_policy=retry_policy, max_body_bytes=max_body_bytes,
+                cache_mode=cache_mode, coalesce=False,
+                hedge=hedge, hedge_delay_ms=hedge_delay_ms, replay_mode="off"
+            ),
+            timeout
+        )
+
+    policy = retry_policy or default_retry_policy(retries, backoff_factor)
+    state = RetryState(policy, timeout)
+    max_body_bytes = settings.MAX_RESPONSE_BODY_BYTES if max_body_bytes is None else max_body_bytes
+
+    # 缓存查找：新鲜条目直接返回，过期条目携带验证器发起条件请求
+    use_cache = settings.CACHE_ENABLED and response_cache.is_cacheable_request(method, headers)
+    lookup: Optional[CacheLookup] = None
+    request_headers = headers
+    if use_cache and cache_mode == "bypass":
+        response_cache.record_bypass()
+        use_cache = False
+    elif use_cache and cache_mode == "default":
+        started = time.perf_counter()
+        lookup = await response_cache.lookup(method, url, params, headers, profile)
+        if lookup.fresh:
+            request = httpx.Request(method, url, params=params, headers=headers)
+            response = lookup.entry.to_response(request, "HIT", time.perf_counter() - started)
+            configure_response_encoding(response, encoding)
+            resolve_response_encoding(response)
+            return response
+        if lookup.entry is not None:
+            request_headers = {**(headers or {}), **lookup.entry.conditional_headers()}
+
+    # 可选的请求体压缩：编码并压缩一次，所有尝试复用
+    content: Optional[bytes] = None
+    if compress_body:
+        compressed = await compress_request_body(data, json, compress_body)
+        if compressed is not None:
+            content, body_headers = compressed
+            request_headers = {**(request_headers or {}), **body_headers}
+            data = json = None
+
+    # 请求体编码一次并计入内存预算（大请求体溢出到磁盘），每次尝试从头流式发送
+    request_body = spool_request_body(data if content is None else content, json)
+    if request_body is not None:
+        body_headers = {"Content-Length": str(request_body.size)}
+        if json is not None:
+            body_headers["Content-Type"] = "application/json"
+        request_headers = {**(request_headers or {}), **body_headers}
+        data = json = content = None
+
     async def attempt_request() -> httpx.Response:
-        """执行单次请求尝试"""
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.request(
+        """执行单次请求尝试（超时为剩余的总截止时间，响应体受大小上限约束）"""
+        client = http_client_manager.get_client(profile)
+        if request_body is not None:
+            body_kwargs = {"content": request_body.aiter_chunks()}
+        elif content is not None:
+            body_kwargs = {"content": content}
+        else:
+            body_kwargs = {}
+        async with upstream_guard.guard(url, remaining_timeout(state)) as ticket:
+            async with http_client_manager.host_slot(url, profile):
+                async with client.stream(
+                    method=method,
+                    url=url,
+                    headers=request_headers,
+                    params=params,
+                    data=data,
+                    json=json,
+                    timeout=remaining_timeout(state),
+                    **body_kwargs,
+                    **kwargs
+                ) as response:
+                    if ticket:
+                        ticket.record(response.status_code)
+                    await read_response_body(response, max_body_bytes)
+        if response.status_code == 304 and request_headers is not headers:
+            return response
+        response.raise_for_status()
+        latency_tracker.record(url, response.elapsed.total_seconds())
+        return response
+
+    attempt = attempt_request
+    if hedge and policy.allows_method(method):
+        hedge_delay = hedge_delay_ms / 1000 if hedge_delay_ms is not None else None
+        attempt = lambda: hedged_call(attempt_request, url, hedge_delay)
+
+    try:
+        response = await execute_with_retries(attempt, method, state)
+    finally:
+        if request_body is not None:
+            request_body.close()
+    if response.status_code == 304 and lookup is not None and lookup.entry is not None:
+        response = await response_cache.revalidated(lookup, response)
+    elif use_cache:
+        await response_cache.store(method, url, params, headers, response, profile)
+    configure_response_encoding(response, encoding)
+    # 须在任何代码读取 response.encoding 之前检测：httpx 的 getter 会把未声明
+    # charset 的响应固定为 utf-8，之后的检测（BOM/meta/统计）将被跳过
+    resolve_response_encoding(response)
+    log_request_details(response, state.attempt, policy.max_retries)
+    return response
+
+async def open_http_stream(
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, str]] = None,
+    data: Optional[Any] = None,
+    json: Optional[Any] = None,
+    timeout: Optional[float] = 5.0,
+    retries: int = 3,
+    backoff_factor: float = 0.3,
+    encoding: Optional[str] = None,
+    profile: str = DEFAULT_PROFILE,
+    retry_policy: Optional[RetryPolicy] = None,
+    compress_body: Optional[str] = None,
+    **kwargs: Dict[str, Any]
+) -> "UpstreamStream":
+    """
+    以流式模式发送请求，仅等待到响应头即返回
+
+    重试与总截止时间只作用于建立响应阶段；响应体由调用方通过
+    ``UpstreamStream.iter_chunks`` 按块读取，读取结束或中断时释放连接。
+    参数含义同 ``send_http_request``。
+
+    Returns:
+        UpstreamStream 对象
+
+    Raises:
+        HTTPError: 请求失败时抛出
+    """
+    validate_request_body(data, json)
+    for option in BUFFERED_ONLY_OPTIONS:
+        kwargs.pop(option, None)
+    if compress_body:
+        compressed = await compress_request_body(data, json, compress_body)
+        if compressed is not None:
+            content, body_headers = compressed
+            headers = {**(headers or {}), **body_headers}
+            data = json = None
+            kwargs["content"] = content
+
+    policy = retry_policy or default_retry_policy(retries, backoff_factor)
+    state = RetryState(policy, timeout)
+
+    async def attempt_request() -> UpstreamStream:
+        """建立流式响应，持有连接与主机并发名额直至流关闭"""
+        client = http_client_manager.get_client(profile)
+        stack = AsyncExitStack()
+        try:
+            ticket = await stack.enter_async_context(upstream_guard.guard(url, remaining_timeout(state)))
+            await stack.enter_async_context(http_client_manager.host_slot(url, profile))
+            response = await stack.enter_async_context(client.stream(
                 method=method,
                 url=url,
                 headers=headers,
                 params=params,
                 data=data,
                 json=json,
+                timeout=remaining_timeout(state),
                 **kwargs
-            )
-            response.raise_for_status()
-            return response
-            
-    for attempt in range(retries + 1):
+            ))
+            if ticket:
+                ticket.record(response.status_code)
+            if response.is_error:
+                await read_response_body(response, settings.MAX_RESPONSE_BODY_BYTES)
+                response.raise_for_status()
+        except BaseException:
+            await stack.aclose()
+            raise
+        return UpstreamStream(response, stack)
+
+    upstream = await execute_with_retries(attempt_request, method, state)
+    configure_response_encoding(upstream.response, encoding)
+    log_request_details(upstream.response, state.attempt, policy.max_retries)
+    return upstream
+
+class UpstreamStream:
+    """流式上游响应：原样转发压缩后的字节，关闭时释放连接"""
+
+    # 逐跳头部及由下游重新计算的头部，不向调用方转发
+    HOP_BY_HOP_HEADERS = frozenset({
+        "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+        "te", "trailer", "transfer-encoding", "upgrade",
+    })
+
+    def __init__(self, response: httpx.Response, exit_stack: AsyncExitStack):
+        self.response = response
+        self._exit_stack = exit_stack
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    def passthrough_headers(self) -> Dict[str, str]:
+        """可透传给调用方的响应头"""
+        return {
+            key: value
+            for key, value in self.response.headers.items()
+            if key.lower() not in self.HOP_BY_HOP_HEADERS
+        }
+
+    async def iter_chunks(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """按块读取原始响应体，结束或中断时自动关闭"""
         try:
-            response = await attempt_request()
-            configure_response_encoding(response, encoding)
-            log_request_details(response, attempt, retries)
-            return response
-            
+            async for chunk in self.response.aiter_raw(chunk_size):
+                yield chunk
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """关闭上游响应并释放主机并发名额（可重复调用）"""
+        await self._exit_stack.aclose()
+
+async def execute_with_retries(
+    attempt_request: Callable[[], Awaitable[T]],
+    method: str,
+    state: RetryState
+) -> T:
+    """按重试策略执行请求尝试，直至成功或放弃"""
+    retry_budget.deposit()
+    while True:
+        try:
+            return await attempt_request()
         except httpx.HTTPStatusError as e:
-            handle_http_error(e, attempt, retries, backoff_factor)
+            await handle_http_error(e, method, state)
         except httpx.RequestError as e:
-            handle_request_error(e, attempt, retries, backoff_factor)
+            await handle_request_error(e, method, state)
+        except HTTPError:
+            raise
         except Exception as e:
             logging.exception("Unexpected error occurred")
             raise HTTPError(500, f"请求失败: {str(e)}")
 
+def remaining_timeout(state: RetryState) -> Optional[float]:
+    """本次尝试可用的超时时间（剩余的总截止时间）"""
+    remaining = state.remaining()
+    if remaining is not None and remaining <= 0:
+        raise httpx.TimeoutException("已超出请求总截止时间")
+    return remaining
+
+async def read_response_body(response: httpx.Response, max_bytes: Optional[int]) -> None:
+    """
+    读取响应体，超过大小上限时中止读取
+
+    超过 BODY_SPOOL_THRESHOLD_BYTES 或进程内存预算不足时，响应体写入临时文件，
+    ``response.content`` 为只读 mmap（支持切片与缓冲区协议），并在
+    ``response.extensions["spooled"]`` 中标记。内存中的响应体在响应对象被回收时
+    归还内存预算。
+    """
+    content_length = response.headers.get("Content-Length")
+    if max_bytes and content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPError(502, f"上游响应体超过上限 {max_bytes} 字节")
+
+    body = SpooledBody()
+    try:
+        async for chunk in response.aiter_bytes():
+            if max_bytes and body.size + len(chunk) > max_bytes:
+                raise HTTPError(502, f"上游响应体超过上限 {max_bytes} 字节")
+            body.write(chunk)
+        # 与 httpx.Response.aread 相同：读取完毕后缓存到 _content，供 .content/.text 使用
+        response._content = body.finish()
+    except BaseException:
+        body.close()
+        raise
+    if body.spooled:
+        response.extensions["spooled"] = True
+    elif body.reserved:
+        weakref.finalize(response, body.budget.release, body.reserved)
+
+def is_coalescible(method: str, data: Any, json_data: Any, extra_kwargs: Dict[str, Any]) -> bool:
+    """无请求体且无额外httpx参数的安全方法请求才允许合并"""
+    return (
+        method.upper() in COALESCIBLE_METHODS
+        and data is None
+        and json_data is None
+        and not extra_kwargs
+    )
+
 def validate_request_body(data: Any, json_data: Any) -> None:
     """验证请求体参数冲突"""
     if data is not None and json_data is not None:
@@ -90,24 +410,35 @@ def log_request_details(response: httpx.Response, attempt: int, max_retries: int
         f"状态码: {response.status_code}, "
         f"编码: {response.encoding}"
     )
-    logging.debug(f"请求头: {response.request.headers}")
-    logging.debug(f"响应头: {response.headers}")
-    logging.debug(f"响应内容: {response.text}")
-
-def handle_http_error(exc: httpx.HTTPStatusError, attempt: int, max_retries: int, backoff: float) -> None:
-    """处理HTTP状态错误"""
-    if attempt < max_retries:
-        delay = backoff * (2 ** attempt)
-        logging.warning(f"HTTP错误 {exc.response.status_code}, {delay:.1f}秒后重试...")
-        asyncio.sleep(delay)
-    else:
-        raise HTTPError(exc.response.status_code, exc.response.text)
-
-def handle_request_error(exc: httpx.RequestError, attempt: int, max_retries: int, backoff: float) -> None:
-    """处理请求层错误"""
-    if attempt < max_retries:
-        delay = backoff * (2 ** attempt)
-        logging.warning(f"请求错误: {str(exc)}, {delay:.1f}秒后重试...")
-        asyncio.sleep(delay)
-    else:
-        raise HTTPError(500, str(exc))
\ No newline at end of file
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"请求头: {response.request.headers}")
+        logging.debug(f"响应头: {response.headers}")
+        if response.is_closed:
+            logging.debug(f"响应内容: {response.text}")
+
+async def handle_http_error(exc: httpx.HTTPStatusError, method: str, state: RetryState) -> None:
+    """处理HTTP状态错误：可重试时等待退避，否则抛出HTTPError"""
+    status_code = exc.response.status_code
+    delay = None
+    if state.policy.allows_method(method) and state.policy.allows_status(status_code):
+        retry_after = parse_retry_after(exc.response.headers.get("Retry-After"))
+        delay = state.next_delay(retry_after)
+
+    if delay is None or not retry_budget.try_withdraw():
+        raise HTTPError(status_code, exc.response.text)
+
+    logging.warning(f"HTTP错误 {status_code}, {delay:.1f}秒后重试...")
+    await state.wait(delay)
+
+async def handle_request_error(exc: httpx.RequestError, method: str, state: RetryState) -> None:
+    """处理请求层错误：可重试时等待退避，否则抛出HTTPError"""
+    remaining = state.remaining()
+    if isinstance(exc, httpx.TimeoutException) and remaining is not None and remaining <= 0:
+        raise HTTPError(504, f"请求超时: {str(exc)}")
+
+    delay = state.next_delay() if state.policy.allows_method(method) else None
+    if delay is None or not retry_budget.try_withdraw():
+        raise HTTPError(500, str(exc))
+
+    logging.warning(f"请求错误: {str(exc)}, {delay:.1f}秒后重试...")
+    await state.wait(delay)
@@ -0,0 +1,523 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+from app.core.config import settings
+from app.core.utils.http_client import DEFAULT_PROFILE
+
+CACHEABLE_METHODS = frozenset({"GET", "HEAD"})
+CACHEABLE_STATUSES = frozenset({200, 203})
+CACHE_MODES = ("default", "bypass", "refresh")
+# 缓存的是已解码的响应体，这些头部需在存储时移除
+_STRIPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+# 携带调用方凭据的请求头：共享缓存只在响应显式允许共享时才为其存储与复用
+_CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """解析 Cache-Control 头为指令字典"""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    """解析HTTP日期为时间戳"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def has_credentials(headers: Optional[Mapping[str, Any]]) -> bool:
+    """请求是否携带凭据（Authorization 或 Cookie）"""
+    return any(k.lower() in _CREDENTIAL_HEADERS and v for k, v in (headers or {}).items())
+
+def is_shared_response(headers: Mapping[str, str]) -> bool:
+    """响应是否显式允许共享缓存复用带凭据请求的结果（public 或 s-maxage）"""
+    directives = parse_cache_control(headers.get("cache-control"))
+    return "public" in directives or "s-maxage" in directives
+
+def freshness_lifetime(headers: Mapping[str, str], authorized: bool = False) -> Optional[float]:
+    """
+    计算响应在共享缓存中的新鲜期（秒）
+
+    Args:
+        headers: 响应头
+        authorized: 请求是否携带凭据；此时只有声明 public/s-maxage 的响应可存储
+
+    Returns:
+        新鲜期秒数；0 表示可存储但每次使用前需重新验证；None 表示不可缓存
+    """
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives or "private" in directives:
+        return None
+    if authorized and not is_shared_response(headers):
+        return None
+    has_validator = bool(headers.get("etag") or headers.get("last-modified"))
+    if "no-cache" in directives:
+        return 0.0 if has_validator else None
+
+    for name in ("s-maxage", "max-age"):
+        arg = directives.get(name)
+        if arg is not None and arg.isdigit():
+            return float(arg)
+
+    expires = _parse_http_date(headers.get("expires"))
+    if expires is not None:
+        date = _parse_http_date(headers.get("date")) or time.time()
+        return max(0.0, expires - date)
+
+    return 0.0 if has_validator else None
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+
+    status_code: int
+    headers: List[Tuple[str, str]]
+    content: bytes
+    stored_at: float
+    expires_at: float
+    vary: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """构建条件请求头（If-None-Match / If-Modified-Since）"""
+        conditional = {}
+        etag = self.header("etag")
+        if etag:
+            conditional["If-None-Match"] = etag
+        last_modified = self.header("last-modified")
+        if last_modified:
+            conditional["If-Modified-Since"] = last_modified
+        return conditional
+
+    def to_response(self, request: httpx.Request, cache_status: str, elapsed: float) -> httpx.Response:
+        """重建 httpx 响应对象"""
+        response = httpx.Response(
+            self.status_code,
+            headers=self.headers + [("X-Cache", cache_status)],
+            content=self.content,
+            request=request,
+        )
+        response.elapsed = timedelta(seconds=max(elapsed, 1e-6))
+        return response
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "stored_at": self.stored_at,
+            "expires_at": self.expires_at,
+            "vary": self.vary,
+        }
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any], content: bytes) -> "CacheEntry":
+        return cls(
+            status_code=metadata["status_code"],
+            headers=[tuple(item) for item in metadata["headers"]],
+            content=content,
+            stored_at=metadata["stored_at"],
+            expires_at=metadata["expires_at"],
+            vary=metadata.get("vary", {}),
+        )
+
+
+class CacheBackend:
+    """缓存存储后端接口"""
+
+    # 后端操作是否阻塞（阻塞后端在线程池中执行）
+    blocking = False
+    # 单个条目容量上限（0 表示不限）
+    max_entry_bytes = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def usage(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """内存LRU后端，按总字节数与单条目字节数限制容量"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        # 先删除旧条目：新响应超出单条目上限时也不能继续提供旧的表示
+        self.delete(key)
+        if entry.size > self.max_entry_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def usage(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    磁盘后端：元数据与响应体分文件存储，超出容量时按访问时间淘汰
+
+    启动时扫描一次目录，按修改时间建立内存中的 LRU 索引与总字节数，之后的
+    读写只更新索引，淘汰不再列目录。多进程共享目录时每个进程只跟踪自己写入
+    或读到的条目，容量为近似上限。
+    """
+
+    blocking = True
+
+    def __init__(self, directory: str, max_bytes: int, max_entry_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # 元数据路径 -> 条目字节数，按访问时间从旧到新排列
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        for _, size, meta_path in sorted(self._scan()):
+            self._index[meta_path] = size
+            self._bytes += size
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return base + ".json", base + ".body"
+
+    def _track(self, meta_path: str, size: int) -> None:
+        """记录（或刷新）条目的大小与访问顺序，调用方需持有锁"""
+        self._bytes += size - self._index.pop(meta_path, 0)
+        self._index[meta_path] = size
+
+    def _untrack(self, meta_path: str) -> None:
+        self._bytes -= self._index.pop(meta_path, 0)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "rb") as f:
+                raw_metadata = f.read()
+            with open(body_path, "rb") as f:
+                content = f.read()
+            metadata = json.loads(raw_metadata)
+            os.utime(meta_path)
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+        with self._lock:
+            self._track(meta_path, len(raw_metadata) + len(content))
+        return CacheEntry.from_metadata(metadata, content)
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_entry_bytes:
+            self.delete(key)
+            return
+        meta_path, body_path = self._paths(key)
+        raw_metadata = json.dumps(entry.to_metadata()).encode("utf-8")
+        with self._lock:
+            # 临时文件写完后原子替换，读取方不会看到半写入的文件
+            with open(body_path + ".tmp", "wb") as f:
+                f.write(entry.content)
+            os.replace(body_path + ".tmp", body_path)
+            with open(meta_path + ".tmp", "wb") as f:
+                f.write(raw_metadata)
+            os.replace(meta_path + ".tmp", meta_path)
+            self._track(meta_path, len(raw_metadata) + len(entry.content))
+            self._evict()
+
+    @staticmethod
+    def _remove_files(meta_path: str) -> None:
+        for path in (meta_path, meta_path[:-5] + ".body"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def delete(self, key: str) -> None:
+        meta_path, _ = self._paths(key)
+        with self._lock:
+            self._remove_files(meta_path)
+            self._untrack(meta_path)
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, name))
+            self._index.clear()
+            self._bytes = 0
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        """列出 (访问时间, 字节数, 元数据路径)，仅在启动时调用"""
+        items = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            body_path = meta_path[:-5] + ".body"
+            try:
+                size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+                items.append((os.path.getmtime(meta_path), size, meta_path))
+            except FileNotFoundError:
+                continue
+        return items
+
+    def _evict(self) -> None:
+        """按 LRU 顺序淘汰直至总字节数不超过上限，调用方需持有锁"""
+        while self._bytes > self.max_bytes and self._index:
+            meta_path, size = self._index.popitem(last=False)
+            self._remove_files(meta_path)
+            self._bytes -= size
+            self.evictions += 1
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._index), "bytes": self._bytes, "evictions": self.evictions}
+
+
+@dataclass
+class CacheLookup:
+    """缓存查找结果（fresh 为 False 且存在条目时需重新验证）"""
+
+    key: str
+    entry: Optional[CacheEntry] = None
+    fresh: bool = False
+
+
+class ResponseCache:
+    """
+    上游响应缓存
+
+    主键为 上游配置档案 + 方法 + URL + 排序后的查询参数；响应声明 Vary 时，
+    再拼接请求中对应头部的取值区分变体。遵循 Cache-Control/Expires 计算新鲜期，
+    过期条目携带 ETag/Last-Modified 发起条件请求重新验证。
+
+    作为共享缓存，不存储 private 响应；携带 Authorization/Cookie 的请求只存储
+    和复用声明 public 或 s-maxage 的响应。
+    """
+
+    def __init__(self, backend: CacheBackend, max_vary_index: int = 10000):
+        self.backend = backend
+        self.max_vary_index = max_vary_index
+        self._vary_index: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self._stats = {
+            "hits": 0, "misses": 0, "stale": 0, "revalidations": 0, "stores": 0, "bypasses": 0
+        }
+
+    async def _call(self, func, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    @staticmethod
+    def is_cacheable_request(method: str, headers: Optional[Mapping[str, Any]]) -> bool:
+        """请求是否可使用缓存"""
+        if method.upper() not in CACHEABLE_METHODS:
+            return False
+        lowered = {k.lower(): v for k, v in (headers or {}).items()}
+        return "no-store" not in parse_cache_control(lowered.get("cache-control"))
+
+    @staticmethod
+    def make_primary_key(
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        profile: str = DEFAULT_PROFILE
+    ) -> str:
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return f"{profile} {method.upper()} {url}?{query}"
+
+    @staticmethod
+    def _vary_values(names: Tuple[str, ...], headers: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+        lowered = {k.lower(): str(v) for k, v in (headers or {}).items()}
+        return {name: lowered.get(name, "") for name in names}
+
+    @staticmethod
+    def _variant_key(primary: str, vary: Dict[str, str]) -> str:
+        if not vary:
+            return primary
+        return primary + "|" + "&".join(f"{k}={v}" for k, v in sorted(vary.items()))
+
+    async def lookup(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        headers: Optional[Mapping[str, Any]],
+        profile: str = DEFAULT_PROFILE
+    ) -> CacheLookup:
+        """查找缓存条目（带凭据的请求只命中可共享的条目）"""
+        primary = self.make_primary_key(method, url, params, profile)
+        names = self._vary_index.get(primary, ())
+        key = self._variant_key(primary, self._vary_values(names, headers))
+        entry = await self._call(self.backend.get, key)
+        if entry is not None and has_credentials(headers) and not is_shared_response(
+            {"cache-control": entry.header("cache-control")}
+        ):
+            entry = None
+        if entry is None:
+            self._stats["misses"] += 1
+            return CacheLookup(key=key)
+        fresh = entry.is_fresh() and not self._requires_revalidation(headers)
+        self._stats["hits" if fresh else "stale"] += 1
+        return CacheLookup(key=key, entry=entry, fresh=fresh)
+
+    @staticmethod
+    def _requires_revalidation(headers: Optional[Mapping[str, Any]]) -> bool:
+        lowered = {k.lower(): v for k, v in (headers or {}).items()}
+        directives = parse_cache_control(lowered.get("cache-control"))
+        return "no-cache" in directives or directives.get("max-age") == "0"
+
+    def record_bypass(self) -> None:
+        self._stats["bypasses"] += 1
+
+    async def store(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        request_headers: Optional[Mapping[str, Any]],
+        response: httpx.Response,
+        profile: str = DEFAULT_PROFILE
+    ) -> None:
+        """按共享缓存语义存储响应"""
+        if response.status_code not in CACHEABLE_STATUSES:
+            return
+        lifetime = freshness_lifetime(response.headers, has_credentials(request_headers))
+        vary_header = response.headers.get("vary", "")
+        if lifetime is None or vary_header.strip() == "*":
+            return
+
+        names = tuple(sorted(
+            name.strip().lower() for name in vary_header.split(",") if name.strip()
+        ))
+        primary = self.make_primary_key(method, url, params, profile)
+        self._vary_index[primary] = names
+        self._vary_index.move_to_end(primary)
+        while len(self._vary_index) > self.max_vary_index:
+            self._vary_index.popitem(last=False)
+
+        content = response.content
+        if self.backend.max_entry_bytes and len(content) > self.backend.max_entry_bytes:
+            return
+        if not isinstance(content, bytes):  # 溢出到磁盘的响应体为 mmap，缓存前转为 bytes
+            content = bytes(content)
+
+        vary = self._vary_values(names, request_headers)
+        now = time.time()
+        entry = CacheEntry(
+            status_code=response.status_code,
+            headers=[
+                (k, v) for k, v in response.headers.multi_items()
+                if k.lower() not in _STRIPPED_HEADERS
+            ],
+            content=content,
+            stored_at=now,
+            expires_at=now + lifetime,
+            vary=vary,
+        )
+        await self._call(self.backend.set, self._variant_key(primary, vary), entry)
+        self._stats["stores"] += 1
+
+    async def revalidated(self, lookup: CacheLookup, not_modified: httpx.Response) -> httpx.Response:
+        """处理304响应：合并新的缓存头并刷新新鲜期，返回缓存内容"""
+        entry = lookup.entry
+        updated = {k.lower(): v for k, v in not_modified.headers.items()}
+        entry.headers = [
+            (k, updated.pop(k.lower(), v)) for k, v in entry.headers
+        ] + [
+            (k, v) for k, v in updated.items()
+            if k in ("etag", "last-modified", "cache-control", "expires", "date")
+        ]
+        now = time.time()
+        entry.stored_at = now
+        entry.expires_at = now + (freshness_lifetime(httpx.Headers(entry.headers)) or 0.0)
+        directives = parse_cache_control(entry.header("cache-control"))
+        if "private" in directives or "no-store" in directives:
+            # 304 把响应改为不可共享：返回本次内容，但不再保留条目
+            await self._call(self.backend.delete, lookup.key)
+        else:
+            await self._call(self.backend.set, lookup.key, entry)
+        self._stats["revalidations"] += 1
+        return entry.to_response(
+            not_modified.request, "REVALIDATED", not_modified.elapsed.total_seconds()
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """命中/未命中/重新验证计数与后端容量"""
+        return {**self._stats, **self.backend.usage()}
+
+
+def _create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "disk":
+        return DiskCacheBackend(
+            settings.CACHE_DISK_PATH, settings.CACHE_MAX_BYTES, settings.CACHE_MAX_ENTRY_BYTES
+        )
+    return MemoryCacheBackend(settings.CACHE_MAX_BYTES, settings.CACHE_MAX_ENTRY_BYTES)
+
+
+response_cache = ResponseCache(_create_backend())
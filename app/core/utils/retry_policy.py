@@ -0,0 +1,191 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, FrozenSet, Optional
+
+from app.core.config import settings
+
+# 可安全重试的幂等方法（RFC 9110 §9.2.2）
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset(
+    {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+)
+JITTER_MODES = ("none", "full", "decorrelated")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    重试策略定义
+
+    Attributes:
+        max_retries: 单个请求的最大重试次数（请求级重试预算）
+        backoff_factor: 指数退避基数（秒）
+        max_backoff: 单次退避上限（秒）
+        jitter: 抖动模式（none/full/decorrelated）
+        retry_statuses: 允许重试的响应状态码
+        retry_methods: 允许重试的HTTP方法
+        respect_retry_after: 是否遵循 Retry-After 响应头
+    """
+
+    max_retries: int = 3
+    backoff_factor: float = 0.3
+    max_backoff: float = 10.0
+    jitter: str = "full"
+    retry_statuses: FrozenSet[int] = field(
+        default_factory=lambda: frozenset({429, 502, 503, 504})
+    )
+    retry_methods: FrozenSet[str] = IDEMPOTENT_METHODS
+    respect_retry_after: bool = True
+
+    def __post_init__(self):
+        if self.jitter not in JITTER_MODES:
+            raise ValueError(f"不支持的抖动模式: {self.jitter}")
+
+    def allows_method(self, method: str) -> bool:
+        """方法是否允许重试"""
+        return method.upper() in self.retry_methods
+
+    def allows_status(self, status_code: int) -> bool:
+        """状态码是否允许重试"""
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt: int, previous_delay: Optional[float]) -> float:
+        """计算第 attempt 次重试前的退避时间"""
+        ceiling = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter == "full":
+            return random.uniform(0, ceiling)
+        if self.jitter == "decorrelated":
+            base = self.backoff_factor
+            upper = max(base, (previous_delay or base) * 3)
+            return min(self.max_backoff, random.uniform(base, upper))
+        return ceiling
+
+
+def default_retry_policy(max_retries: int, backoff_factor: float) -> RetryPolicy:
+    """根据全局配置构建重试策略"""
+    return RetryPolicy(
+        max_retries=max_retries,
+        backoff_factor=backoff_factor,
+        max_backoff=settings.RETRY_MAX_BACKOFF,
+        jitter=settings.RETRY_JITTER,
+        retry_statuses=frozenset(settings.RETRY_STATUS_CODES),
+    )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或HTTP日期），返回等待秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryBudget:
+    """全局重试预算（令牌桶）
+
+    每个请求存入 ``ratio`` 个令牌，每次重试取出一个；另有每秒最低保底额度。
+    上游整体降级时重试量被限制在流量的固定比例内，避免重试风暴。
+    """
+
+    def __init__(
+        self,
+        ratio: float,
+        min_per_second: float,
+        ttl: float = 10.0,
+        max_tokens: float = 100.0
+    ):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.min_per_second = min_per_second
+        self.ttl = ttl
+        self._tokens = 0.0
+        self._reserve = min_per_second * ttl
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "rejected": 0}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._reserve = min(
+            self.min_per_second * self.ttl,
+            self._reserve + elapsed * self.min_per_second
+        )
+
+    def deposit(self) -> None:
+        """登记一次新请求"""
+        with self._lock:
+            self._stats["requests"] += 1
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """尝试为一次重试取出令牌"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+            elif self._reserve >= 1:
+                self._reserve -= 1
+            else:
+                self._stats["rejected"] += 1
+                return False
+            self._stats["retries"] += 1
+            return True
+
+    def get_stats(self) -> Dict[str, float]:
+        """重试预算统计"""
+        with self._lock:
+            return {**self._stats, "tokens": round(self._tokens + self._reserve, 2)}
+
+
+class RetryState:
+    """单个请求的重试状态：尝试次数、上次退避与总截止时间"""
+
+    def __init__(self, policy: RetryPolicy, timeout: Optional[float]):
+        self.policy = policy
+        self.attempt = 0
+        self.last_delay: Optional[float] = None
+        self.deadline = time.monotonic() + timeout if timeout else None
+
+    def remaining(self) -> Optional[float]:
+        """距总截止时间的剩余秒数（无截止时间时为None）"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def next_delay(self, retry_after: Optional[float] = None) -> Optional[float]:
+        """计算下一次退避时间；重试次数耗尽或超出截止时间时返回None"""
+        if self.attempt >= self.policy.max_retries:
+            return None
+        delay = self.policy.backoff(self.attempt, self.last_delay)
+        if retry_after is not None and self.policy.respect_retry_after:
+            delay = max(delay, retry_after)
+        remaining = self.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+    async def wait(self, delay: float) -> None:
+        """等待退避时间并推进到下一次尝试"""
+        self.last_delay = delay
+        self.attempt += 1
+        await asyncio.sleep(delay)
+
+
+retry_budget = RetryBudget(
+    ratio=settings.RETRY_BUDGET_RATIO,
+    min_per_second=settings.RETRY_BUDGET_MIN_PER_SECOND,
+)
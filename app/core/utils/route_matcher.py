@@ -0,0 +1,219 @@
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+ANY_METHOD = "*"
+
+def split_path(path: str) -> List[str]:
+    """把路径拆分为非空段"""
+    return [segment for segment in path.split("/") if segment]
+
+def is_param(segment: str) -> bool:
+    """是否为 ``{name}`` 形式的路径参数段"""
+    return segment.startswith("{") and segment.endswith("}") and len(segment) > 2
+
+
+class CompiledRule:
+    """
+    编译后的规则
+
+    路径参数名按出现顺序保存，末段为 ``*`` 时剩余路径绑定到参数 ``*``；谓词
+    在编译时排好序（查询参数在前，请求头在后），匹配时依次短路比较。
+    """
+
+    __slots__ = (
+        "rule_id", "method", "path", "priority", "order",
+        "param_names", "wildcard", "predicates", "payload",
+    )
+
+    def __init__(
+        self,
+        rule_id: str,
+        method: str,
+        path: str,
+        priority: int = 0,
+        query: Optional[Mapping[str, str]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        payload: Any = None
+    ):
+        self.rule_id = rule_id
+        self.method = method.upper()
+        self.path = path
+        self.priority = priority
+        self.order = 0
+        self.payload = payload
+        segments = split_path(path)
+        self.param_names = [segment[1:-1] for segment in segments if is_param(segment)]
+        self.wildcard = bool(segments) and segments[-1] == "*"
+        self.predicates: List[Tuple[str, str, str]] = (
+            [("query", name, value) for name, value in sorted((query or {}).items())]
+            + [("header", name.lower(), value) for name, value in sorted((headers or {}).items())]
+        )
+
+    def sort_key(self) -> Tuple[int, int, int]:
+        """优先级高者在前；同优先级时谓词多（更具体）者在前；再按加入顺序"""
+        return (-self.priority, -len(self.predicates), self.order)
+
+    def check(self, query: Mapping[str, str], headers: Mapping[str, str]) -> bool:
+        """依次检查谓词，headers 的键需为小写"""
+        for source, name, expected in self.predicates:
+            actual = query.get(name) if source == "query" else headers.get(name)
+            if actual != expected:
+                return False
+        return True
+
+    def bind(self, values: List[str]) -> Dict[str, str]:
+        """把匹配到的参数值按本规则的参数名绑定"""
+        params = dict(zip(self.param_names, values))
+        if self.wildcard:
+            params["*"] = values[-1]
+        return params
+
+
+class _Node:
+    __slots__ = ("static", "param", "wildcard", "rules", "compiled")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.wildcard: Optional["_Node"] = None
+        self.rules: List[CompiledRule] = []
+        # 方法 -> 已排序的候选规则（含 ANY_METHOD 规则）
+        self.compiled: Dict[str, List[CompiledRule]] = {}
+
+    def recompile(self) -> None:
+        """仅重排本节点的规则表"""
+        any_rules = [rule for rule in self.rules if rule.method == ANY_METHOD]
+        by_method: Dict[str, List[CompiledRule]] = {ANY_METHOD: any_rules}
+        for rule in self.rules:
+            if rule.method != ANY_METHOD:
+                by_method.setdefault(rule.method, list(any_rules)).append(rule)
+        self.compiled = {
+            method: sorted(rules, key=CompiledRule.sort_key) for method, rules in by_method.items()
+        }
+
+    def candidates(self, method: str) -> List[CompiledRule]:
+        return self.compiled.get(method) or self.compiled.get(ANY_METHOD, [])
+
+    def is_empty(self) -> bool:
+        return not (self.rules or self.static or self.param or self.wildcard)
+
+
+class RouteTrie:
+    """
+    基于路径段的基数树匹配器
+
+    每段依次尝试 静态 → ``{参数}`` → 末尾 ``*`` 通配，命中节点后按预排序的
+    规则表检查谓词，失败则回溯到下一分支。匹配代价只与路径深度相关，与规则
+    总数无关；增删规则只重排所在节点。
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._index: Dict[str, Tuple[CompiledRule, List[_Node]]] = {}
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, rule: CompiledRule) -> None:
+        """加入规则；同 ID 的旧规则会被替换"""
+        if rule.rule_id in self._index:
+            self.remove(rule.rule_id)
+        self._counter += 1
+        rule.order = self._counter
+
+        node, trail = self._root, [self._root]
+        segments = split_path(rule.path)
+        for position, segment in enumerate(segments):
+            if segment == "*" and position == len(segments) - 1:
+                node.wildcard = node.wildcard or _Node()
+                node = node.wildcard
+            elif is_param(segment):
+                node.param = node.param or _Node()
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+            trail.append(node)
+        node.rules.append(rule)
+        node.recompile()
+        self._index[rule.rule_id] = (rule, trail)
+
+    def remove(self, rule_id: str) -> bool:
+        """移除规则并剪除空节点"""
+        item = self._index.pop(rule_id, None)
+        if item is None:
+            return False
+        rule, trail = item
+        leaf = trail[-1]
+        leaf.rules.remove(rule)
+        leaf.recompile()
+        for parent, child in zip(reversed(trail[:-1]), reversed(trail[1:])):
+            if not child.is_empty():
+                break
+            if parent.param is child:
+                parent.param = None
+            elif parent.wildcard is child:
+                parent.wildcard = None
+            else:
+                for segment, node in list(parent.static.items()):
+                    if node is child:
+                        del parent.static[segment]
+        return True
+
+    def match(
+        self,
+        method: str,
+        path: str,
+        query: Optional[Mapping[str, str]] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ) -> Optional[Tuple[CompiledRule, Dict[str, str]]]:
+        """
+        查找匹配的规则
+
+        Args:
+            method: 请求方法
+            path: 请求路径
+            query: 查询参数
+            headers: 请求头（键需为小写）
+
+        Returns:
+            (规则, 路径参数) 或 None
+        """
+        segments = split_path(path)
+        query, headers = query or {}, headers or {}
+        accept: Callable[[CompiledRule], bool] = lambda rule: rule.check(query, headers)
+        found = self._walk(self._root, segments, 0, method.upper(), [], accept)
+        if found is None:
+            return None
+        rule, values = found
+        return rule, rule.bind(values)
+
+    def _walk(
+        self,
+        node: _Node,
+        segments: List[str],
+        position: int,
+        method: str,
+        values: List[str],
+        accept: Callable[[CompiledRule], bool]
+    ) -> Optional[Tuple[CompiledRule, List[str]]]:
+        if position == len(segments):
+            for rule in node.candidates(method):
+                if accept(rule):
+                    return rule, values
+        else:
+            segment = segments[position]
+            child = node.static.get(segment)
+            if child is not None:
+                found = self._walk(child, segments, position + 1, method, values, accept)
+                if found is not None:
+                    return found
+            if node.param is not None:
+                found = self._walk(node.param, segments, position + 1, method, values + [segment], accept)
+                if found is not None:
+                    return found
+        if node.wildcard is not None and position < len(segments):
+            rest = "/".join(segments[position:])
+            for rule in node.wildcard.candidates(method):
+                if accept(rule):
+                    return rule, values + [rest]
+        return None
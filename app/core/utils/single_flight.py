@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.core.errors.http_errors import HTTPError
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    单飞请求合并
+
+    相同键的并发调用共享同一个后台任务及其结果（或异常）。每个等待方通过
+    ``asyncio.shield`` 等待，单个等待方取消或超时不会中断共享任务；仅当所有
+    等待方都已离开时才取消共享任务。
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "abandoned": 0}
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None
+    ) -> T:
+        """
+        执行或加入键对应的调用
+
+        Args:
+            key: 请求指纹
+            func: 创建共享调用的协程工厂（仅首个调用方执行）
+            timeout: 当前等待方的超时时间（秒）
+
+        Raises:
+            HTTPError: 当前等待方超时时抛出504
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self._stats["leaders"] += 1
+        else:
+            self._stats["coalesced"] += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(504, "等待合并请求结果超时")
+        finally:
+            self._leave(key, task)
+
+    def _leave(self, key: str, task: asyncio.Task) -> None:
+        """等待方离开；最后一个等待方离开且任务未完成时取消任务"""
+        if self._calls.get(key) is not task:
+            return
+        self._waiters[key] -= 1
+        if self._waiters[key] <= 0 and not task.done():
+            self._stats["abandoned"] += 1
+            logging.info(f"合并请求已无等待方，取消共享调用: {key[:12]}")
+            task.cancel()
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """任务结束后移除记录，并消费未被获取的异常"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """合并统计信息"""
+        return {**self._stats, "in_flight": len(self._calls)}
+
+
+single_flight = SingleFlight()
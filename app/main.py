@@ -1,7 +1,8 @@
 from dotenv import load_dotenv
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from typing import Optional
+from typing import AsyncIterator, Optional
 import logging
 
 # 环境变量加载优化
@@ -36,21 +37,54 @@ def configure_logging(log_level: str) -> None:
         handlers=[file_handler, console_handler]
     )
 
+# 应用生命周期管理
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """创建/关闭共享上游连接池，并托管任务调度器"""
+    from app.core.utils.http_client import http_client_manager
+    from app.core.services.task_scheduler import start_scheduler, shutdown_scheduler
+    from app.core.services.mock_data_service import close_mock_data_service
+
+    await http_client_manager.startup()
+    start_scheduler()
+    logging.info("共享上游连接池已就绪")
+    try:
+        yield
+    finally:
+        shutdown_scheduler()
+        close_mock_data_service()
+        await http_client_manager.shutdown()
+
 # 应用创建工厂函数
 def create_application() -> FastAPI:
     """创建并配置 FastAPI 应用实例"""
+    from app.core.config import settings
+    from app.core.utils.compression import CompressionMiddleware
+    from app.core.utils.json_codec import FastJSONResponse
+
     application = FastAPI(
         title="HTTP Mock Server",
         description="基于 FastAPI 的轻量级 HTTP 模拟服务器",
         version="0.1.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan
     )
     
     # 路由注册
-    from app.core.routers import http_mock
+    from app.core.routers import http_mock, mock_data, mock_profiles, mock_rules
     application.include_router(http_mock.router)
+    application.include_router(mock_data.router)
+    application.include_router(mock_data.bulk_router)
+    application.include_router(mock_rules.router)
+    application.include_router(mock_rules.stub_router)
+    application.include_router(mock_profiles.router)
     logging.info("成功注册 HTTP Mock 路由")
+
+    # 响应压缩：按 Accept-Encoding 协商 zstd/br/gzip
+    if settings.RESPONSE_COMPRESSION_ENABLED:
+        application.add_middleware(CompressionMiddleware)
     
     return application
 
@@ -0,0 +1,73 @@
+"""响应体字符集检测：原实现（逐个编码全文解码 + 全文 chardet）与有界样本检测的对比
+
+用法: python benchmarks/bench_charset_detection.py [--legacy-max-mb 8]
+
+注意：原实现对偶数长度的 GBK 响应体会在 utf-16 一步"解码成功"得到乱码，
+其 gbk 一行的耗时并不代表正确结果。
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.utils.encoding_helper import (  # noqa: E402
+    COMMON_ENCODINGS,
+    DEFAULT_ENCODING,
+    charset_cache,
+    chardet,
+    decode_content,
+    detect_encoding,
+)
+
+SIZES = [("1 KB", 1024), ("64 KB", 64 * 1024), ("1 MB", 1024 * 1024), ("8 MB", 8 * 1024 * 1024),
+         ("100 MB", 100 * 1024 * 1024)]
+
+def build_body(encoding: str, size: int) -> bytes:
+    """构造指定编码、约 size 字节的中英文混排 HTML 响应体（不含 meta 声明）"""
+    unit = "<p>SwiftAPI 响应体字符集检测基准，混合 ASCII 与中文字符。</p>\n".encode(encoding)
+    return b"<html><body>\n" + unit * max(1, size // len(unit)) + b"</body></html>"
+
+def legacy_decode(content: bytes) -> str:
+    """原实现：按顺序全文解码常用编码，全部失败后对全文做 chardet 检测"""
+    for encoding in [DEFAULT_ENCODING] + [e for e in COMMON_ENCODINGS if e != DEFAULT_ENCODING]:
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    if chardet is not None:
+        return content.decode(chardet.detect(content)["encoding"] or "latin-1", errors="replace")
+    return content.decode("latin-1")
+
+def bench(func, number: int) -> float:
+    return timeit.timeit(func, number=number) / number
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--legacy-max-mb", type=float, default=8, help="原实现只测到该大小（MB）")
+    args = parser.parse_args()
+
+    print(f"chardet: {'已安装' if chardet is not None else '未安装（按候选编码回退）'}")
+    print(f"{'编码':>8} {'响应体':>8} {'原实现':>12} {'检测':>12} {'检测+解码':>12} {'缓存命中':>12}  来源")
+    for encoding in ("utf-8", "gbk"):
+        for label, size in SIZES:
+            body = build_body(encoding, size)
+            number = max(1, int(50_000_000 / (size + 4096)))
+            if size <= args.legacy_max_mb * 1024 * 1024:
+                legacy = f"{bench(lambda: legacy_decode(body), max(1, number // 10)) * 1000:10.3f}ms"
+            else:
+                legacy = f"{'跳过':>10}  "
+
+            charset_cache.invalidate("bench")
+            detect = bench(lambda: detect_encoding(body), number)
+            full = bench(lambda: decode_content(body), max(1, number // 10))
+            _, source = detect_encoding(body, host="bench")
+            cached = bench(lambda: detect_encoding(body, host="bench"), number)
+            print(
+                f"{encoding:>8} {label:>8} {legacy} {detect * 1000:10.3f}ms "
+                f"{full * 1000:10.3f}ms {cached * 1000:10.3f}ms  {source}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""响应压缩：各编码与级别的压缩耗时、压缩率、解压耗时与按带宽估算的总传输时间
+
+用法: python benchmarks/bench_compression.py [--bandwidth-mbps 100] [--stream-chunk-kb 64]
+
+未安装 brotli / zstandard 时只测 gzip。"总耗时"为压缩耗时加上按 --bandwidth-mbps
+传输压缩后字节数的时间，用于比较 CPU 与带宽的取舍（未压缩一行为基线）。
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.utils.compression import (  # noqa: E402
+    StreamCompressor,
+    available_encodings,
+    brotli,
+    compress,
+    zstandard,
+)
+
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 8], "zstd": [1, 3, 9]}
+SIZES = [("64 KB", 64 * 1024), ("1 MB", 1024 * 1024), ("8 MB", 8 * 1024 * 1024)]
+
+def build_body(size: int) -> bytes:
+    """构造与 /mock/request 响应相近的 JSON：响应头 + JSON 文本形式的上游响应体"""
+    rng = random.Random(42)
+    items = []
+    while len(items) * 120 < size:
+        items.append({
+            "id": len(items),
+            "name": f"用户{rng.randint(1, 10 ** 6)}",
+            "email": f"user{rng.randint(1, 10 ** 6)}@example.com",
+            "score": round(rng.random() * 100, 3),
+            "active": rng.random() > 0.5,
+        })
+    text = json.dumps(items, ensure_ascii=False)
+    envelope = {
+        "status_code": 200,
+        "text": text,
+        "headers": {"content-type": "application/json", "server": "bench", "x-request-id": "0" * 32},
+        "elapsed": 0.1,
+        "encoding": "utf-8",
+        "content_type": "application/json",
+    }
+    return json.dumps(envelope, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def decompressor(encoding: str):
+    if encoding == "br":
+        return brotli.decompress
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress
+    return gzip.decompress
+
+def stream_size(body: bytes, encoding: str, level: int, chunk_size: int) -> int:
+    """逐块压缩并刷出（中间件的流式路径）后的总字节数"""
+    compressor = StreamCompressor(encoding, level)
+    total = sum(len(compressor.compress(body[i:i + chunk_size])) for i in range(0, len(body), chunk_size))
+    return total + len(compressor.finish())
+
+def bench(func, number: int) -> float:
+    return timeit.timeit(func, number=number) / number
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bandwidth-mbps", type=float, default=100, help="估算传输时间所用的带宽（Mbit/s）")
+    parser.add_argument("--stream-chunk-kb", type=int, default=64, help="流式压缩的分块大小（KB）")
+    args = parser.parse_args()
+    bytes_per_second = args.bandwidth_mbps * 1_000_000 / 8
+    chunk_size = args.stream_chunk_kb * 1024
+
+    print(f"可用编码: {', '.join(available_encodings())}    带宽: {args.bandwidth_mbps:g} Mbit/s")
+    for label, size in SIZES:
+        body = build_body(size)
+        number = max(1, int(20_000_000 / len(body)))
+        print(f"\n响应体 {label}（实际 {len(body) / 1024:.0f} KB）")
+        print(f"{'编码':>6} {'级别':>4} {'压缩率':>8} {'流式压缩率':>10} {'压缩':>10} {'吞吐':>10} "
+              f"{'解压':>10} {'总耗时':>10}")
+        print(f"{'无':>6} {'-':>4} {1:8.3f} {1:10.3f} {0:8.2f}ms {'-':>10} {0:8.2f}ms "
+              f"{len(body) / bytes_per_second * 1000:8.2f}ms")
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                packed = compress(body, encoding, level)
+                elapsed = bench(lambda: compress(body, encoding, level), number)
+                unpack = decompressor(encoding)
+                unpacked = bench(lambda: unpack(packed), number)
+                streamed = stream_size(body, encoding, level, chunk_size)
+                total = elapsed + len(packed) / bytes_per_second
+                print(
+                    f"{encoding:>6} {level:>4} {len(packed) / len(body):8.3f} {streamed / len(body):10.3f} "
+                    f"{elapsed * 1000:8.2f}ms {len(body) / elapsed / 1e6:7.0f}MB/s "
+                    f"{unpacked * 1000:8.2f}ms {total * 1000:8.2f}ms"
+                )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""逐字段加密与信封加密的性能对比
+
+用法: python benchmarks/bench_encryption.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.utils.crypto import (  # noqa: E402
+    decrypt_data,
+    decrypt_payload,
+    encrypt_data,
+    encrypt_payload,
+    process_encryption,
+)
+
+def build_payload(body_bytes: int, header_count: int = 20) -> dict:
+    """构造与 HTTPResponseSchema.to_dict 结构相近的载荷"""
+    return {
+        "status_code": "200",
+        "text": "x" * body_bytes,
+        "headers": {f"x-header-{i}": f"value-{i}" * 4 for i in range(header_count)},
+        "elapsed": "0.123",
+        "encoding": "utf-8",
+        "content_type": "application/json",
+    }
+
+def bench(label: str, func, number: int) -> float:
+    seconds = timeit.timeit(func, number=number) / number
+    print(f"  {label:<10} {seconds * 1000:10.3f} ms/op")
+    return seconds
+
+def main() -> None:
+    sizes = [("1 KB", 1024), ("64 KB", 64 * 1024), ("1 MB", 1024 * 1024), ("8 MB", 8 * 1024 * 1024)]
+    for label, size in sizes:
+        payload = build_payload(size)
+        number = max(3, int(2_000_000 / (size + 4096)))
+        print(f"{label} 载荷（加密+解密往返，{number} 次取平均）")
+
+        field_time = bench(
+            "逐字段",
+            lambda: process_encryption(process_encryption(payload, encrypt_data), decrypt_data),
+            number
+        )
+        envelope_time = bench(
+            "信封",
+            lambda: decrypt_payload(encrypt_payload(payload)),
+            number
+        )
+        print(f"  加速比     {field_time / envelope_time:10.2f}x\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""HTTPRequestSchema 单次请求的校验开销：URL 解析缓存与 validators.url 的对比
+
+用法: python benchmarks/bench_request_validation.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.schemas.request_schema import HTTPRequestSchema  # noqa: E402
+from app.core.utils.url_helper import parse_url  # noqa: E402
+
+try:
+    import validators
+except ImportError:
+    validators = None
+
+URLS = [f"https://api{i % 50}.example.com/v1/items/{i}?page={i % 7}" for i in range(1000)]
+
+def bench(label: str, func, number: int = 100_000) -> None:
+    seconds = timeit.timeit(func, number=number) / number
+    print(f"  {label:<36} {seconds * 1e6:8.2f} µs/op")
+
+def main() -> None:
+    payload = {
+        "method": "get",
+        "url": URLS[0],
+        "params": {"page": "1"},
+        "headers": {"Accept": "application/json"},
+    }
+    print("URL 校验")
+    if validators is not None:
+        bench("validators.url（原实现）", lambda: validators.url(URLS[0]))
+    bench("parse_url 未命中缓存", lambda: parse_url.__wrapped__(URLS[0]))
+    bench("parse_url 命中缓存", lambda: parse_url(URLS[0]))
+
+    print("HTTPRequestSchema 构建")
+    bench("model_validate（重复目标）", lambda: HTTPRequestSchema.model_validate(payload))
+    distinct = iter(range(10 ** 9))
+    bench(
+        "model_validate（每次不同URL）",
+        lambda: HTTPRequestSchema.model_validate({**payload, "url": f"https://h{next(distinct)}.example.com/"}),
+        number=20_000
+    )
+    request = HTTPRequestSchema.model_validate(payload)
+    dumped = request.model_dump(exclude_unset=True)
+    bench("model_construct（可信的内部重建）", lambda: HTTPRequestSchema.model_construct(**dumped))
+    print(f"parse_url 缓存: {parse_url.cache_info()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""HTTPResponseSchema 序列化：原路径（校验构建 + model_dump + JSONResponse）与快速路径的对比
+
+用法: python benchmarks/bench_response_serialisation.py
+"""
+import json
+import os
+import sys
+import timeit
+from datetime import timedelta
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.schemas.response_schema import HTTPResponseSchema  # noqa: E402
+from app.core.utils.json_codec import dumps, orjson  # noqa: E402
+
+def build_response(body_bytes: int, header_count: int = 20) -> httpx.Response:
+    """构造带 JSON 响应体与若干响应头的 httpx 响应"""
+    item = '{"id": 1, "name": "示例", "tags": ["a", "b"]},'
+    body = ("[" + item * max(1, body_bytes // len(item.encode()))).rstrip(",") + "]"
+    headers = [("content-type", "application/json")]
+    headers += [(f"x-header-{i}", f"value-{i}" * 4) for i in range(header_count)]
+    response = httpx.Response(200, headers=headers, content=body.encode(), request=httpx.Request("GET", "http://t"))
+    response.read()
+    response.elapsed = timedelta(seconds=0.1)
+    return response
+
+def baseline(response: httpx.Response) -> bytes:
+    """原路径：校验构建 → model_dump → json.dumps（JSONResponse.render）"""
+    headers = dict(response.headers.multi_items())
+    model = HTTPResponseSchema(
+        status_code=response.status_code,
+        text=response.text,
+        headers=headers,
+        elapsed=0.1,
+        encoding=response.encoding,
+        content_type=response.headers.get("content-type"),
+    )
+    return json.dumps(
+        model.model_dump(exclude_unset=True), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+def fast(response: httpx.Response) -> bytes:
+    """快速路径：model_construct → pydantic-core 直接序列化为字节"""
+    return HTTPResponseSchema.from_response(response).to_json()
+
+def main() -> None:
+    print(f"orjson: {'已安装' if orjson is not None else '未安装（退回标准库）'}")
+    print(f"{'响应体':>8} {'原路径':>12} {'快速路径':>12} {'dict→dumps':>12} {'加速':>8}")
+    for label, size in (("1 KB", 1024), ("64 KB", 64 * 1024), ("1 MB", 1024 * 1024), ("8 MB", 8 * 1024 * 1024)):
+        response = build_response(size)
+        number = max(3, int(20_000_000 / (size + 4096)))
+        payload = HTTPResponseSchema.from_response(response).model_dump(exclude_unset=True)
+        base = timeit.timeit(lambda: baseline(response), number=number) / number
+        quick = timeit.timeit(lambda: fast(response), number=number) / number
+        plain = timeit.timeit(lambda: dumps(payload), number=number) / number
+        print(
+            f"{label:>8} {base * 1000:10.3f}ms {quick * 1000:10.3f}ms "
+            f"{plain * 1000:10.3f}ms {base / quick:7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
+import importlib.util
 import logging
 import os
+import sys
 import uvicorn
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.main import app as fastapi_app
+from app.main import create_application
 from app.core.errors.http_errors import http_exception_handler
 from app.core.config import settings
 
@@ -51,24 +53,69 @@ def configure_exception_handlers(app: FastAPI) -> None:
             },
         )
 
-# 应用配置
-configure_middleware(fastapi_app)
-configure_exception_handlers(fastapi_app)
+# 应用工厂的导入路径：热重载与多工作进程都要求以导入字符串传入应用
+APP_FACTORY = "fastapi_server:create_server_app"
+
+def create_server_app() -> FastAPI:
+    """应用工厂：创建应用并配置中间件与异常处理器（每个工作进程各调用一次）"""
+    app = create_application()
+    configure_middleware(app)
+    configure_exception_handlers(app)
+    return app
+
+def resolve_workers() -> int:
+    """prod 模式的工作进程数（SERVER_WORKERS 为 0 时取 CPU 核数）"""
+    return settings.SERVER_WORKERS or os.cpu_count() or 1
+
+def resolve_event_loop() -> str:
+    """已安装 uvloop 时使用（Windows 不支持）"""
+    if sys.platform != "win32" and importlib.util.find_spec("uvloop") is not None:
+        return "uvloop"
+    return "asyncio"
+
+def resolve_http_protocol() -> str:
+    """已安装 httptools 时使用其 HTTP/1.1 解析器"""
+    return "httptools" if importlib.util.find_spec("httptools") is not None else "h11"
+
+def server_options() -> dict:
+    """
+    按 SERVER_MODE 生成 uvicorn 参数
+
+    dev：单进程、热重载（保持原有行为）。
+    prod：主进程绑定监听套接字后预派生多个工作进程共享该套接字，不监视文件；
+    工作进程处理 SERVER_LIMIT_MAX_REQUESTS 个请求后优雅退出，由主进程重新拉起。
+    """
+    options = {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "factory": True,
+        "log_level": LOG_LEVEL.lower(),
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT or None,
+    }
+    if settings.SERVER_MODE == "dev":
+        return {**options, "reload": True}
+    return {
+        **options,
+        "reload": False,
+        "workers": resolve_workers(),
+        "loop": resolve_event_loop(),
+        "http": resolve_http_protocol(),
+        "limit_max_requests": settings.SERVER_LIMIT_MAX_REQUESTS or None,
+    }
 
 def run_fastapi() -> None:
     """启动FastAPI服务器"""
     try:
+        options = server_options()
         logging.info("Initializing server with:"
                      f"\n- Host: {settings.SERVER_HOST}"
                      f"\n- Port: {settings.SERVER_PORT}"
+                     f"\n- Mode: {settings.SERVER_MODE}"
+                     f"\n- Workers: {options.get('workers', 1)}"
+                     f"\n- Event loop: {options.get('loop', 'auto')}"
+                     f"\n- HTTP protocol: {options.get('http', 'auto')}"
                      f"\n- Log level: {LOG_LEVEL}")
-        uvicorn.run(
-            fastapi_app,
-            host=settings.SERVER_HOST,
-            port=settings.SERVER_PORT,
-            reload=True,
-            log_level=LOG_LEVEL.lower(),
-        )
+        uvicorn.run(APP_FACTORY, **options)
     except Exception as e:
         logging.exception(f"Server startup failed: {e}")
         raise
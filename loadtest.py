@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import json
+import logging
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+logging.basicConfig(level=logging.INFO)
+
+def parse_headers(values: List[str]) -> Dict[str, str]:
+    """解析 "Name: Value" 形式的请求头参数"""
+    headers = {}
+    for item in values:
+        name, sep, value = item.partition(":")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"无效的请求头: {item}")
+        headers[name.strip()] = value.strip()
+    return headers
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="SwiftAPI-Connect 负载测试")
+    parser.add_argument("url", help="被测URL")
+    parser.add_argument("-X", "--method", default="GET", help="HTTP方法")
+    parser.add_argument("-H", "--header", action="append", default=[], help="请求头，如 'Accept: application/json'")
+    parser.add_argument("-d", "--data", default=None, help="请求体")
+    parser.add_argument("--mode", choices=["open", "closed"], default="closed", help="负载模型")
+    parser.add_argument("--rate", type=float, default=None, help="open 模型的每秒请求数")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="closed 模型的并发数")
+    parser.add_argument("-t", "--duration", type=float, default=10.0, help="持续时间（秒）")
+    parser.add_argument("--timeout", type=float, default=5.0, help="单次请求截止时间（秒）")
+    return parser
+
+async def main(args: argparse.Namespace) -> None:
+    from app.core.schemas.request_schema import HTTPRequestSchema
+    from app.core.services.load_test_service import LoadTestRunner
+    from app.core.utils.http_client import http_client_manager
+    from app.core.config import settings
+
+    request = HTTPRequestSchema(
+        method=args.method,
+        url=args.url,
+        headers=parse_headers(args.header),
+        data=args.data,
+    )
+    runner = LoadTestRunner(
+        request,
+        duration=args.duration,
+        mode=args.mode,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        max_in_flight=settings.LOADTEST_MAX_IN_FLIGHT,
+        timeout=args.timeout
+    )
+    await http_client_manager.startup()
+    try:
+        report = await runner.run()
+    finally:
+        await http_client_manager.shutdown()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main(build_parser().parse_args()))
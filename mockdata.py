@@ -0,0 +1,72 @@
+import argparse
+import json
+import logging
+import sys
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+logging.basicConfig(level=logging.INFO)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="SwiftAPI-Connect Mock 数据批量导入/导出（NDJSON）")
+    parser.add_argument("--db", default=None, help="数据文件路径，默认使用 MOCK_DB_PATH 配置")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="从 NDJSON 文件导入（- 表示标准输入）")
+    importer.add_argument("file", help="NDJSON 文件，每行 {\"key\", \"data\", \"tags\"}")
+    importer.add_argument("--skip-existing", action="store_true", help="保留已存在的 key（默认覆盖）")
+    importer.add_argument("--batch-size", type=int, default=None, help="每个写入事务的条目数")
+
+    exporter = commands.add_parser("export", help="导出为 NDJSON 文件（默认输出到标准输出）")
+    exporter.add_argument("-o", "--output", default="-", help="输出文件（- 表示标准输出）")
+    exporter.add_argument("--prefix", default="", help="只导出该前缀的 key")
+    exporter.add_argument("--tag", default=None, help="只导出带该标签的条目")
+    return parser
+
+def print_progress(progress: Dict[str, Any]) -> None:
+    """在标准错误输出上原地刷新导入进度"""
+    sys.stderr.write(
+        f"\r已处理 {progress['lines']} 行，写入 {progress['written']}，跳过 {progress['skipped']}，"
+        f"失败 {progress['failed']}（{progress['rate']:.0f} 条/秒）"
+    )
+    sys.stderr.flush()
+
+def main(args: argparse.Namespace) -> int:
+    from app.core.config import settings
+    from app.core.services.mock_bulk import export_ndjson, import_ndjson
+    from app.core.services.mock_data_service import MockDataService
+
+    service = MockDataService(
+        args.db or settings.MOCK_DB_PATH,
+        hot_cache_size=0,
+        gzip_min_bytes=settings.MOCK_GZIP_MIN_BYTES,
+        watch=False
+    )
+    try:
+        if args.command == "import":
+            source = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+            with source:
+                report = import_ndjson(
+                    service,
+                    iter(lambda: source.read(64 * 1024), b""),
+                    on_conflict="skip" if args.skip_existing else "upsert",
+                    batch_size=args.batch_size or settings.MOCK_BULK_BATCH_SIZE,
+                    progress=print_progress,
+                    max_line_bytes=settings.MOCK_BULK_MAX_LINE_BYTES
+                )
+            sys.stderr.write("\n")
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+            return 1 if report["failed"] else 0
+
+        target = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        with target:
+            for line in export_ndjson(service, prefix=args.prefix, tag=args.tag):
+                target.write(line)
+        return 0
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    load_dotenv()
+    sys.exit(main(build_parser().parse_args()))
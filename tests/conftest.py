@@ -0,0 +1,9 @@
+"""测试环境：提供 Settings 的必填项，使依赖全局配置的模块可以导入"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("API_KEY", "test-api-key")
+# List 类型的配置项从环境变量读取时按 JSON 解析
+os.environ.setdefault("CORS_ORIGINS", '["http://127.0.0.1:8501"]')
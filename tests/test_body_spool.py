@@ -0,0 +1,37 @@
+"""请求体溢出：小请求体计入内存预算，超出阈值或预算时溢出到磁盘"""
+import pytest
+
+pytest.importorskip("pydantic")
+
+from app.core.utils import body_spool  # noqa: E402
+from app.core.utils.body_spool import BodyMemoryBudget, spool_request_body  # noqa: E402
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    budget = BodyMemoryBudget(max_bytes=64)
+    monkeypatch.setattr(body_spool, "body_budget", budget)
+    monkeypatch.setattr(body_spool.settings, "BODY_SPOOL_THRESHOLD_BYTES", 32)
+    return budget
+
+
+def test_small_request_body_is_counted_against_budget(budget):
+    body = spool_request_body(None, {"name": "测试"})
+    assert not body.spooled
+    assert body.view == '{"name":"测试"}'.encode()
+    assert budget.get_stats()["in_memory_bytes"] == body.size
+    body.close()
+    assert budget.get_stats()["in_memory_bytes"] == 0
+
+
+def test_request_body_spills_over_threshold_or_budget(budget):
+    large = spool_request_body("x" * 40, None)
+    assert large.spooled and large.view[:] == b"x" * 40
+
+    held = [spool_request_body("y" * 30, None) for _ in range(3)]
+    assert [body.spooled for body in held] == [False, False, True]
+    assert budget.get_stats()["in_memory_bytes"] == 60
+    for body in [large, *held]:
+        body.close()
+    assert budget.get_stats() == {"in_memory_bytes": 0, "peak_bytes": 60, "limit_bytes": 64, "spilled_bodies": 2}
+    assert spool_request_body({"form": "field"}, None) is None
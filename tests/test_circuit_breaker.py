@@ -0,0 +1,206 @@
+"""熔断器状态机、AIMD 自适应并发限制与 UpstreamGuard 准入控制"""
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("fastapi")
+
+from app.core.config import settings  # noqa: E402
+from app.core.errors.http_errors import CircuitOpenError, ConcurrencyLimitError  # noqa: E402
+from app.core.utils import circuit_breaker  # noqa: E402
+from app.core.utils.circuit_breaker import (  # noqa: E402
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveLimiter,
+    CircuitBreaker,
+    UpstreamGuard,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+def make_breaker(**overrides) -> CircuitBreaker:
+    options = dict(
+        failure_rate=0.5, slow_call_rate=0.8, slow_call_seconds=1.0, window_seconds=30.0,
+        min_calls=4, open_seconds=10.0, half_open_calls=2,
+    )
+    options.update(overrides)
+    return CircuitBreaker(**options)
+
+
+def test_breaker_opens_only_after_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(True, 0.1)
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record(False, 0.1)  # 3/4 失败
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_probes_then_closes(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(True, 0.1)
+    clock.now += 9.9
+    assert not breaker.allow()
+    clock.now += 0.2
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow(), "探测名额用尽后拒绝"
+    breaker.record(False, 0.1)
+    assert breaker.state == HALF_OPEN
+    breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["calls_in_window"] == 0
+
+
+def test_breaker_half_open_failure_reopens_and_probe_release(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(True, 0.1)
+    clock.now += 10.0
+    assert breaker.allow() and breaker.allow()
+    breaker.release_probe()  # 被取消的探测归还名额
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_opens_on_slow_calls_and_forgets_old_failures(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False, 2.0)
+    assert breaker.state == OPEN
+
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(True, 0.1)
+    clock.now += 31.0  # 旧失败滑出窗口
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+
+
+def make_limiter(**overrides) -> AdaptiveLimiter:
+    options = dict(initial=10, minimum=2, maximum=12, tolerance=2.0, backoff_ratio=0.5)
+    options.update(overrides)
+    return AdaptiveLimiter(**options)
+
+
+def test_limiter_additive_increase_is_capped(clock):
+    limiter = make_limiter()
+    limiter.record(False, 0.1)
+    assert limiter.limit == pytest.approx(10.1)
+    for _ in range(100):
+        limiter.record(False, 0.1)
+    assert limiter.limit == 12
+
+
+def test_limiter_multiplicative_decrease_once_per_period(clock):
+    limiter = make_limiter()
+    limiter.record(False, 0.1)
+    limiter.record(True, 0.1)
+    assert int(limiter.limit) == 5
+    limiter.record(True, 0.1)
+    assert int(limiter.limit) == 5, "同一平滑延迟周期内只收缩一次"
+    clock.now += 1.0
+    limiter.record(False, 0.5)  # 超过基准延迟 × tolerance 同样收缩
+    assert int(limiter.limit) == 2
+    clock.now += 1.0
+    limiter.record(True, 0.1)
+    assert limiter.limit == 2, "不低于最小上限"
+
+
+def test_limiter_fails_fast_without_queue():
+    async def run():
+        limiter = make_limiter(initial=1, minimum=1)
+        assert await limiter.acquire(None, 0)
+        assert not await limiter.acquire(None, 0)
+        assert not await limiter.acquire(0, 10)
+        assert limiter.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_limiter_queue_hands_over_in_order_and_handles_timeout_and_cancel():
+    async def run():
+        limiter = make_limiter(initial=1, minimum=1)
+        assert await limiter.acquire(None, 0)
+        first = asyncio.create_task(limiter.acquire(1.0, 3))
+        second = asyncio.create_task(limiter.acquire(1.0, 3))
+        cancelled = asyncio.create_task(limiter.acquire(1.0, 3))
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["queued"] == 3
+        assert not await limiter.acquire(1.0, 3), "排队已满时立即拒绝"
+
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        limiter.release()
+        assert await first and not second.done()
+        limiter.release()
+        assert await second
+        assert limiter.in_flight == 1 and limiter.snapshot()["queued"] == 0
+
+        assert not await limiter.acquire(0.01, 3), "等待超时"
+        assert limiter.snapshot()["queued"] == 0 and limiter.in_flight == 1
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def guard_settings(monkeypatch):
+    for name, value in {
+        "BREAKER_ENABLED": True, "BREAKER_MIN_CALLS": 2, "BREAKER_FAILURE_RATE": 0.5,
+        "BREAKER_OPEN_SECONDS": 60.0, "LIMITER_INITIAL": 1, "LIMITER_MIN": 1,
+        "LIMITER_QUEUE_SIZE": 0, "LIMITER_QUEUE_TIMEOUT": 0.0,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+
+def test_guard_sheds_immediately_by_default(guard_settings):
+    async def run():
+        guard = UpstreamGuard()
+        async with guard.guard("http://a.example/x", timeout=5.0):
+            with pytest.raises(ConcurrencyLimitError):
+                async with guard.guard("http://a.example/y", timeout=5.0):
+                    pass
+            async with guard.guard("http://b.example/", timeout=5.0):
+                pass  # 其他主机不受影响
+        async with guard.guard("http://a.example/z", timeout=5.0):
+            pass
+
+    asyncio.run(run())
+
+
+def test_guard_records_failures_and_opens_breaker(guard_settings):
+    async def run():
+        guard = UpstreamGuard()
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                async with guard.guard("http://a.example/"):
+                    raise RuntimeError("upstream failed")
+        with pytest.raises(CircuitOpenError):
+            async with guard.guard("http://a.example/"):
+                pass
+        state = guard.get_state()["a.example"]
+        assert state["state"] == OPEN and state["limiter"]["in_flight"] == 0
+
+    asyncio.run(run())
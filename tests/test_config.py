@@ -0,0 +1,23 @@
+"""配置：逗号分隔与 JSON 数组两种写法的列表环境变量"""
+import pytest
+
+pydantic = pytest.importorskip("pydantic")
+if not hasattr(pydantic, "BaseSettings") or pydantic.VERSION.startswith("2"):
+    pytest.skip("Settings 基于 pydantic v1 BaseSettings", allow_module_level=True)
+
+from app.core.config.config import Settings  # noqa: E402
+
+
+@pytest.mark.parametrize("raw", ["cookie, x-trace-id", '["cookie", "x-trace-id"]'])
+def test_list_settings_accept_comma_and_json(monkeypatch, raw):
+    monkeypatch.setenv("REPLAY_IGNORE_HEADERS", raw)
+    monkeypatch.setenv("REPLAY_IGNORE_BODY_FIELDS", "meta.ts,nonce")
+    monkeypatch.setenv("CORS_ORIGINS", "http://ui.example.com,http://admin.example.com")
+    monkeypatch.setenv("RESPONSE_COMPRESSION_ENCODINGS", "br,gzip")
+    monkeypatch.setenv("RETRY_STATUS_CODES", "[500, 503]")
+    settings = Settings()
+    assert settings.REPLAY_IGNORE_HEADERS == ["cookie", "x-trace-id"]
+    assert settings.REPLAY_IGNORE_BODY_FIELDS == ["meta.ts", "nonce"]
+    assert [str(origin) for origin in settings.CORS_ORIGINS] == ["http://ui.example.com", "http://admin.example.com"]
+    assert settings.RESPONSE_COMPRESSION_ENCODINGS == ["br", "gzip"]
+    assert settings.RETRY_STATUS_CODES == [500, 503]
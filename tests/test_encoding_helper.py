@@ -0,0 +1,53 @@
+"""响应编码检测：未声明 charset 的多字节响应体经完整请求流程后正确解码"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.utils.encoding_helper import charset_cache, detect_encoding  # noqa: E402
+
+TEXT = "数据库连接失败，请稍后重试。服务器内部错误，请联系管理员。"
+
+
+@pytest.mark.parametrize("codec, text", [
+    ("gb18030", TEXT),
+    ("big5", "資料庫連線失敗，請稍後重試。伺服器內部錯誤，請聯絡管理員。"),
+    ("shift_jis", "データベース接続に失敗しました。しばらくしてから再試行してください。"),
+    ("euc-kr", "데이터베이스 연결에 실패했습니다. 잠시 후 다시 시도하십시오."),
+])
+def test_detect_encoding_without_charset(codec, text):
+    charset_cache.invalidate("example.com")
+    encoding, source = detect_encoding(text.encode(codec), "text/plain", "example.com")
+    assert source == "detected"
+    assert text.encode(codec).decode(encoding) == text
+
+
+def test_send_http_request_detects_gbk_body_without_charset(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("pydantic")
+    from app.core.utils import request_helper
+    from app.core.utils.encoding_helper import response_text
+
+    body = TEXT.encode("gbk")
+
+    def handler(request):
+        # 以未读取的流返回，与真实传输一样由客户端读取并在关闭时记录 elapsed
+        return httpx.Response(200, stream=httpx.ByteStream(body), headers={"Content-Type": "text/plain"})
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(request_helper.http_client_manager, "get_client", lambda profile: client)
+        try:
+            return await request_helper.send_http_request(
+                "GET", "http://gbk.example.com/", cache_mode="bypass", coalesce=False, replay_mode="off"
+            )
+        finally:
+            await client.aclose()
+
+    charset_cache.invalidate("gbk.example.com")
+    response = asyncio.run(run())
+    assert response.encoding != "utf-8"
+    assert response_text(response) == TEXT
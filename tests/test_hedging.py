@@ -0,0 +1,56 @@
+"""对冲请求：返回前败者已完成取消，同时完成的多余响应被关闭"""
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("pydantic")
+
+from app.core.utils import hedging  # noqa: E402
+
+URL = "http://api.example/slow"
+
+
+@pytest.fixture(autouse=True)
+def allow_hedge(monkeypatch):
+    monkeypatch.setattr(hedging.hedge_budget, "try_withdraw", lambda: True)
+
+
+def test_loser_is_cancelled_before_return():
+    cleaned = []
+    calls = []
+
+    async def attempt():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(10)
+            finally:
+                # 模拟败者在取消时仍需一次调度才能释放请求体
+                await asyncio.sleep(0)
+                cleaned.append(True)
+        return httpx.Response(200)
+
+    response = asyncio.run(hedging.hedged_call(attempt, URL, delay=0.01))
+    assert response.extensions["hedge"] == {"hedged": True, "hedge_won": True}
+    assert cleaned == [True]
+
+
+def test_failure_waits_for_loser():
+    cleaned = []
+    calls = []
+
+    async def attempt():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            raise httpx.ConnectError("primary failed")
+        try:
+            await asyncio.sleep(0.01)
+            raise httpx.ConnectError("hedge failed")
+        finally:
+            cleaned.append(True)
+
+    with pytest.raises(httpx.ConnectError, match="primary failed"):
+        asyncio.run(hedging.hedged_call(attempt, URL, delay=0.01))
+    assert cleaned == [True]
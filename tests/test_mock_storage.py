@@ -0,0 +1,101 @@
+"""Mock 数据存储：SortedEntryMap 的持久化语义与日志后端的多进程追平/压缩协议"""
+import multiprocessing
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.services.mock_journal import fcntl, make_entry  # noqa: E402
+from app.core.services.mock_storage import JournalBackend, SortedEntryMap  # noqa: E402
+
+WRITERS = 4
+KEYS_PER_WRITER = 300
+# 远小于默认阈值，使写入过程中反复触发日志轮转与后台快照压缩
+COMPACT_MIN_BYTES = 16 * 1024
+
+
+def test_sorted_entry_map_matches_dict_and_keeps_old_versions(monkeypatch):
+    monkeypatch.setattr(SortedEntryMap, "CHUNK_SIZE", 4)  # 小块，覆盖分裂与删空块
+    rng = random.Random(7)
+    expected = {}
+    current = SortedEntryMap.from_dict({})
+    for step in range(3000):
+        changes = [
+            (f"k{rng.randint(0, 200):03d}", None if rng.random() < 0.4 else {"step": step})
+            for _ in range(rng.randint(1, 4))
+        ]
+        previous, previous_items = current, list(current.items())
+        current, results = current.apply(changes)
+
+        expected_results = []
+        for key, entry in changes:
+            if entry is None:
+                expected_results.append(key in expected)
+                expected.pop(key, None)
+            else:
+                expected_results.append(True)
+                expected[key] = entry
+        assert results == expected_results
+        assert list(previous.items()) == previous_items
+        assert list(current.items()) == sorted(expected.items())
+        assert len(current) == len(expected)
+
+    for start in ("k000", "k100", "k150x", "k999", ""):
+        assert [key for key, _ in current.iter_from(start)] == sorted(k for k in expected if k >= start)
+        assert [key for key, _ in current.iter_from(start, inclusive=False)] == sorted(
+            k for k in expected if k > start
+        )
+
+
+def _writer(path: str, writer: int) -> None:
+    """写入本进程的 key，删除其中每第 5 个，期间与其他进程交错并跨越压缩"""
+    backend = JournalBackend(path, fsync_batch=8, watch=False, compact_min_bytes=COMPACT_MIN_BYTES)
+    try:
+        for i in range(KEYS_PER_WRITER):
+            key = f"w{writer}/{i:04d}"
+            backend.put(key, make_entry({"writer": writer, "i": i, "pad": "x" * 64}))
+            if i % 5 == 4:
+                assert backend.delete(f"w{writer}/{i - 2:04d}")
+    finally:
+        backend.close()
+
+
+def _expected_keys():
+    return sorted(
+        f"w{writer}/{i:04d}"
+        for writer in range(WRITERS)
+        for i in range(KEYS_PER_WRITER)
+        if not (i % 5 == 2 and i + 2 < KEYS_PER_WRITER)
+    )
+
+
+@pytest.mark.skipif(fcntl is None or sys.platform == "win32", reason="跨进程文件锁仅在 POSIX 上可用")
+def test_concurrent_writers_across_compactions(tmp_path):
+    path = str(tmp_path / "mock_data.json")
+    observer = JournalBackend(path, watch=False, compact_min_bytes=COMPACT_MIN_BYTES)
+    try:
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=_writer, args=(path, writer)) for writer in range(WRITERS)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=120)
+            assert process.exitcode == 0
+
+        # 已打开的进程通过增量追平（或轮转后重新加载）看到全部写入
+        observer.refresh()
+        assert observer.list_keys(limit=10_000) == _expected_keys()
+        assert observer.get("w3/0000")["data"] == {"writer": 3, "i": 0, "pad": "x" * 64}
+    finally:
+        observer.close()
+
+    assert os.path.exists(path), "写入量超过阈值，应至少完成过一次快照压缩"
+    reopened = JournalBackend(path, watch=False)
+    try:
+        assert reopened.list_keys(limit=10_000) == _expected_keys()
+        assert reopened.count() == len(_expected_keys())
+    finally:
+        reopened.close()
@@ -0,0 +1,179 @@
+"""响应缓存：新鲜期计算、凭据与 private 规则、Vary 变体与配置档案隔离"""
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("pydantic")
+
+from app.core.utils.response_cache import (  # noqa: E402
+    CacheEntry,
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    freshness_lifetime,
+)
+
+URL = "http://api.example/items"
+AUTH = {"Authorization": "Bearer secret"}
+
+
+@pytest.mark.parametrize("headers, authorized, expected", [
+    ({"cache-control": "max-age=60"}, False, 60.0),
+    ({"cache-control": "max-age=60, s-maxage=120"}, False, 120.0),
+    ({"cache-control": "no-store, max-age=60"}, False, None),
+    ({"cache-control": "private, max-age=60"}, False, None),
+    ({"cache-control": "no-cache", "etag": '"v1"'}, False, 0.0),
+    ({"cache-control": "no-cache"}, False, None),
+    ({"etag": '"v1"'}, False, 0.0),
+    ({}, False, None),
+    ({"date": "Sun, 18 Oct 2026 10:00:00 GMT", "expires": "Sun, 18 Oct 2026 10:05:00 GMT"}, False, 300.0),
+    ({"cache-control": "max-age=60"}, True, None),
+    ({"cache-control": "public, max-age=60"}, True, 60.0),
+    ({"cache-control": "s-maxage=30"}, True, 30.0),
+    ({"cache-control": "public, private, max-age=60"}, True, None),
+])
+def test_freshness_lifetime(headers, authorized, expected):
+    assert freshness_lifetime(httpx.Headers(headers), authorized) == expected
+
+
+def test_request_cacheability_and_primary_key():
+    assert ResponseCache.is_cacheable_request("get", None)
+    assert ResponseCache.is_cacheable_request("HEAD", {"Accept": "*/*"})
+    assert not ResponseCache.is_cacheable_request("POST", None)
+    assert not ResponseCache.is_cacheable_request("GET", {"Cache-Control": "no-store"})
+    assert ResponseCache.make_primary_key("GET", URL, {"b": "2", "a": "1"}) == \
+        ResponseCache.make_primary_key("get", URL, {"a": "1", "b": "2"})
+    assert ResponseCache.make_primary_key("GET", URL, None, "tenant-a") != \
+        ResponseCache.make_primary_key("GET", URL, None, "tenant-b")
+
+
+def make_response(headers, content=b"payload", status_code=200):
+    response = httpx.Response(status_code, headers=headers, content=content, request=httpx.Request("GET", URL))
+    response.elapsed = timedelta(milliseconds=5)
+    return response
+
+
+def new_cache() -> ResponseCache:
+    return ResponseCache(MemoryCacheBackend(max_bytes=1 << 20, max_entry_bytes=1 << 16))
+
+
+def test_fresh_hit_and_profile_isolation():
+    async def run():
+        cache = new_cache()
+        await cache.store("GET", URL, None, None, make_response({"Cache-Control": "max-age=60"}))
+        hit = await cache.lookup("GET", URL, None, None)
+        assert hit.fresh and hit.entry.content == b"payload"
+        assert (await cache.lookup("GET", URL, None, None, "other")).entry is None
+
+        await cache.store("GET", URL + "/404", None, None, make_response({"Cache-Control": "max-age=60"}, status_code=404))
+        assert (await cache.lookup("GET", URL + "/404", None, None)).entry is None
+
+    asyncio.run(run())
+
+
+def test_credentialed_requests_never_see_non_shared_entries():
+    async def run():
+        cache = new_cache()
+        # 带凭据且未声明 public：不存储
+        await cache.store("GET", URL, None, AUTH, make_response({"Cache-Control": "max-age=60"}))
+        assert (await cache.lookup("GET", URL, None, None)).entry is None
+
+        # 匿名请求存储的普通响应：带凭据的请求不复用
+        await cache.store("GET", URL, None, None, make_response({"Cache-Control": "max-age=60"}))
+        assert (await cache.lookup("GET", URL, None, AUTH)).entry is None
+        assert (await cache.lookup("GET", URL, None, {"Cookie": "sid=1"})).entry is None
+        assert (await cache.lookup("GET", URL, None, None)).fresh
+
+        # 显式 public 的响应可共享
+        await cache.store("GET", URL, None, AUTH, make_response({"Cache-Control": "public, max-age=60"}))
+        assert (await cache.lookup("GET", URL, None, {"Authorization": "Bearer other"})).fresh
+
+    asyncio.run(run())
+
+
+def test_private_responses_are_not_stored():
+    async def run():
+        cache = new_cache()
+        await cache.store("GET", URL, None, None, make_response({"Cache-Control": "private, max-age=60"}))
+        assert (await cache.lookup("GET", URL, None, None)).entry is None
+        assert cache.get_stats()["stores"] == 0
+
+    asyncio.run(run())
+
+
+def test_vary_variants_and_request_no_cache():
+    async def run():
+        cache = new_cache()
+        headers = {"Cache-Control": "max-age=60", "Vary": "Accept-Language"}
+        await cache.store("GET", URL, None, {"Accept-Language": "zh"}, make_response(headers, b"zh"))
+        assert (await cache.lookup("GET", URL, None, {"Accept-Language": "en"})).entry is None
+        hit = await cache.lookup("GET", URL, None, {"accept-language": "zh"})
+        assert hit.fresh and hit.entry.content == b"zh"
+
+        stale = await cache.lookup("GET", URL, None, {"Accept-Language": "zh", "Cache-Control": "no-cache"})
+        assert stale.entry is not None and not stale.fresh
+
+        await cache.store("GET", URL + "/any", None, None, make_response({"Cache-Control": "max-age=60", "Vary": "*"}))
+        assert (await cache.lookup("GET", URL + "/any", None, None)).entry is None
+
+    asyncio.run(run())
+
+
+def test_revalidation_refreshes_entry_and_drops_it_when_made_private():
+    async def run():
+        cache = new_cache()
+        await cache.store("GET", URL, None, None, make_response({"Cache-Control": "max-age=0", "ETag": '"v1"'}))
+        lookup = await cache.lookup("GET", URL, None, None)
+        assert lookup.entry is not None and not lookup.fresh
+        assert lookup.entry.conditional_headers() == {"If-None-Match": '"v1"'}
+
+        revalidated = await cache.revalidated(lookup, make_response({"Cache-Control": "max-age=60"}, b"", 304))
+        assert revalidated.content == b"payload" and revalidated.headers["X-Cache"] == "REVALIDATED"
+        assert (await cache.lookup("GET", URL, None, None)).fresh
+
+        lookup = await cache.lookup("GET", URL, None, {"Cache-Control": "no-cache"})
+        await cache.revalidated(lookup, make_response({"Cache-Control": "private"}, b"", 304))
+        assert (await cache.lookup("GET", URL, None, None)).entry is None
+
+    asyncio.run(run())
+
+
+def cache_entry(content: bytes) -> CacheEntry:
+    return CacheEntry(status_code=200, headers=[], content=content, stored_at=0.0, expires_at=60.0)
+
+
+def test_memory_backend_oversize_entry_replaces_stale_one():
+    backend = MemoryCacheBackend(max_bytes=1 << 20, max_entry_bytes=8)
+    backend.set("k", cache_entry(b"old"))
+    backend.set("k", cache_entry(b"x" * 64))
+    assert backend.get("k") is None
+    assert backend.usage()["bytes"] == 0
+
+
+def test_disk_backend_tracks_usage_and_evicts_lru(tmp_path, monkeypatch):
+    backend = DiskCacheBackend(str(tmp_path), max_bytes=1 << 20, max_entry_bytes=1 << 16)
+    for key in ("a", "b", "c"):
+        backend.set(key, cache_entry(key.encode() * 100))
+    assert backend.get("a").content == b"a" * 100
+    entry_bytes = backend.usage()["bytes"] // 3
+
+    # 写入与淘汰只依赖内存索引，不再扫描目录
+    monkeypatch.setattr(backend, "_scan", lambda: pytest.fail("rescanned cache directory"))
+    backend.max_bytes = entry_bytes * 3
+    backend.set("d", cache_entry(b"d" * 100))
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+    assert backend.usage() == {"entries": 3, "bytes": entry_bytes * 3, "evictions": 1}
+
+    backend.set("a", cache_entry(b"x" * (1 << 17)))
+    assert backend.get("a") is None
+    backend.delete("c")
+    assert backend.usage()["entries"] == 1
+
+    # 重启后从磁盘重建索引
+    monkeypatch.undo()
+    reopened = DiskCacheBackend(str(tmp_path), max_bytes=1 << 20, max_entry_bytes=1 << 16)
+    assert reopened.usage() == {"entries": 1, "bytes": entry_bytes, "evictions": 0}
+    assert reopened.get("d").content == b"d" * 100
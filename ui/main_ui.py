@@ -15,7 +15,7 @@ from apscheduler.jobstores.memory import MemoryJobStore
 import signal
 from ui.components.request_form import get_params
 from ui.components.progress_bar import show_progress_bar
-from app.core.services.mock_data_service import MockDataService
+from app.core.services.mock_data_service import get_mock_data_service
 from app.core.schemas.request_schema import HTTPRequestSchema
 from app.core.schemas.response_schema import HTTPResponseSchema
 from app.core.utils.request_helper import send_http_request, HTTPError
@@ -132,8 +132,8 @@ def display_response(response: HTTPResponseSchema):
     st.text(response.text)
     time.sleep(1)
 
-# 初始化服务
-mock_data_service = MockDataService()
+# 初始化服务（与 API 进程共享同一数据文件，脚本重跑时复用同一实例）
+mock_data_service = get_mock_data_service()
 task_scheduler = AsyncIOScheduler(jobstores={"default": MemoryJobStore()})
 
 def run_ui():